@@ -0,0 +1,240 @@
+# aggregates.py
+
+from db_schema import BOWLER_DISMISSALS, NOT_OUT_DISMISSALS
+
+SUMMARY_TABLES = ["batting_summary", "bowling_summary", "team_summary", "batting_splits", "bowling_splits",
+                  "head_to_head", "venue_toss"]
+
+# Innings phases by over (1-based, inclusive)
+PHASES = {"powerplay": (1, 6), "middle": (7, 15), "death": (16, 20)}
+
+
+def _phase_sql(column):
+    cases = " ".join(f"WHEN {column} <= {last} THEN '{name}'" for name, (_, last) in list(PHASES.items())[:-1])
+    return f"CASE {cases} ELSE '{list(PHASES)[-1]}' END"
+
+
+def _bowler_kinds_sql():
+    return ", ".join(f"'{kind}'" for kind in BOWLER_DISMISSALS)
+
+
+def _out_sql(column="dismissal_kind"):
+    """Predicate for a dismissal that counts as out (see NOT_OUT_DISMISSALS)."""
+    kinds = ", ".join(f"'{kind}'" for kind in NOT_OUT_DISMISSALS)
+    return f"COALESCE({column}, '') NOT IN ({kinds})"
+
+
+def _match_filter(conn, column, match_ids):
+    """SQL predicate restricting ``column`` to ``match_ids`` (None = every match)."""
+    if match_ids is None:
+        return "1"
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS refresh_match_ids (id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM refresh_match_ids")
+    conn.executemany("INSERT OR IGNORE INTO refresh_match_ids (id) VALUES (?)", ((int(i),) for i in match_ids))
+    return f"{column} IN (SELECT id FROM refresh_match_ids)"
+
+
+def refresh_batting(conn, match_ids=None):
+    """Fold the deliveries of ``match_ids`` into batting_summary (None = full rebuild)."""
+    if match_ids is None:
+        conn.execute("DELETE FROM batting_summary")
+    where = _match_filter(conn, "d.match_id", match_ids)
+    conn.execute(f"""
+        INSERT INTO batting_summary (season, batsman, runs, balls, fours, sixes)
+        SELECT m.season, d.batsman,
+               COALESCE(SUM(d.batsman_runs), 0),
+               SUM(CASE WHEN COALESCE(d.wide_runs, 0) = 0 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN d.batsman_runs = 4 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN d.batsman_runs = 6 THEN 1 ELSE 0 END)
+        FROM deliveries d JOIN matches m ON m.id = d.match_id
+        WHERE {where} AND d.batsman IS NOT NULL
+        GROUP BY m.season, d.batsman
+        ON CONFLICT (season, batsman) DO UPDATE SET
+            runs = runs + excluded.runs,
+            balls = balls + excluded.balls,
+            fours = fours + excluded.fours,
+            sixes = sixes + excluded.sixes
+    """)
+    # Dismissals are credited to whoever was out, which for run outs may be
+    # the non-striker rather than the batsman on strike; retired hurt is not out.
+    conn.execute(f"""
+        INSERT INTO batting_summary (season, batsman, dismissals)
+        SELECT m.season, d.player_dismissed, COUNT(*)
+        FROM deliveries d JOIN matches m ON m.id = d.match_id
+        WHERE {where} AND d.player_dismissed IS NOT NULL AND {_out_sql("d.dismissal_kind")}
+        GROUP BY m.season, d.player_dismissed
+        ON CONFLICT (season, batsman) DO UPDATE SET
+            dismissals = dismissals + excluded.dismissals
+    """)
+
+
+def refresh_bowling(conn, match_ids=None):
+    """Fold the deliveries of ``match_ids`` into bowling_summary (None = full rebuild)."""
+    if match_ids is None:
+        conn.execute("DELETE FROM bowling_summary")
+    where = _match_filter(conn, "d.match_id", match_ids)
+    kind_columns = [kind.replace(" ", "_") for kind in BOWLER_DISMISSALS]
+    kind_counts = ",\n               ".join(
+        f"SUM(CASE WHEN d.dismissal_kind = '{kind}' THEN 1 ELSE 0 END)" for kind in BOWLER_DISMISSALS
+    )
+    kind_updates = ",\n            ".join(f"{col} = {col} + excluded.{col}" for col in kind_columns)
+    conn.execute(f"""
+        INSERT INTO bowling_summary (season, bowler, balls, runs_conceded, wickets, {", ".join(kind_columns)})
+        SELECT m.season, d.bowler,
+               COUNT(*),
+               COALESCE(SUM(d.total_runs), 0),
+               SUM(CASE WHEN d.dismissal_kind IN ({_bowler_kinds_sql()}) THEN 1 ELSE 0 END),
+               {kind_counts}
+        FROM deliveries d JOIN matches m ON m.id = d.match_id
+        WHERE {where} AND d.bowler IS NOT NULL
+        GROUP BY m.season, d.bowler
+        ON CONFLICT (season, bowler) DO UPDATE SET
+            balls = balls + excluded.balls,
+            runs_conceded = runs_conceded + excluded.runs_conceded,
+            wickets = wickets + excluded.wickets,
+            {kind_updates}
+    """)
+
+
+def refresh_teams(conn, match_ids=None):
+    """Fold ``match_ids`` into team_summary (None = full rebuild)."""
+    if match_ids is None:
+        conn.execute("DELETE FROM team_summary")
+    where = _match_filter(conn, "id", match_ids)
+    conn.execute(f"""
+        INSERT INTO team_summary (season, team, matches, wins)
+        SELECT season, team, COUNT(*), SUM(won)
+        FROM (
+            SELECT season, team1 AS team, CASE WHEN winner = team1 THEN 1 ELSE 0 END AS won
+            FROM matches WHERE {where}
+            UNION ALL
+            SELECT season, team2 AS team, CASE WHEN winner = team2 THEN 1 ELSE 0 END AS won
+            FROM matches WHERE {where}
+        ) t
+        GROUP BY season, team
+        ON CONFLICT (season, team) DO UPDATE SET
+            matches = matches + excluded.matches,
+            wins = wins + excluded.wins
+    """)
+
+
+def refresh_batting_splits(conn, match_ids=None):
+    """Fold the deliveries of ``match_ids`` into batting_splits (None = full rebuild)."""
+    if match_ids is None:
+        conn.execute("DELETE FROM batting_splits")
+    where = _match_filter(conn, "match_id", match_ids)
+    phase = _phase_sql("over")
+    conn.execute(f"""
+        INSERT INTO batting_splits (match_id, phase, team, batsman, runs, balls, fours, sixes)
+        SELECT match_id, {phase}, batting_team, batsman,
+               COALESCE(SUM(batsman_runs), 0),
+               SUM(CASE WHEN COALESCE(wide_runs, 0) = 0 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN batsman_runs = 4 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN batsman_runs = 6 THEN 1 ELSE 0 END)
+        FROM deliveries
+        WHERE {where} AND batsman IS NOT NULL
+        GROUP BY match_id, 2, batsman
+        ON CONFLICT (match_id, phase, batsman) DO UPDATE SET
+            runs = runs + excluded.runs,
+            balls = balls + excluded.balls,
+            fours = fours + excluded.fours,
+            sixes = sixes + excluded.sixes
+    """)
+    conn.execute(f"""
+        INSERT INTO batting_splits (match_id, phase, team, batsman, dismissals)
+        SELECT match_id, {phase}, batting_team, player_dismissed, COUNT(*)
+        FROM deliveries
+        WHERE {where} AND player_dismissed IS NOT NULL AND {_out_sql()}
+        GROUP BY match_id, 2, player_dismissed
+        ON CONFLICT (match_id, phase, batsman) DO UPDATE SET
+            dismissals = dismissals + excluded.dismissals
+    """)
+
+
+def refresh_bowling_splits(conn, match_ids=None):
+    """Fold the deliveries of ``match_ids`` into bowling_splits (None = full rebuild)."""
+    if match_ids is None:
+        conn.execute("DELETE FROM bowling_splits")
+    where = _match_filter(conn, "match_id", match_ids)
+    conn.execute(f"""
+        INSERT INTO bowling_splits (match_id, phase, team, bowler, balls, runs_conceded, wickets)
+        SELECT match_id, {_phase_sql("over")}, bowling_team, bowler,
+               COUNT(*),
+               COALESCE(SUM(total_runs), 0),
+               SUM(CASE WHEN dismissal_kind IN ({_bowler_kinds_sql()}) THEN 1 ELSE 0 END)
+        FROM deliveries
+        WHERE {where} AND bowler IS NOT NULL
+        GROUP BY match_id, 2, bowler
+        ON CONFLICT (match_id, phase, bowler) DO UPDATE SET
+            balls = balls + excluded.balls,
+            runs_conceded = runs_conceded + excluded.runs_conceded,
+            wickets = wickets + excluded.wickets
+    """)
+
+
+def refresh_head_to_head(conn, match_ids=None):
+    """Fold ``match_ids`` into head_to_head, once from each side (None = full rebuild)."""
+    if match_ids is None:
+        conn.execute("DELETE FROM head_to_head")
+    where = _match_filter(conn, "id", match_ids)
+    conn.execute(f"""
+        INSERT INTO head_to_head (season, team, opponent, played, won)
+        SELECT season, team, opponent, COUNT(*), SUM(won)
+        FROM (
+            SELECT season, team1 AS team, team2 AS opponent, CASE WHEN winner = team1 THEN 1 ELSE 0 END AS won
+            FROM matches WHERE {where}
+            UNION ALL
+            SELECT season, team2 AS team, team1 AS opponent, CASE WHEN winner = team2 THEN 1 ELSE 0 END AS won
+            FROM matches WHERE {where}
+        ) t
+        GROUP BY season, team, opponent
+        ON CONFLICT (season, team, opponent) DO UPDATE SET
+            played = played + excluded.played,
+            won = won + excluded.won
+    """)
+
+
+def refresh_venue_toss(conn, match_ids=None):
+    """Fold ``match_ids`` into venue_toss (None = full rebuild). A win by
+    runs is a win batting first, as in the innings-strategy queries."""
+    if match_ids is None:
+        conn.execute("DELETE FROM venue_toss")
+    where = _match_filter(conn, "id", match_ids)
+    conn.execute(f"""
+        INSERT INTO venue_toss (venue, toss_decision, outcome, matches)
+        SELECT COALESCE(venue, ''), COALESCE(toss_decision, ''),
+               CASE WHEN winner IS NULL THEN 'no_result'
+                    WHEN winner = toss_winner AND win_by_runs > 0 THEN 'toss_winner_bat_first'
+                    WHEN winner = toss_winner THEN 'toss_winner_chasing'
+                    WHEN win_by_runs > 0 THEN 'other_bat_first'
+                    ELSE 'other_chasing' END,
+               COUNT(*)
+        FROM matches
+        WHERE {where}
+        GROUP BY 1, 2, 3
+        ON CONFLICT (venue, toss_decision, outcome) DO UPDATE SET
+            matches = matches + excluded.matches
+    """)
+
+
+def rebuild_summaries(conn):
+    with conn:
+        refresh_batting(conn)
+        refresh_bowling(conn)
+        refresh_teams(conn)
+        refresh_batting_splits(conn)
+        refresh_bowling_splits(conn)
+        refresh_head_to_head(conn)
+        refresh_venue_toss(conn)
+
+
+if __name__ == "__main__":
+    from db_schema import connect, create_schema
+
+    conn = connect("ipl_analysis.db")
+    create_schema(conn)
+    rebuild_summaries(conn)
+    for table in SUMMARY_TABLES:
+        count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        print(f"✅ {table}: {count} rows")
+    conn.close()
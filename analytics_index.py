@@ -0,0 +1,197 @@
+# analytics_index.py
+
+# Dense matchup arrays loaded from the head_to_head and venue_toss tables
+# that ingest.py keeps up to date per match (see aggregates.py). Names map
+# to array positions through dicts, so every lookup is a few index
+# operations however many matches are loaded.
+
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from db_schema import TOSS_OUTCOMES
+from exceptions import IPLDatabaseError
+from query_cache import data_version
+
+TOSS_DECISIONS = ["bat", "field"]
+MATCHUP_INDEX_CACHE_SIZE = 8    # database files whose index is kept
+
+
+def _positions(names):
+    return {name: i for i, name in enumerate(names)}
+
+
+class MatchupIndex:
+    """Team x team x season results and venue x toss decision x outcome counts.
+
+    ``played[a, b, s]`` and ``won[a, b, s]`` count the matches team ``a``
+    played and won against ``b`` in season ``s``; ``venue_toss[v, d, o]``
+    counts matches at venue ``v`` with toss decision ``d`` and outcome ``o``
+    (db_schema.TOSS_OUTCOMES). Totals over seasons, opponents and venues are
+    summed once here so that lookups never loop.
+    """
+
+    def __init__(self, head_to_head, venue_toss):
+        import numpy as np
+
+        self.teams = sorted({row[1] for row in head_to_head} | {row[2] for row in head_to_head})
+        self.seasons = sorted({row[0] for row in head_to_head})
+        self.venues = sorted({row[0] for row in venue_toss})
+        self.decisions = TOSS_DECISIONS + sorted({row[1] for row in venue_toss} - set(TOSS_DECISIONS))
+        self._team = _positions(self.teams)
+        self._season = _positions(self.seasons)
+        self._venue = _positions(self.venues)
+        self._decision = _positions(self.decisions)
+        self._outcome = _positions(TOSS_OUTCOMES)
+
+        shape = (len(self.teams), len(self.teams), len(self.seasons))
+        self.played = np.zeros(shape, dtype=np.int32)
+        self.won = np.zeros(shape, dtype=np.int32)
+        for season, team, opponent, played, won in head_to_head:
+            cell = self._team[team], self._team[opponent], self._season[season]
+            self.played[cell] = played
+            self.won[cell] = won
+        self.venue_toss = np.zeros((len(self.venues), len(self.decisions), len(TOSS_OUTCOMES)), dtype=np.int32)
+        for venue, decision, outcome, matches in venue_toss:
+            self.venue_toss[self._venue[venue], self._decision[decision], self._outcome[outcome]] = matches
+
+        self.played_all = self.played.sum(axis=2)             # team x opponent
+        self.won_all = self.won.sum(axis=2)
+        self.team_played = self.played.sum(axis=1)            # team x season
+        self.team_won = self.won.sum(axis=1)
+        self.venue_outcomes = self.venue_toss.sum(axis=1)     # venue x outcome
+        self.decision_outcomes = self.venue_toss.sum(axis=0)  # decision x outcome
+        self.outcomes = self.venue_outcomes.sum(axis=0)       # outcome
+
+    @classmethod
+    def from_connection(cls, conn):
+        try:
+            head_to_head = conn.execute("SELECT season, team, opponent, played, won FROM head_to_head").fetchall()
+            venue_toss = conn.execute("SELECT venue, toss_decision, outcome, matches FROM venue_toss").fetchall()
+        except sqlite3.OperationalError as e:
+            raise IPLDatabaseError("The matchup tables are missing; run the ingest (ingest.py or main.py) "
+                                   "to build them.") from e
+        return cls(head_to_head, venue_toss)
+
+    def head_to_head(self, team, opponent, season=None):
+        """{"played", "won", "lost", "no_result"} for ``team`` against
+        ``opponent``, in one season or all of them."""
+        a, b = self._team.get(team), self._team.get(opponent)
+        if a is None or b is None or (season is not None and season not in self._season):
+            return {"played": 0, "won": 0, "lost": 0, "no_result": 0}
+        if season is None:
+            played, won, lost = self.played_all[a, b], self.won_all[a, b], self.won_all[b, a]
+        else:
+            s = self._season[season]
+            played, won, lost = self.played[a, b, s], self.won[a, b, s], self.won[b, a, s]
+        return {"played": int(played), "won": int(won), "lost": int(lost),
+                "no_result": int(played - won - lost)}
+
+    def team_season(self, team, season):
+        """(played, won) by ``team`` in ``season``."""
+        a, s = self._team.get(team), self._season.get(season)
+        if a is None or s is None:
+            return 0, 0
+        return int(self.team_played[a, s]), int(self.team_won[a, s])
+
+    def venue_record(self, venue=None, decision=None):
+        """{outcome: matches} at ``venue`` (None = every venue), optionally
+        only where the toss winner chose ``decision``."""
+        v, d = self._venue.get(venue), self._decision.get(decision)
+        if (venue is not None and v is None) or (decision is not None and d is None):
+            return dict.fromkeys(TOSS_OUTCOMES, 0)
+        if venue is None:
+            counts = self.outcomes if decision is None else self.decision_outcomes[d]
+        else:
+            counts = self.venue_outcomes[v] if decision is None else self.venue_toss[v, d]
+        return {outcome: int(n) for outcome, n in zip(TOSS_OUTCOMES, counts)}
+
+    def batting_first_win_rate(self, venue=None, decision=None):
+        """Percentage of decided matches won by the side batting first, or
+        None when no match there had a result."""
+        record = self.venue_record(venue, decision)
+        first = record["toss_winner_bat_first"] + record["other_bat_first"]
+        decided = first + record["toss_winner_chasing"] + record["other_chasing"]
+        return round(first * 100.0 / decided, 2) if decided else None
+
+    # --- frames for the reports ---
+
+    def toss_vs_match_winner(self):
+        """Same rows as final.py's toss query: Result, Count."""
+        import pandas as pd
+
+        both = int(self.outcomes[self._outcome["toss_winner_bat_first"]]
+                   + self.outcomes[self._outcome["toss_winner_chasing"]])
+        counts = {"Only Toss or Match Won": int(self.outcomes.sum()) - both, "Toss & Match Won": both}
+        counts = {result: n for result, n in counts.items() if n}
+        return pd.DataFrame({"Result": list(counts), "Count": list(counts.values())})
+
+    def win_by_innings_strategy(self):
+        """Same rows as final.py's innings-strategy query: Strategy, Wins."""
+        import pandas as pd
+
+        o = self._outcome
+        counts = {"Bat First": int(self.outcomes[o["toss_winner_bat_first"]] + self.outcomes[o["other_bat_first"]]),
+                  "Chase": int(self.outcomes[o["toss_winner_chasing"]] + self.outcomes[o["other_chasing"]])}
+        counts = {strategy: n for strategy, n in counts.items() if n}
+        return pd.DataFrame({"Strategy": list(counts), "Wins": list(counts.values())})
+
+    def season_win_rates(self):
+        """Team x season win rate (%), 0 where a team did not play."""
+        import numpy as np
+        import pandas as pd
+
+        rates = np.round(self.team_won * 100.0 / np.maximum(self.team_played, 1), 2)
+        return pd.DataFrame(rates, index=pd.Index(self.teams, name="team"),
+                            columns=pd.Index(self.seasons, name="season"))
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_matchup_index(conn):
+    """The MatchupIndex for ``conn``'s data, rebuilt only after an ingest.
+
+    Indexes are cached per database file, least recently used evicted
+    first. In-memory databases are not cached: their key is the
+    connection's id(), which a later connection can reuse.
+    """
+    version = data_version(conn)
+    if version[0].startswith(":memory:"):
+        return MatchupIndex.from_connection(conn)
+    with _indexes_lock:
+        index = _indexes.get(version[0])
+        if index is not None and index[0] == version:
+            _indexes.move_to_end(version[0])
+            return index[1]
+    built = MatchupIndex.from_connection(conn)
+    with _indexes_lock:
+        _indexes[version[0]] = (version, built)
+        _indexes.move_to_end(version[0])
+        while len(_indexes) > MATCHUP_INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return built
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from db_schema import connect
+
+    parser = argparse.ArgumentParser(description="Look up head-to-head and venue records.")
+    parser.add_argument("--db", default="ipl_analysis.db")
+    parser.add_argument("--teams", nargs=2, metavar=("TEAM", "OPPONENT"))
+    parser.add_argument("--season", type=int)
+    parser.add_argument("--venue")
+    parser.add_argument("--decision", choices=TOSS_DECISIONS)
+    args = parser.parse_args()
+
+    index = get_matchup_index(connect(args.db, read_only=True))
+    if args.teams:
+        record = index.head_to_head(*args.teams, season=args.season)
+        print(f"📊 {args.teams[0]} vs {args.teams[1]}: {record}")
+    if args.venue or args.decision or not args.teams:
+        rate = index.batting_first_win_rate(args.venue, args.decision)
+        print(f"📊 {args.venue or 'All venues'}: {index.venue_record(args.venue, args.decision)}")
+        print(f"📊 Batting first win rate: {'n/a' if rate is None else f'{rate}%'}")
@@ -0,0 +1,170 @@
+# benchmarks/load_test.py
+#
+# Load test for query_service.py: client threads send a mix of catalogued
+# queries and filtered leaderboards over keep-alive connections at
+# increasing concurrency, and p50/p99 latency, requests/sec and rejected
+# (503) requests are reported per level. Without --url the service runs
+# in this process against --db (or a database built from synthetic data
+# with --scale).
+#
+#   python benchmarks/load_test.py [--concurrency 1 4 16 64] [--requests 2000] [--no-cache]
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode, urlparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+DEFAULT_CONCURRENCY = [1, 2, 4, 8, 16, 32, 64]
+LEADERBOARD_METRICS = ["runs", "sixes", "strike_rate", "wickets", "economy", "wins"]
+PHASES = [None, "powerplay", "middle", "death"]
+
+
+def request_mix(names, seasons, count, seed=0):
+    """``count`` request paths: half catalogued queries, half leaderboards
+    with random season ranges and phases (so some repeat, some don't)."""
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            paths.append(f"/query/{rng.choice(names)}")
+            continue
+        metric = rng.choice(LEADERBOARD_METRICS)
+        params = {"metric": metric, "k": 10}
+        first = rng.choice(seasons)
+        params["seasons"] = f"{first}-{rng.choice([s for s in seasons if s >= first])}"
+        phase = rng.choice(PHASES)
+        if phase and metric != "wins":
+            params["phase"] = phase
+        paths.append(f"/query/leaderboard?{urlencode(params)}")
+    return paths
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_level(url, paths, concurrency):
+    """Send ``paths`` from ``concurrency`` threads; returns the level's stats."""
+    target = urlparse(url)
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    cursor = iter(range(len(paths)))
+
+    def client():
+        conn = http.client.HTTPConnection(target.hostname, target.port, timeout=60)
+        mine, codes = [], {}
+        while True:
+            with lock:
+                i = next(cursor, None)
+            if i is None:
+                break
+            start = time.perf_counter()
+            conn.request("GET", paths[i])
+            response = conn.getresponse()
+            response.read()
+            mine.append(time.perf_counter() - start)
+            codes[response.status] = codes.get(response.status, 0) + 1
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            for code, n in codes.items():
+                statuses[code] = statuses.get(code, 0) + n
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {"concurrency": concurrency, "requests": len(latencies),
+            "p50_ms": percentile(latencies, 0.50) * 1000, "p99_ms": percentile(latencies, 0.99) * 1000,
+            "requests_per_sec": len(latencies) / elapsed, "rejected": statuses.get(503, 0),
+            "errors": sum(n for code, n in statuses.items() if code not in (200, 503))}
+
+
+def fetch_json(url, path):
+    target = urlparse(url)
+    conn = http.client.HTTPConnection(target.hostname, target.port, timeout=60)
+    conn.request("GET", path)
+    payload = json.loads(conn.getresponse().read())
+    conn.close()
+    return payload
+
+
+def load_test(url, levels, requests, seed=0):
+    names = [name for name in fetch_json(url, "/queries") if name != "leaderboard"]
+    seasons = [row[0] for row in fetch_json(url, "/query/matches_per_season")["rows"]]
+    results = []
+    for concurrency in levels:
+        # Warm up the connections' caches so every level sees the same state
+        run_level(url, request_mix(names, seasons, min(requests, 50), seed + 1), concurrency)
+        results.append(run_level(url, request_mix(names, seasons, requests, seed), concurrency))
+        level = results[-1]
+        print(f"   {concurrency:>5} {level['p50_ms']:10.2f} {level['p99_ms']:10.2f} "
+              f"{level['requests_per_sec']:10.0f} {level['rejected']:9d} {level['errors']:7d}")
+    return results
+
+
+def build_database(folder, scale):
+    from suite import ensure_data
+
+    from db_schema import connect
+    from ingest import stream_ingest
+
+    data = ensure_data(scale)
+    path = os.path.join(folder, "load_test.db")
+    conn = connect(path)
+    stream_ingest(conn, os.path.join(data, "matches.csv"), os.path.join(data, "deliveries.csv"))
+    conn.execute("ANALYZE")
+    conn.close()
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the query service.")
+    parser.add_argument("--url", help="test a running service instead of starting one")
+    parser.add_argument("--db", default="ipl_analysis.db", help="database for the in-process service")
+    parser.add_argument("--scale", type=float, help="build the database from synthetic data at this scale")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per concurrency level")
+    parser.add_argument("--workers", type=int, default=4, help="pooled connections of the in-process service")
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--no-cache", action="store_true", help="run every query against the database")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, REPO_ROOT)
+    sys.path.insert(0, BENCH_DIR)
+    from query_cache import QueryCache
+    from query_service import serve_in_background
+
+    header = f"\n📊 {'clients':>5} {'p50 (ms)':>10} {'p99 (ms)':>10} {'req/s':>10} {'rejected':>9} {'errors':>7}"
+    if args.url:
+        print(header)
+        results = load_test(args.url, args.concurrency, args.requests)
+    else:
+        with tempfile.TemporaryDirectory() as folder:
+            db = build_database(folder, args.scale) if args.scale else args.db
+            cache = None if args.no_cache else QueryCache()
+            with serve_in_background(db, workers=args.workers, max_pending=args.max_pending, cache=cache) as url:
+                print(header)
+                results = load_test(url, args.concurrency, args.requests)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
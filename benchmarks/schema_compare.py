@@ -0,0 +1,89 @@
+# benchmarks/schema_compare.py
+#
+# Builds the analysis database in the plain and the normalized layout (see
+# db_schema.py) from the same data and compares file size, load time and
+# the latency of the sql_queries.py and run_queries.py queries.
+#
+#   python benchmarks/schema_compare.py [--scale 10] [--repeat 5]
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+LAYOUTS = {"plain": False, "normalized": True}
+
+
+def build(path, matches_path, deliveries_path, normalized):
+    """Stream the data into a new database; returns (connection, load seconds, bytes)."""
+    from db_schema import connect
+    from ingest import stream_ingest
+
+    conn = connect(path)
+    stats = stream_ingest(conn, matches_path, deliveries_path, normalized=normalized)
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+    return conn, stats["seconds"], os.path.getsize(path)
+
+
+def compare(matches_path, deliveries_path, repeat=3):
+    """{layout: {"load_seconds", "bytes", "timings": {query: seconds}}}."""
+    from suite import timed
+
+    import run_queries
+    from db_schema import catalogue_queries
+
+    queries = {f"sql_queries.{name}": query for name, query in catalogue_queries().items()}
+    queries.update({f"run_queries.{spec['name']}": spec["query"] for spec in run_queries.QUERIES})
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for layout, normalized in LAYOUTS.items():
+            conn, seconds, size = build(os.path.join(folder, f"{layout}.db"),
+                                        matches_path, deliveries_path, normalized)
+            timings = {}
+            for name, query in queries.items():
+                timings[name], _ = timed(lambda: conn.execute(query).fetchall(), repeat)
+            timings["run_queries.run_batch"], _ = timed(lambda: run_queries.run_batch(conn), repeat)
+            conn.close()
+            results[layout] = {"load_seconds": seconds, "bytes": size, "timings": timings}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the plain and normalized database layouts.")
+    parser.add_argument("--scale", type=float, help="use synthetic data at this scale instead of data/")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per query (median kept)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, REPO_ROOT)
+    sys.path.insert(0, BENCH_DIR)
+    if args.scale:
+        from suite import ensure_data
+        folder = ensure_data(args.scale)
+        paths = os.path.join(folder, "matches.csv"), os.path.join(folder, "deliveries.csv")
+    else:
+        from dataset import get_dataset
+        paths = get_dataset().source_path("matches"), get_dataset().source_path("deliveries")
+
+    results = compare(*paths, repeat=args.repeat)
+    plain, normalized = results["plain"], results["normalized"]
+    print(f"\n📊 {'':<45} {'plain':>12} {'normalized':>12}")
+    print(f"   {'file size (MB)':<45} {plain['bytes'] / 2**20:12.1f} {normalized['bytes'] / 2**20:12.1f}")
+    print(f"   {'load (s)':<45} {plain['load_seconds']:12.2f} {normalized['load_seconds']:12.2f}")
+    for name, seconds in plain["timings"].items():
+        print(f"   {name + ' (ms)':<45} {seconds * 1000:12.2f} {normalized['timings'][name] * 1000:12.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
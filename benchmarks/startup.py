@@ -0,0 +1,116 @@
+# benchmarks/startup.py
+#
+# Startup benchmark for the CLI entry points: cumulative import time of each
+# entry module (via -X importtime), which heavy libraries an import drags in,
+# and wall time until final.main_menu shows its first prompt. Compared
+# against startup_budget.json; exits non-zero on a regression.
+#
+#   python benchmarks/startup.py [--runs 5] [--output results.json]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+ENTRY_MODULES = ["final", "main", "ipl_analysis"]
+PROMPT = "Enter your choice"
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def import_time_us(module, cwd):
+    """Cumulative import time of ``module`` in microseconds, from -X importtime."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=cwd, env=_env(), capture_output=True, text=True, check=True)
+    for line in reversed(proc.stderr.splitlines()):
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"No importtime entry for {module}")
+
+
+def heavy_modules(module, cwd, forbidden):
+    code = (f"import sys, {module}; "
+            f"print(' '.join(m for m in {forbidden!r} if m in sys.modules))")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=_env(),
+                          capture_output=True, text=True, check=True)
+    return proc.stdout.split()
+
+
+def time_to_first_prompt(cwd):
+    """Seconds from process start until final.main_menu prints its prompt."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-u", "-c", "import final; final.main_menu()"],
+                            cwd=cwd, env=_env(), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, text=True, bufsize=0)
+    seen = ""
+    while PROMPT not in seen:
+        char = proc.stdout.read(1)
+        if not char:
+            raise RuntimeError("final.main_menu exited before prompting")
+        seen += char
+    elapsed = time.perf_counter() - start
+    proc.communicate("11\n", timeout=30)
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup against the budget.")
+    parser.add_argument("--runs", type=int, default=5, help="repetitions per measurement (median kept)")
+    parser.add_argument("--budget", default=BUDGET_PATH)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    with open(args.budget) as f:
+        budget = json.load(f)
+
+    failures = []
+    results = {"import_us": {}, "heavy_modules": {}}
+    # Run from an empty directory so the menu's database is created there
+    with tempfile.TemporaryDirectory() as cwd:
+        for module in ENTRY_MODULES:
+            us = statistics.median(import_time_us(module, cwd) for _ in range(args.runs))
+            results["import_us"][module] = us
+            limit = budget["import_us"].get(module)
+            if limit is not None and us > limit:
+                failures.append(f"import {module}: {us / 1000:.1f} ms > {limit / 1000:.1f} ms")
+
+            heavy = heavy_modules(module, cwd, budget["forbidden_modules"])
+            results["heavy_modules"][module] = heavy
+            if heavy:
+                failures.append(f"import {module} loads {', '.join(heavy)}")
+
+        ttfp = statistics.median(time_to_first_prompt(cwd) for _ in range(args.runs))
+        results["time_to_first_prompt_s"] = ttfp
+        if ttfp > budget["time_to_first_prompt_s"]:
+            failures.append(f"time to first prompt: {ttfp:.3f} s > {budget['time_to_first_prompt_s']} s")
+
+    for module, us in results["import_us"].items():
+        print(f"📦 import {module:<13} {us / 1000:7.1f} ms")
+    print(f"⏱️  final.main_menu first prompt {results['time_to_first_prompt_s'] * 1000:7.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ Startup within budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
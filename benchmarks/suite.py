@@ -0,0 +1,210 @@
+# benchmarks/suite.py
+#
+# Timing suite over synthetic data (benchmarks/synthetic.py) at several
+# scales: streaming ingest, every query in sql_queries.py and run_queries.py,
+# the NumPy stats engine, the ipl_analysis.py reports and chart rendering.
+# Each scale runs in its own process and working directory. Results are
+# written as JSON and compared with a baseline; the run fails if any timing
+# regressed by more than the threshold.
+#
+#   python benchmarks/suite.py [--scales 1 10 100] [--save-baseline]
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_ROOT = os.path.join(REPO_ROOT, "cache", "benchmarks", "data")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_SCALES = [1, 10]
+DEFAULT_THRESHOLD = 0.25     # fail when a timing grows by more than 25 %...
+DEFAULT_MIN_DELTA = 0.005    # ...and by more than 5 ms, so tiny queries don't flap
+
+
+def scale_label(scale):
+    return f"{scale:g}x"
+
+
+def ensure_data(scale, seed=0):
+    """Generate (once) and return the data folder for ``scale``."""
+    sys.path.insert(0, BENCH_DIR)
+    import synthetic
+
+    folder = os.path.join(DATA_ROOT, f"{scale_label(scale)}-seed{seed}-v{synthetic.GENERATOR_VERSION}")
+    marker = os.path.join(folder, "counts.json")
+    if not os.path.exists(marker):
+        print(f"🛠️  Generating {scale_label(scale)} data in {folder} ...")
+        counts = synthetic.generate(scale, folder, seed=seed)
+        with open(marker, "w") as f:
+            json.dump(counts, f)
+    return folder
+
+
+def timed(fn, repeat=1):
+    """Median wall time of ``repeat`` calls, and the last return value."""
+    times, value = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), value
+
+
+def run_worker(repeat):
+    """Benchmark the repo in the current directory (which holds ``data/``).
+
+    Returns {"timings": {name: seconds}, "info": {...}}.
+    """
+    sys.path.insert(0, REPO_ROOT)
+    import chart_service
+    import ipl_analysis
+    import run_queries
+    from dataset import get_dataset
+    from db_schema import catalogue_queries, connect
+    from ingest import stream_ingest
+    from stats_engine import StatsEngine
+
+    timings, info = {}, {}
+    dataset = get_dataset()
+    dataset.use_disk_cache = False
+
+    conn = connect("bench.db")
+    seconds, stats = timed(lambda: stream_ingest(conn, dataset.source_path("matches"),
+                                                  dataset.source_path("deliveries")))
+    timings["ingest.stream"] = seconds
+    info["deliveries"] = stats["rows"]
+    info["ingest_rows_per_sec"] = stats["rows_per_sec"]
+    conn.execute("ANALYZE")
+
+    for name, query in catalogue_queries().items():
+        timings[f"sql_queries.{name}"], _ = timed(lambda: conn.execute(query).fetchall(), repeat)
+    for spec in run_queries.QUERIES:
+        timings[f"run_queries.{spec['name']}"], _ = timed(
+            lambda: conn.execute(spec["query"]).fetchall(), repeat)
+    timings["run_queries.run_batch"], _ = timed(lambda: run_queries.run_batch(conn), repeat)
+    conn.close()
+
+    timings["dataset.load_matches"], matches = timed(lambda: dataset.matches)
+    timings["dataset.load_deliveries"], _ = timed(lambda: dataset.deliveries)
+
+    # The NumPy engine against run_queries' SQL path above
+    timings["stats_engine.build"], _ = timed(lambda: StatsEngine.from_dataset(dataset), repeat)
+    timings["stats_engine.run_queries"], _ = timed(
+        lambda: StatsEngine.from_dataset(dataset).run_queries(), repeat)
+    dataset.invalidate("deliveries")
+
+    # Reports print their frames; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for report in ("generate_team_report", "generate_season_report", "generate_player_analysis"):
+            timings[f"ipl_analysis.{report}"], _ = timed(getattr(ipl_analysis, report), repeat)
+    chart_service.wait_for_charts()
+
+    team_wins = matches["winner"].value_counts().rename_axis("team").reset_index(name="wins")
+    season_wins = matches.groupby(["season", "winner"], observed=True).size().unstack(fill_value=0)
+    per_season = matches.groupby("season").size().reset_index(name="matches")
+    charts = {
+        "column": (team_wins, {"kind": "column", "x": "team", "y": "wins", "rotation": 45}),
+        "heatmap": (season_wins, {"kind": "heatmap", "cmap": "YlGnBu", "fmt": "d"}),
+        "sns_line": (per_season, {"kind": "sns_line", "x": "season", "y": "matches"}),
+    }
+    chart_service.use_headless_backend()
+    for kind, (frame, spec) in charts.items():
+        path = os.path.join("charts_bench", f"{kind}.png")
+        os.makedirs("charts_bench", exist_ok=True)
+        timings[f"charts.{kind}"], _ = timed(lambda: chart_service.render_chart(frame, spec, path), repeat)
+
+    return {"timings": timings, "info": info}
+
+
+def run_scale(scale, repeat, seed=0):
+    """Run the worker for one scale in a fresh process and directory."""
+    data = ensure_data(scale, seed)
+    with tempfile.TemporaryDirectory() as cwd:
+        os.symlink(data, os.path.join(cwd, "data"))
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT, MPLBACKEND="Agg", IPL_CHART_WORKERS="1")
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", "--repeat", str(repeat)],
+                              cwd=cwd, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Benchmark at {scale_label(scale)} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+def find_regressions(results, baseline, threshold=DEFAULT_THRESHOLD, min_delta=DEFAULT_MIN_DELTA):
+    """Timings slower than the baseline by more than ``threshold`` (a
+    fraction) and ``min_delta`` seconds, as readable strings."""
+    regressions = []
+    for scale, current in results.items():
+        previous = baseline.get(scale, {})
+        for name, seconds in current["timings"].items():
+            before = previous.get("timings", {}).get(name)
+            if before is None:
+                continue
+            if seconds > before * (1 + threshold) and seconds - before > min_delta:
+                regressions.append(f"{scale} {name}: {seconds * 1000:.1f} ms vs {before * 1000:.1f} ms "
+                                   f"(+{(seconds / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ingest, queries, reports and charts.")
+    parser.add_argument("--scales", type=float, nargs="+", default=DEFAULT_SCALES,
+                        help="data sizes relative to the real dataset (e.g. 1 10 100)")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per timing (median kept)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction of the baseline")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="ignore slowdowns smaller than this many seconds")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.repeat)))
+        return 0
+
+    results = {}
+    for scale in args.scales:
+        label = scale_label(scale)
+        results[label] = run_scale(scale, args.repeat)
+        print(f"\n📊 {label} ({results[label]['info']['deliveries']} deliveries, "
+              f"{results[label]['info']['ingest_rows_per_sec']:,.0f} rows/sec ingest)")
+        for name, seconds in results[label]["timings"].items():
+            print(f"   {name:<45} {seconds * 1000:9.1f} ms")
+
+    report = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\n📌 No baseline yet; run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = find_regressions(results, baseline, args.threshold, args.min_delta)
+    if regressions:
+        for regression in regressions:
+            print(f"❌ {regression}")
+        return 1
+    print("\n✅ No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
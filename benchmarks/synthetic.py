@@ -0,0 +1,333 @@
+# benchmarks/synthetic.py
+#
+# Deterministic generator for matches.csv / deliveries.csv shaped data. A
+# scale of 1 is roughly the real dataset (12 seasons, ~700 matches, ~170k
+# deliveries); 10 and 100 simply play more seasons with the same league
+# structure, so per-season and per-match shapes stay realistic as the row
+# counts grow. The same scale and seed always produce byte-identical files.
+#
+#   python benchmarks/synthetic.py --scale 10 --output cache/benchmarks/data/10x
+
+import argparse
+import os
+import sys
+
+GENERATOR_VERSION = 1
+SEASONS_PER_SCALE = 12
+FIRST_SEASON = 2008
+SEASONS_PER_CHUNK = 10
+
+# (name, player prefix, home venue, city, first season, last season). Seasons
+# past 2019 replay the same twelve-season cycle of franchises.
+TEAMS = [
+    ("Mumbai Indians", "Mum", "Wankhede Stadium", "Mumbai", 2008, 2019),
+    ("Chennai Super Kings", "Che", "MA Chidambaram Stadium, Chepauk", "Chennai", 2008, 2015),
+    ("Chennai Super Kings", "Che", "MA Chidambaram Stadium, Chepauk", "Chennai", 2018, 2019),
+    ("Rajasthan Royals", "Raj", "Sawai Mansingh Stadium", "Jaipur", 2008, 2015),
+    ("Rajasthan Royals", "Raj", "Sawai Mansingh Stadium", "Jaipur", 2018, 2019),
+    ("Royal Challengers Bangalore", "Roy", "M Chinnaswamy Stadium", "Bangalore", 2008, 2019),
+    ("Kolkata Knight Riders", "Kol", "Eden Gardens", "Kolkata", 2008, 2019),
+    ("Kings XI Punjab", "Kin", "Punjab Cricket Association Stadium, Mohali", "Chandigarh", 2008, 2019),
+    ("Delhi Daredevils", "Del", "Feroz Shah Kotla", "Delhi", 2008, 2018),
+    ("Delhi Capitals", "Del", "Feroz Shah Kotla", "Delhi", 2019, 2019),
+    ("Deccan Chargers", "Dec", "Rajiv Gandhi International Stadium, Uppal", "Hyderabad", 2008, 2012),
+    ("Sunrisers Hyderabad", "Sun", "Rajiv Gandhi International Stadium, Uppal", "Hyderabad", 2013, 2019),
+    ("Kochi Tuskers Kerala", "Koc", "Nehru Stadium", "Kochi", 2011, 2011),
+    ("Pune Warriors", "Pun", "Subrata Roy Sahara Stadium", "Pune", 2011, 2013),
+    ("Rising Pune Supergiant", "Ris", "Maharashtra Cricket Association Stadium", "Pune", 2016, 2017),
+    ("Gujarat Lions", "Guj", "Saurashtra Cricket Association Stadium", "Rajkot", 2016, 2017),
+]
+PLAYOFFS_PER_SEASON = 4
+SQUAD_SIZE = 25
+SQUAD_TURNOVER = 3       # new player ids per team per season
+UMPIRES = 60
+
+# Outcome of a legal ball: wicket, then runs 0, 1, 2, 3, 4, 6. Top order
+# (batting positions 1-7) and tail get different tables.
+OUTCOME_RUNS = [-1, 0, 1, 2, 3, 4, 6]
+TOP_ORDER = [0.045, 0.34, 0.38, 0.07, 0.005, 0.11, 0.05]
+TAIL = [0.09, 0.42, 0.33, 0.05, 0.003, 0.07, 0.037]
+WIDE, NO_BALL = 0.03, 0.004
+LEG_BYE, BYE = 0.06, 0.015      # share of dot balls that run a leg bye / bye
+DISMISSALS = ["caught", "bowled", "run out", "lbw", "stumped", "caught and bowled", "hit wicket"]
+DISMISSAL_SHARE = [0.60, 0.17, 0.09, 0.065, 0.035, 0.03, 0.01]
+FIELDED = {"caught", "run out", "stumped"}
+KEEPER = 4                      # batting position of the wicket-keeper
+# Which of the six bowlers (batting positions 6-11) bowls each over; nobody
+# bowls consecutive overs or more than four.
+BOWLING_PLAN = [0, 1, 0, 1, 2, 3, 2, 3, 4, 5, 4, 5, 2, 3, 0, 1, 4, 5, 0, 1]
+TOSS_FIELD = 0.61
+NO_RESULT = 0.005
+
+MATCH_COLUMNS = ["id", "season", "city", "date", "team1", "team2", "toss_winner", "toss_decision",
+                 "result", "dl_applied", "winner", "win_by_runs", "win_by_wickets", "player_of_match",
+                 "venue", "umpire1", "umpire2", "umpire3"]
+DELIVERY_COLUMNS = ["match_id", "inning", "batting_team", "bowling_team", "over", "ball", "batsman",
+                    "non_striker", "bowler", "is_super_over", "wide_runs", "bye_runs", "legbye_runs",
+                    "noball_runs", "penalty_runs", "batsman_runs", "extra_runs", "total_runs",
+                    "player_dismissed", "dismissal_kind", "fielder"]
+
+
+def season_teams(season):
+    era = FIRST_SEASON + (season - FIRST_SEASON) % SEASONS_PER_SCALE
+    return [team for team in TEAMS if team[4] <= era <= team[5]]
+
+
+def schedule(rng, season, first_id):
+    """Double round robin plus playoffs; returns one dict per match."""
+    teams = season_teams(season)
+    fixtures = [(home, away) for home in teams for away in teams if home is not away]
+    order = rng.permutation(len(fixtures))
+    fixtures = [fixtures[i] for i in order]
+    for _ in range(PLAYOFFS_PER_SEASON):
+        a, b = rng.choice(len(teams), size=2, replace=False)
+        fixtures.append((teams[a], teams[b]))
+
+    import datetime
+    start = datetime.date(season, 4, 5)
+    matches = []
+    for i, (home, away) in enumerate(fixtures):
+        neutral = i >= len(fixtures) - PLAYOFFS_PER_SEASON
+        venue_team = teams[rng.integers(len(teams))] if neutral else home
+        matches.append({
+            "id": first_id + i, "season": season, "date": str(start + datetime.timedelta(days=i * 50 // len(fixtures))),
+            "home": home, "away": away, "venue": venue_team[2], "city": venue_team[3],
+        })
+    return matches
+
+
+def pick_elevens(rng, season_index):
+    """Player ids (one row of 11 per match, in batting order) from each
+    match's season squad.
+
+    The first fifteen of the squad are regulars, so the same core plays and
+    opens most matches while the bench rotates in now and then.
+    """
+    import numpy as np
+
+    weight = rng.random((len(season_index), SQUAD_SIZE)) + np.where(np.arange(SQUAD_SIZE) < 15, 0.0, 0.7)
+    chosen = np.sort(np.argsort(weight, axis=1)[:, :11], axis=1)
+    return chosen + season_index[:, None] * SQUAD_TURNOVER
+
+
+def simulate_innings(rng, n, target=None):
+    """Ball-by-ball simulation of ``n`` innings, vectorised across innings.
+
+    ``target`` (runs to beat, per innings) turns them into chases that stop
+    once it is passed. Positions (batting order 0-10) stand in for players.
+    Returns (columns, totals, wickets).
+    """
+    import numpy as np
+
+    outcome_cdf = {name: np.cumsum(table) for name, table in (("top", TOP_ORDER), ("tail", TAIL))}
+    dismissal_cdf = np.cumsum(DISMISSAL_SHARE)
+    runs_table = np.array(OUTCOME_RUNS)
+    plan = np.array(BOWLING_PLAN)
+
+    legal = np.zeros(n, dtype=np.int16)
+    in_over = np.zeros(n, dtype=np.int16)
+    wickets = np.zeros(n, dtype=np.int16)
+    total = np.zeros(n, dtype=np.int32)
+    striker = np.zeros(n, dtype=np.int16)
+    other = np.ones(n, dtype=np.int16)
+    next_in = np.full(n, 2, dtype=np.int16)
+    active = np.ones(n, dtype=bool)
+    rows = []
+    slot = 0
+    while active.any():
+        idx = np.flatnonzero(active)
+        m = len(idx)
+        u = rng.random((m, 4))
+        wide = u[:, 0] < WIDE
+        no_ball = (~wide) & (u[:, 0] < WIDE + NO_BALL)
+        is_legal = ~(wide | no_ball)
+
+        tail = striker[idx] >= 7
+        cdf = np.where(tail[:, None], outcome_cdf["tail"], outcome_cdf["top"])
+        outcome = (u[:, 1:2] > cdf).sum(axis=1).clip(0, len(OUTCOME_RUNS) - 1)
+        wicket = is_legal & (outcome == 0)
+        batsman_runs = np.where(wide | wicket, 0, runs_table[outcome].clip(0))
+        dot = is_legal & ~wicket & (batsman_runs == 0)
+        legbye = (dot & (u[:, 2] < LEG_BYE)).astype(np.int16)
+        bye = (dot & (u[:, 2] >= LEG_BYE) & (u[:, 2] < LEG_BYE + BYE)).astype(np.int16)
+        kind = np.where(wicket, (u[:, 3:4] > dismissal_cdf).sum(axis=1).clip(0, len(DISMISSALS) - 1), -1)
+        fielder = np.where(np.isin(kind, [DISMISSALS.index(k) for k in FIELDED]),
+                           np.where(kind == DISMISSALS.index("stumped"), KEEPER,
+                                    rng.integers(0, 11, size=m)), -1)
+
+        over = legal[idx] // 6
+        extras = wide.astype(np.int16) + no_ball + legbye + bye
+        rows.append({
+            "innings": idx, "slot": np.full(m, slot), "over": over + 1, "ball": in_over[idx] + 1,
+            "striker": striker[idx].copy(), "non_striker": other[idx].copy(),
+            "bowler": 5 + plan[over], "wide_runs": wide.astype(np.int16),
+            "bye_runs": bye, "legbye_runs": legbye, "noball_runs": no_ball.astype(np.int16),
+            "batsman_runs": batsman_runs, "extra_runs": extras,
+            "total_runs": batsman_runs + extras, "kind": kind, "fielder": fielder,
+        })
+
+        total[idx] += batsman_runs + extras
+        in_over[idx] += 1
+        # A dismissed striker is replaced by the next batsman in the order
+        out = idx[wicket]
+        wickets[out] += 1
+        striker[out] = next_in[out]
+        next_in[out] += 1
+        # Odd runs swap ends, and so does the end of an over
+        swap = idx[((batsman_runs + legbye + bye) % 2 == 1) & ~wicket]
+        striker[swap], other[swap] = other[swap], striker[swap].copy()
+        legal[idx] += is_legal
+        over_done = idx[is_legal & (legal[idx] % 6 == 0)]
+        in_over[over_done] = 0
+        striker[over_done], other[over_done] = other[over_done], striker[over_done].copy()
+
+        finished = (wickets >= 10) | (legal >= 120)
+        if target is not None:
+            finished |= total > target
+        active &= ~finished
+        slot += 1
+
+    columns = {key: np.concatenate([r[key] for r in rows]) for key in rows[0]}
+    return columns, total, wickets
+
+
+def generate_chunk(rng, matches, season_index_of):
+    """Simulate the listed matches; returns (matches frame, deliveries frame)."""
+    import numpy as np
+    import pandas as pd
+
+    n = len(matches)
+    home = [m["home"] for m in matches]
+    away = [m["away"] for m in matches]
+    toss_home = rng.random(n) < 0.5
+    field = rng.random(n) < TOSS_FIELD
+    # The toss winner fields first when choosing to field, bats otherwise
+    home_bats_first = np.where(toss_home, ~field, field)
+    first = [h if b else a for h, a, b in zip(home, away, home_bats_first)]
+    second = [a if b else h for h, a, b in zip(home, away, home_bats_first)]
+
+    season_index = np.array([season_index_of(m["season"]) for m in matches])
+    elevens = {"first": pick_elevens(rng, season_index), "second": pick_elevens(rng, season_index)}
+
+    innings1, total1, _ = simulate_innings(rng, n)
+    innings2, total2, wickets2 = simulate_innings(rng, n, total1)
+    no_result = rng.random(n) < NO_RESULT
+
+    frames = []
+    for inning, sim, batting, bowling, bat_xi, bowl_xi in (
+            (1, innings1, first, second, elevens["first"], elevens["second"]),
+            (2, innings2, second, first, elevens["second"], elevens["first"])):
+        i = sim["innings"]
+        keep = ~no_result[i] if inning == 2 else np.ones(len(i), dtype=bool)
+        i = i[keep]
+        col = {k: v[keep] for k, v in sim.items()}
+        bat_prefix = np.array([t[1] for t in batting])[i]
+        bowl_prefix = np.array([t[1] for t in bowling])[i]
+
+        def names(prefix, ids):
+            return pd.Series(prefix).str.cat(pd.Series(ids).astype(str), sep="_P").to_numpy(dtype=object)
+
+        kind = col["kind"]
+        has_wicket = kind >= 0
+        dismissed = np.where(has_wicket, names(bat_prefix, bat_xi[i, col["striker"]]), None)
+        fielder = np.where(col["fielder"] >= 0,
+                           names(bowl_prefix, bowl_xi[i, col["fielder"].clip(0)]), None)
+        frames.append(pd.DataFrame({
+            "order": i * 2 + (inning - 1), "slot": col["slot"],
+            "match_id": np.array([m["id"] for m in matches])[i],
+            "inning": inning,
+            "batting_team": np.array([t[0] for t in batting], dtype=object)[i],
+            "bowling_team": np.array([t[0] for t in bowling], dtype=object)[i],
+            "over": col["over"], "ball": col["ball"],
+            "batsman": names(bat_prefix, bat_xi[i, col["striker"]]),
+            "non_striker": names(bat_prefix, bat_xi[i, col["non_striker"]]),
+            "bowler": names(bowl_prefix, bowl_xi[i, col["bowler"]]),
+            "is_super_over": 0,
+            "wide_runs": col["wide_runs"], "bye_runs": col["bye_runs"],
+            "legbye_runs": col["legbye_runs"], "noball_runs": col["noball_runs"],
+            "penalty_runs": 0, "batsman_runs": col["batsman_runs"],
+            "extra_runs": col["extra_runs"], "total_runs": col["total_runs"],
+            "player_dismissed": dismissed,
+            "dismissal_kind": np.where(has_wicket, np.array(DISMISSALS, dtype=object)[kind.clip(0)], None),
+            "fielder": fielder,
+        }))
+    deliveries = pd.concat(frames, ignore_index=True).sort_values(["order", "slot"], kind="stable")
+    deliveries = deliveries[DELIVERY_COLUMNS].reset_index(drop=True)
+
+    # Results follow from the simulated scores
+    tie = (total1 == total2) & ~no_result
+    chased = total2 > total1
+    tie_first = rng.random(n) < 0.5
+    first_wins = np.where(tie, tie_first, ~chased)
+    winner = np.where(no_result, None,
+                      np.where(first_wins, [t[0] for t in first], [t[0] for t in second]))
+    normal = ~tie & ~no_result
+    batting = deliveries.groupby(["match_id", "batting_team", "batsman"], sort=False)["batsman_runs"].sum()
+    top_scorer = batting.reset_index().sort_values("batsman_runs", ascending=False, kind="stable") \
+        .drop_duplicates(["match_id", "batting_team"]).set_index(["match_id", "batting_team"])["batsman"]
+    umpires = rng.choice(UMPIRES, size=(n, 2), replace=True)
+
+    matches_frame = pd.DataFrame({
+        "id": [m["id"] for m in matches],
+        "season": [m["season"] for m in matches],
+        "city": [m["city"] for m in matches],
+        "date": [m["date"] for m in matches],
+        "team1": [t[0] for t in home],
+        "team2": [t[0] for t in away],
+        "toss_winner": [h[0] if th else a[0] for h, a, th in zip(home, away, toss_home)],
+        "toss_decision": np.where(field, "field", "bat"),
+        "result": np.where(no_result, "no result", np.where(tie, "tie", "normal")),
+        "dl_applied": 0,
+        "winner": winner,
+        "win_by_runs": np.where(normal & first_wins, total1 - total2, 0),
+        "win_by_wickets": np.where(normal & ~first_wins, 10 - wickets2, 0),
+        "player_of_match": [top_scorer.get((m["id"], w)) if w is not None else None
+                            for m, w in zip(matches, winner)],
+        "venue": [m["venue"] for m in matches],
+        "umpire1": [f"Umpire_{u}" for u in umpires[:, 0]],
+        "umpire2": [f"Umpire_{u}" for u in (umpires[:, 1] + 1 + umpires[:, 0]) % UMPIRES],
+        "umpire3": None,
+    })
+    return matches_frame[MATCH_COLUMNS], deliveries
+
+
+def generate(scale, output_folder, seed=0):
+    """Write matches.csv and deliveries.csv for ``scale`` x the real data.
+
+    Seasons are simulated a chunk at a time and appended to the CSVs, so
+    memory stays flat even at 100x. Returns {"matches": n, "deliveries": n}.
+    """
+    import numpy as np
+
+    seasons = max(1, round(SEASONS_PER_SCALE * scale))
+    rng = np.random.default_rng([GENERATOR_VERSION, seed])
+    os.makedirs(output_folder, exist_ok=True)
+    paths = {name: os.path.join(output_folder, f"{name}.csv") for name in ("matches", "deliveries")}
+    counts = {"matches": 0, "deliveries": 0}
+    next_id = 1
+    for start in range(0, seasons, SEASONS_PER_CHUNK):
+        fixtures = []
+        for season in range(FIRST_SEASON + start, FIRST_SEASON + min(start + SEASONS_PER_CHUNK, seasons)):
+            fixtures.extend(schedule(rng, season, next_id + len(fixtures)))
+        next_id += len(fixtures)
+        matches, deliveries = generate_chunk(rng, fixtures, lambda season: season - FIRST_SEASON)
+        for name, frame in (("matches", matches), ("deliveries", deliveries)):
+            frame.to_csv(paths[name], mode="w" if start == 0 else "a", header=start == 0, index=False)
+            counts[name] += len(frame)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic IPL data.")
+    parser.add_argument("--scale", type=float, default=1.0, help="size relative to the real data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True, help="folder for matches.csv and deliveries.csv")
+    args = parser.parse_args(argv)
+
+    counts = generate(args.scale, args.output, seed=args.seed)
+    print(f"✅ {counts['matches']} matches, {counts['deliveries']} deliveries in {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# build_cache.py
+
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import threading
+
+from dataset import CACHE_FOLDER
+
+MANIFEST_PATH = os.path.join(CACHE_FOLDER, "build_manifest.json")
+
+
+def digest(*parts):
+    """Stable sha256 over JSON-serialisable parts (anything else via str)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def module_version(name):
+    """Hash of a module's source file (read once per process)."""
+    module = importlib.import_module(name)
+    try:
+        source = inspect.getsource(module)
+    except (OSError, TypeError):
+        source = name
+    return digest(source)
+
+
+def code_version(fn, modules=()):
+    """Hash of the source of the module defining ``fn`` and of ``modules``
+    (names of the modules whose helpers it calls), so editing a report or
+    anything it relies on invalidates its outputs."""
+    own = getattr(fn, "__module__", None)
+    names = sorted({own, *modules} - {None})
+    return digest([module_version(name) for name in names], getattr(fn, "__qualname__", repr(fn)))
+
+
+class BuildManifest:
+    """Records, per build step, the fingerprint its outputs were built from.
+
+    A step whose fingerprint is unchanged and whose target files all still
+    exist is fresh and can be skipped; ``force`` treats every step as stale.
+    """
+
+    def __init__(self, path=MANIFEST_PATH, force=False):
+        self.path = path
+        self.force = force
+        self._lock = threading.Lock()
+        self._unverified = {}
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_fresh(self, key, fingerprint, targets):
+        if self.force:
+            return False
+        entry = self.entries.get(key)
+        return (entry is not None and entry["fingerprint"] == fingerprint
+                and all(os.path.exists(target) for target in targets))
+
+    def outputs(self, key):
+        return self.entries[key].get("outputs", {})
+
+    def record(self, key, fingerprint, outputs=None):
+        with self._lock:
+            self.entries[key] = {"fingerprint": fingerprint, "outputs": outputs or {}}
+
+    def save(self):
+        with self._lock:
+            for key, (fingerprint, targets) in self._unverified.items():
+                if all(os.path.exists(target) for target in targets):
+                    self.entries[key] = {"fingerprint": fingerprint, "outputs": {}}
+            self._unverified.clear()
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def run_if_stale(self, key, fn, targets, params=None, code=()):
+        """Call ``fn()`` unless ``targets`` were already built from the same
+        ``params`` and code (``fn``'s module and the modules named in
+        ``code``). Returns True when ``fn`` actually ran."""
+        fingerprint = digest(key, code_version(fn, code), params)
+        if self.is_fresh(key, fingerprint, targets):
+            return False
+        fn()
+        # Recorded on save() once the targets exist: functions that report
+        # their own errors leave them missing, and charts land asynchronously.
+        with self._lock:
+            self._unverified[key] = (fingerprint, targets)
+        return True
@@ -0,0 +1,210 @@
+# chart_service.py
+
+import atexit
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from dataset import CACHE_FOLDER
+
+CHART_CACHE_FOLDER = os.path.join(CACHE_FOLDER, "charts")
+CHART_CACHE_FILES = 256     # rendered PNGs kept; the least recently used go first
+
+# Bump when render_chart changes how an existing spec is drawn
+RENDERER_VERSION = 1
+
+
+def use_headless_backend():
+    """Batch runs must never block on a GUI window."""
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+
+
+def chart_key(frame, spec):
+    """Hash of the plotted data and the chart spec."""
+    import pandas as pd
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps([RENDERER_VERSION, spec], sort_keys=True, default=str).encode("utf-8"))
+    digest.update(json.dumps([list(map(str, frame.columns)), list(map(str, frame.dtypes))]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def render_chart(frame, spec, path):
+    """Draw one chart to ``path``. Runs in a worker, so it touches no pyplot state."""
+    use_headless_backend()
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=spec.get("figsize", (8, 6)))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    kind = spec["kind"]
+    x, y = spec.get("x"), spec.get("y")
+
+    if kind == "bar":
+        frame.plot(x=x, y=y, kind="bar", legend=False, color=spec.get("color"), ax=ax)
+    elif kind == "barh":
+        ax.barh(frame[x], frame[y], color=spec.get("color"))
+    elif kind == "column":
+        ax.bar(frame[x], frame[y], color=spec.get("color"))
+    else:
+        import seaborn as sns
+        sns.set_theme(style=spec.get("style", "ticks"))
+        if kind == "sns_bar":
+            sns.barplot(data=frame, x=x, y=y, hue=x, palette=spec.get("palette"), legend=False, ax=ax)
+        elif kind == "sns_line":
+            sns.lineplot(data=frame, x=x, y=y, hue=spec.get("hue"), marker="o",
+                         palette=spec.get("palette"), ax=ax)
+        elif kind == "heatmap":
+            sns.heatmap(frame, annot=True, fmt=spec.get("fmt", ".1f"), cmap=spec.get("cmap"),
+                        linewidths=0.5, ax=ax)
+        else:
+            raise ValueError(f"Unknown chart kind: {kind}")
+
+    ax.set_title(spec.get("title", ""))
+    if "xlabel" in spec:
+        ax.set_xlabel(spec["xlabel"])
+    if "ylabel" in spec:
+        ax.set_ylabel(spec["ylabel"])
+    if "rotation" in spec:
+        for label in ax.get_xticklabels():
+            label.set_rotation(spec["rotation"])
+            label.set_ha(spec.get("ha", "center"))
+    fig.tight_layout()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fig.savefig(tmp_path, format="png")
+    os.replace(tmp_path, path)
+    return path
+
+
+class ChartService:
+    """Renders charts on a worker pool, caching each PNG by chart_key.
+
+    ``submit`` returns at once with a Future for the output path. A chart
+    whose data and spec were drawn before is copied from the cache instead
+    of being rendered again. The cache keeps ``max_cache_files`` PNGs.
+    """
+
+    def __init__(self, max_workers=2, executor="process", cache_folder=CHART_CACHE_FOLDER,
+                 max_cache_files=CHART_CACHE_FILES):
+        self.cache_folder = cache_folder
+        self.max_cache_files = max_cache_files
+        self.max_workers = max_workers
+        self.executor = executor
+        self._pool = None
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.renders = 0
+        use_headless_backend()
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.executor == "process":
+                # The pool may be created from a worker thread while others
+                # run; forking then could copy a lock some thread holds.
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def submit(self, frame, spec, path):
+        key = chart_key(frame, spec)
+        cached = os.path.join(self.cache_folder, f"{key}.png")
+        result = Future()
+
+        if os.path.exists(cached):
+            with self._lock:
+                self.hits += 1
+            self._copy(cached, path)
+            try:
+                os.utime(cached)    # recently used: pruned last
+            except OSError:
+                pass
+            result.set_result(path)
+            return result
+
+        with self._lock:
+            self.renders += 1
+            self._pending.add(result)
+            rendered = self._get_pool().submit(render_chart, frame, spec, cached)
+
+        def publish(rendered):
+            try:
+                self._copy(rendered.result(), path)
+                self._prune()
+                result.set_result(path)
+            except Exception as e:
+                result.set_exception(e)
+
+        rendered.add_done_callback(publish)
+        return result
+
+    def _prune(self):
+        files = [os.path.join(self.cache_folder, name) for name in os.listdir(self.cache_folder)
+                 if name.endswith(".png")]
+        if len(files) > self.max_cache_files:
+            files.sort(key=os.path.getmtime)
+            for old in files[:len(files) - self.max_cache_files]:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _copy(source, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        shutil.copyfile(source, path)
+
+    def wait(self):
+        """Block until every submitted chart is on disk; re-raise the first failure."""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        errors = [future.exception() for future in pending]
+        errors = [e for e in errors if e is not None]
+        if errors:
+            raise errors[0]
+
+    def shutdown(self):
+        try:
+            self.wait()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_chart_service():
+    """Process-wide chart service, drained automatically at exit.
+
+    Inside a pool worker process (main.py --executor process) charts render
+    on threads: a process pool nested there is never shut down, and the
+    worker hangs at exit waiting for its children.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            executor = "process" if multiprocessing.parent_process() is None else "thread"
+            _service = ChartService(max_workers=int(os.environ.get("IPL_CHART_WORKERS", "2")),
+                                    executor=executor)
+            atexit.register(_service.shutdown)
+        return _service
+
+
+def wait_for_charts():
+    """Drain the shared service, if any chart was ever submitted."""
+    if _service is not None:
+        _service.wait()
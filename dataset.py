@@ -0,0 +1,269 @@
+# dataset.py
+
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+
+from memory import policy_key
+
+# pandas (and pyarrow) are imported inside the functions that need them so
+# that importing this module stays cheap for the CLI entry points.
+
+DATA_FOLDER = "data"
+CACHE_FOLDER = "cache"
+
+# Logical table name -> source CSV inside the data folder
+TABLES = {
+    "matches": "matches.csv",
+    "deliveries": "deliveries.csv",
+}
+
+# Explicit column schema per table. Integer columns get the smallest type that
+# holds IPL values (memory.py widens it when a file's values need more);
+# string columns are grouped into categorical "domains" so that columns
+# holding the same kind of value (e.g. team1/team2/winner) share one set of
+# categories and stay comparable with each other. Columns not listed here
+# are downcast by the same policy.
+SCHEMAS = {
+    "matches": {
+        "id": "int32",
+        "season": "int16",
+        "dl_applied": "int8",
+        "win_by_runs": "int16",
+        "win_by_wickets": "int8",
+        "city": "city",
+        "team1": "team",
+        "team2": "team",
+        "toss_winner": "team",
+        "winner": "team",
+        "toss_decision": "toss_decision",
+        "result": "result",
+        "player_of_match": "player",
+        "venue": "venue",
+        "umpire1": "umpire",
+        "umpire2": "umpire",
+        "umpire3": "umpire",
+    },
+    "deliveries": {
+        "match_id": "int32",
+        "inning": "int8",
+        "over": "int8",
+        "ball": "int8",
+        "is_super_over": "int8",
+        "wide_runs": "int8",
+        "bye_runs": "int8",
+        "legbye_runs": "int8",
+        "noball_runs": "int8",
+        "penalty_runs": "int8",
+        "batsman_runs": "int8",
+        "extra_runs": "int8",
+        "total_runs": "int8",
+        "batting_team": "team",
+        "bowling_team": "team",
+        "batsman": "player",
+        "non_striker": "player",
+        "bowler": "player",
+        "player_dismissed": "player",
+        "fielder": "player",
+        "dismissal_kind": "dismissal_kind",
+    },
+}
+
+# Without pyarrow the typed frame is still cached, just as a pickle
+COLUMNAR_FORMAT = "parquet" if importlib.util.find_spec("pyarrow") else "pkl"
+
+
+def read_csv_chunks(path, schema, chunksize):
+    """Iterate over a CSV in frames of ``chunksize`` rows, numbers downcast
+    (see memory.py).
+
+    String columns stay plain objects: categories built per chunk would not
+    line up from one chunk to the next.
+    """
+    import pandas as pd
+
+    from memory import downcast
+
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        yield downcast(chunk, schema, categorical=False)[0]
+
+
+def read_typed_csv(path, schema, report=False):
+    """Parse a raw CSV and downcast it under the memory policy (memory.py):
+    the declared int widths where the values fit, shared categories per
+    string domain. With ``report``, returns (frame, per-column report)."""
+    import pandas as pd
+
+    from memory import downcast, optimize
+
+    frame = pd.read_csv(path)
+    if report:
+        return optimize(frame, schema)
+    return downcast(frame, schema)[0]
+
+
+def write_columnar(frame, path):
+    if COLUMNAR_FORMAT == "parquet":
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_pickle(path)
+
+
+def read_columnar(path, columns=None):
+    import pandas as pd
+
+    if COLUMNAR_FORMAT == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    frame = pd.read_pickle(path)
+    return frame if columns is None else frame[columns]
+
+
+def file_fingerprint(path, known=None):
+    """Return {size, mtime_ns, sha256} for a file.
+
+    If ``known`` carries the same size and mtime the stored hash is trusted,
+    so an unchanged file is never re-read just to be fingerprinted.
+    """
+    stat = os.stat(path)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if known and known.get("size") == stat.st_size and known.get("mtime_ns") == stat.st_mtime_ns:
+        fingerprint["sha256"] = known["sha256"]
+        return fingerprint
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    fingerprint["sha256"] = digest.hexdigest()
+    return fingerprint
+
+
+class IPLDataset:
+    """Lazily loaded IPL tables, parsed at most once per process.
+
+    The first load of a table converts its CSV into a typed columnar file
+    (see SCHEMAS) stored next to a fingerprint of the source CSV, the key of
+    the memory policy that typed it and its memory report; later loads read
+    that file and skip CSV parsing entirely until the CSV, the schema or the
+    policy changes.
+    """
+
+    def __init__(self, data_folder=DATA_FOLDER, cache_folder=CACHE_FOLDER, use_disk_cache=True):
+        self.data_folder = data_folder
+        self.cache_folder = cache_folder
+        self.use_disk_cache = use_disk_cache
+        self.memory_reports = {}    # table -> memory.optimize report, also for cached loads
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    @property
+    def matches(self):
+        return self.table("matches")
+
+    @property
+    def deliveries(self):
+        return self.table("deliveries")
+
+    def source_path(self, name):
+        if name not in TABLES:
+            raise KeyError(f"Unknown table: {name}")
+        return os.path.join(self.data_folder, TABLES[name])
+
+    def version(self, name):
+        """Content hash of a table's source CSV, without loading the table."""
+        _, meta_path = self._cache_paths(name)
+        return file_fingerprint(self.source_path(name), known=self._read_meta(meta_path))["sha256"]
+
+    def table(self, name):
+        with self._lock:
+            if name not in self._frames:
+                self._frames[name] = self._load(name)
+            return self._frames[name]
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._frames.clear()
+            else:
+                self._frames.pop(name, None)
+
+    def ingest(self):
+        """Convert every source CSV to its columnar file (no-op if current)."""
+        for name in TABLES:
+            if os.path.exists(self.source_path(name)):
+                self.table(name)
+
+    # --- disk cache ---
+
+    def _cache_paths(self, name):
+        base = os.path.join(self.cache_folder, name)
+        return f"{base}.{COLUMNAR_FORMAT}", base + ".meta.json"
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load(self, name):
+        source = self.source_path(name)
+        schema = SCHEMAS.get(name, {})
+        if not self.use_disk_cache:
+            return self._parse(name, source, schema)
+
+        import pandas as pd
+
+        frame_path, meta_path = self._cache_paths(name)
+        meta = self._read_meta(meta_path)
+        fingerprint = file_fingerprint(source, known=meta)
+        policy = policy_key(schema)
+
+        if (meta and meta.get("sha256") == fingerprint["sha256"] and meta.get("policy") == policy
+                and "memory" in meta and os.path.exists(frame_path)):
+            frame = read_columnar(frame_path)
+            self.memory_reports[name] = pd.DataFrame(meta["memory"])
+            if any(meta.get(key) != value for key, value in fingerprint.items()):
+                # Same content, new mtime (e.g. a fresh checkout): refresh the key
+                self._write_meta(meta_path, {**meta, **fingerprint})
+            return frame
+
+        frame = self._parse(name, source, schema)
+        os.makedirs(self.cache_folder, exist_ok=True)
+        write_columnar(frame, frame_path)
+        self._write_meta(meta_path, {**fingerprint, "policy": policy,
+                                     "memory": self.memory_reports[name].to_dict("records")})
+        return frame
+
+    def _parse(self, name, source, schema):
+        frame, self.memory_reports[name] = read_typed_csv(source, schema, report=True)
+        return frame
+
+    def _write_meta(self, meta_path, meta):
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+
+
+_default_dataset = None
+_default_lock = threading.Lock()
+
+
+def get_dataset():
+    """Process-wide shared dataset used by the report entry points."""
+    global _default_dataset
+    with _default_lock:
+        if _default_dataset is None:
+            _default_dataset = IPLDataset()
+        return _default_dataset
+
+
+if __name__ == "__main__":
+    dataset = get_dataset()
+    dataset.ingest()
+    for name in TABLES:
+        if name in dataset._frames:
+            frame = dataset._frames[name]
+            mb = frame.memory_usage(deep=True).sum() / 1e6
+            print(f"✅ {name}: {len(frame)} rows, {mb:.1f} MB in memory ({COLUMNAR_FORMAT})")
@@ -0,0 +1,455 @@
+# db_schema.py
+
+import os
+import sqlite3
+
+# Connection-time tuning: WAL lets readers run alongside the ingest writer,
+# and a larger page cache plus memory-mapped I/O keep the deliveries table
+# and its indexes hot across the report queries.
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -65536,        # 64 MB (negative = KiB)
+    "mmap_size": 268435456,      # 256 MB
+    "temp_store": "MEMORY",
+}
+
+MATCHES_DDL = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    season INTEGER NOT NULL,
+    city TEXT,
+    date TEXT,
+    team1 TEXT NOT NULL,
+    team2 TEXT NOT NULL,
+    toss_winner TEXT,
+    toss_decision TEXT,
+    result TEXT,
+    dl_applied INTEGER,
+    winner TEXT,
+    win_by_runs INTEGER,
+    win_by_wickets INTEGER,
+    player_of_match TEXT,
+    venue TEXT,
+    umpire1 TEXT,
+    umpire2 TEXT,
+    umpire3 TEXT
+)
+"""
+
+DELIVERIES_DDL = """
+CREATE TABLE IF NOT EXISTS deliveries (
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    inning INTEGER NOT NULL,
+    batting_team TEXT,
+    bowling_team TEXT,
+    over INTEGER NOT NULL,
+    ball INTEGER NOT NULL,
+    batsman TEXT,
+    non_striker TEXT,
+    bowler TEXT,
+    is_super_over INTEGER,
+    wide_runs INTEGER,
+    bye_runs INTEGER,
+    legbye_runs INTEGER,
+    noball_runs INTEGER,
+    penalty_runs INTEGER,
+    batsman_runs INTEGER,
+    extra_runs INTEGER,
+    total_runs INTEGER,
+    player_dismissed TEXT,
+    dismissal_kind TEXT,
+    fielder TEXT
+)
+"""
+
+# Optional normalized layout (IPL_NORMALIZED_SCHEMA=1 or ingest.py
+# --normalized): the long strings repeated on every row live once in lookup
+# tables, the fact tables hold integer ids, and views named matches and
+# deliveries join the names back so every query reads them unchanged.
+LOOKUP_TABLES = ["teams", "players", "venues", "umpires"]
+
+# Fact table -> {column of the view: lookup table its id refers to}
+NORMALIZED_COLUMNS = {
+    "matches": {
+        "team1": "teams", "team2": "teams", "toss_winner": "teams", "winner": "teams",
+        "player_of_match": "players", "venue": "venues",
+        "umpire1": "umpires", "umpire2": "umpires", "umpire3": "umpires",
+    },
+    "deliveries": {
+        "batting_team": "teams", "bowling_team": "teams",
+        "batsman": "players", "non_striker": "players", "bowler": "players",
+        "player_dismissed": "players", "fielder": "players",
+    },
+}
+FACT_TABLES = {"matches": "match_facts", "deliveries": "delivery_facts"}
+
+MATCH_FACTS_DDL = """
+CREATE TABLE IF NOT EXISTS match_facts (
+    id INTEGER PRIMARY KEY,
+    season INTEGER NOT NULL,
+    city TEXT,
+    date TEXT,
+    team1_id INTEGER NOT NULL REFERENCES teams(id),
+    team2_id INTEGER NOT NULL REFERENCES teams(id),
+    toss_winner_id INTEGER REFERENCES teams(id),
+    toss_decision TEXT,
+    result TEXT,
+    dl_applied INTEGER,
+    winner_id INTEGER REFERENCES teams(id),
+    win_by_runs INTEGER,
+    win_by_wickets INTEGER,
+    player_of_match_id INTEGER REFERENCES players(id),
+    venue_id INTEGER REFERENCES venues(id),
+    umpire1_id INTEGER REFERENCES umpires(id),
+    umpire2_id INTEGER REFERENCES umpires(id),
+    umpire3_id INTEGER REFERENCES umpires(id)
+)
+"""
+
+DELIVERY_FACTS_DDL = """
+CREATE TABLE IF NOT EXISTS delivery_facts (
+    match_id INTEGER NOT NULL REFERENCES match_facts(id),
+    inning INTEGER NOT NULL,
+    batting_team_id INTEGER REFERENCES teams(id),
+    bowling_team_id INTEGER REFERENCES teams(id),
+    over INTEGER NOT NULL,
+    ball INTEGER NOT NULL,
+    batsman_id INTEGER REFERENCES players(id),
+    non_striker_id INTEGER REFERENCES players(id),
+    bowler_id INTEGER REFERENCES players(id),
+    is_super_over INTEGER,
+    wide_runs INTEGER,
+    bye_runs INTEGER,
+    legbye_runs INTEGER,
+    noball_runs INTEGER,
+    penalty_runs INTEGER,
+    batsman_runs INTEGER,
+    extra_runs INTEGER,
+    total_runs INTEGER,
+    player_dismissed_id INTEGER REFERENCES players(id),
+    dismissal_kind TEXT,
+    fielder_id INTEGER REFERENCES players(id)
+)
+"""
+
+# Dismissal kinds credited to the bowler, in the column order of bowling_summary
+BOWLER_DISMISSALS = ["caught", "bowled", "lbw", "stumped", "caught and bowled", "hit wicket"]
+
+# Dismissals that do not count as a wicket in the score
+NOT_OUT_DISMISSALS = ("retired hurt",)
+
+# venue_toss outcomes: who won (the toss winner, the other team or nobody)
+# and how (batting first, i.e. by runs, or chasing)
+TOSS_OUTCOMES = ["toss_winner_bat_first", "toss_winner_chasing", "other_bat_first", "other_chasing", "no_result"]
+
+# Materialized per-season summaries kept in step with deliveries/matches by
+# aggregates.py, so leaderboards never re-aggregate the ball-by-ball table.
+SUMMARY_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS batting_summary (
+        season INTEGER NOT NULL,
+        batsman TEXT NOT NULL,
+        runs INTEGER NOT NULL DEFAULT 0,
+        balls INTEGER NOT NULL DEFAULT 0,
+        fours INTEGER NOT NULL DEFAULT 0,
+        sixes INTEGER NOT NULL DEFAULT 0,
+        dismissals INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (season, batsman)
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS bowling_summary (
+        season INTEGER NOT NULL,
+        bowler TEXT NOT NULL,
+        balls INTEGER NOT NULL DEFAULT 0,
+        runs_conceded INTEGER NOT NULL DEFAULT 0,
+        wickets INTEGER NOT NULL DEFAULT 0,
+        {", ".join(f"{kind.replace(' ', '_')} INTEGER NOT NULL DEFAULT 0" for kind in BOWLER_DISMISSALS)},
+        PRIMARY KEY (season, bowler)
+    )
+    """,
+    # Per match, innings phase and player: small enough to re-aggregate in a
+    # few milliseconds for leaderboards filtered by venue, team or phase.
+    """
+    CREATE TABLE IF NOT EXISTS batting_splits (
+        match_id INTEGER NOT NULL,
+        phase TEXT NOT NULL,
+        team TEXT,
+        batsman TEXT NOT NULL,
+        runs INTEGER NOT NULL DEFAULT 0,
+        balls INTEGER NOT NULL DEFAULT 0,
+        fours INTEGER NOT NULL DEFAULT 0,
+        sixes INTEGER NOT NULL DEFAULT 0,
+        dismissals INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (match_id, phase, batsman)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS bowling_splits (
+        match_id INTEGER NOT NULL,
+        phase TEXT NOT NULL,
+        team TEXT,
+        bowler TEXT NOT NULL,
+        balls INTEGER NOT NULL DEFAULT 0,
+        runs_conceded INTEGER NOT NULL DEFAULT 0,
+        wickets INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (match_id, phase, bowler)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS team_summary (
+        season INTEGER NOT NULL,
+        team TEXT NOT NULL,
+        matches INTEGER NOT NULL DEFAULT 0,
+        wins INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (season, team)
+    )
+    """,
+    # Matchup index (analytics_index.py): results per season and ordered team
+    # pair, and match outcomes per venue and toss decision. Unknown venues
+    # and toss decisions are stored as ''.
+    """
+    CREATE TABLE IF NOT EXISTS head_to_head (
+        season INTEGER NOT NULL,
+        team TEXT NOT NULL,
+        opponent TEXT NOT NULL,
+        played INTEGER NOT NULL DEFAULT 0,
+        won INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (season, team, opponent)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS venue_toss (
+        venue TEXT NOT NULL,
+        toss_decision TEXT NOT NULL,
+        outcome TEXT NOT NULL,
+        matches INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (venue, toss_decision, outcome)
+    )
+    """,
+]
+
+# Checkpoints of the live ball-by-ball aggregates (live_feed.py): running
+# totals as of ``offset`` bytes into the feed, written in one transaction.
+LIVE_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS live_batting (
+        batsman TEXT PRIMARY KEY,
+        runs INTEGER NOT NULL,
+        balls INTEGER NOT NULL,
+        fours INTEGER NOT NULL,
+        sixes INTEGER NOT NULL,
+        dismissals INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS live_bowling (
+        bowler TEXT PRIMARY KEY,
+        balls INTEGER NOT NULL,
+        runs_conceded INTEGER NOT NULL,
+        wickets INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS live_innings (
+        match_id INTEGER NOT NULL,
+        inning INTEGER NOT NULL,
+        batting_team TEXT,
+        runs INTEGER NOT NULL,
+        wickets INTEGER NOT NULL,
+        legal_balls INTEGER NOT NULL,
+        PRIMARY KEY (match_id, inning)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS live_feed (
+        feed TEXT PRIMARY KEY,
+        offset INTEGER NOT NULL,
+        balls INTEGER NOT NULL,
+        match_id INTEGER,
+        inning INTEGER
+    )
+    """,
+]
+
+# Each index is matched to a query in sql_queries.py / run_queries.py / final.py
+# and covers every column that query reads, so leaderboards are answered from
+# the index alone without touching the table rows.
+INDEXES = {
+    # ball-by-ball order within a match (scorecards, per-match lookups)
+    "idx_deliveries_match_ball": "deliveries (match_id, inning, over, ball)",
+    # run leaderboards and six counts grouped by batsman
+    "idx_deliveries_batsman_runs": "deliveries (batsman, batsman_runs)",
+    # wicket leaderboards filtered on dismissal kind, plus runs conceded so the
+    # fused per-bowler scan in run_queries.run_batch is covered too
+    "idx_deliveries_bowler_dismissal": "deliveries (bowler, dismissal_kind, total_runs)",
+    # economy: runs conceded and balls bowled per bowler
+    "idx_deliveries_bowler_runs": "deliveries (bowler, total_runs, ball)",
+    "idx_matches_winner": "matches (winner)",
+    "idx_matches_season": "matches (season)",
+    "idx_matches_venue": "matches (venue)",
+    # appearances via team1 UNION ALL team2
+    "idx_matches_team1": "matches (team1)",
+    "idx_matches_team2": "matches (team2)",
+    # all-season leaderboards over the summary tables
+    "idx_batting_summary_player": "batting_summary (batsman, runs, sixes, balls)",
+    "idx_bowling_summary_player": "bowling_summary (bowler, wickets, runs_conceded, balls)",
+    "idx_team_summary_team": "team_summary (team, matches, wins)",
+    # leaderboards filtered by team (venue and season filters go through matches)
+    "idx_batting_splits_team": "batting_splits (team, phase)",
+    "idx_bowling_splits_team": "bowling_splits (team, phase)",
+    "idx_batting_splits_phase": "batting_splits (phase, batsman, runs, balls, sixes)",
+    "idx_bowling_splits_phase": "bowling_splits (phase, bowler, balls, runs_conceded, wickets)",
+}
+
+# The indexes on matches and deliveries above, on the normalized fact tables
+NORMALIZED_INDEXES = {
+    "idx_delivery_facts_match_ball": "delivery_facts (match_id, inning, over, ball)",
+    "idx_delivery_facts_batsman_runs": "delivery_facts (batsman_id, batsman_runs)",
+    "idx_delivery_facts_bowler_dismissal": "delivery_facts (bowler_id, dismissal_kind, total_runs)",
+    "idx_delivery_facts_bowler_runs": "delivery_facts (bowler_id, total_runs, ball)",
+    "idx_match_facts_winner": "match_facts (winner_id)",
+    "idx_match_facts_season": "match_facts (season)",
+    "idx_match_facts_venue": "match_facts (venue_id)",
+    "idx_match_facts_team1": "match_facts (team1_id)",
+    "idx_match_facts_team2": "match_facts (team2_id)",
+}
+
+
+def apply_pragmas(conn):
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def connect(db_path, read_only=False, check_same_thread=True):
+    """Open the analytics database with the tuned pragmas applied.
+
+    Pass ``check_same_thread=False`` for connections handed between threads
+    (a pool); each must still be used by one thread at a time.
+    """
+    if read_only:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=check_same_thread)
+        for name in ("cache_size", "mmap_size", "temp_store"):
+            conn.execute(f"PRAGMA {name} = {PRAGMAS[name]}")
+        return conn
+    return apply_pragmas(sqlite3.connect(db_path, check_same_thread=check_same_thread))
+
+
+def is_normalized(conn):
+    """Whether the database stores matches and deliveries as fact tables."""
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'match_facts'").fetchone()
+    return row is not None
+
+
+def create_schema(conn, normalized=None):
+    """Create the typed tables and their indexes if they do not exist yet.
+
+    ``normalized`` (default: IPL_NORMALIZED_SCHEMA=1) picks the lookup-table
+    layout for a new database; an existing database keeps the layout it
+    was created with.
+    """
+    if normalized is None:
+        normalized = os.environ.get("IPL_NORMALIZED_SCHEMA") == "1"
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'matches'").fetchone() is not None
+    normalized = is_normalized(conn) if exists else normalized
+    if normalized:
+        create_normalized_tables(conn)
+    else:
+        conn.execute(MATCHES_DDL)
+        conn.execute(DELIVERIES_DDL)
+    for ddl in SUMMARY_DDL:
+        conn.execute(ddl)
+    create_indexes(conn, normalized)
+
+
+def create_live_tables(conn):
+    for ddl in LIVE_DDL:
+        conn.execute(ddl)
+
+
+def create_normalized_tables(conn):
+    for table in LOOKUP_TABLES:
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    conn.execute(MATCH_FACTS_DDL)
+    conn.execute(DELIVERY_FACTS_DDL)
+    for view, facts in FACT_TABLES.items():
+        conn.execute(_view_ddl(conn, view, facts))
+
+
+def _view_ddl(conn, view, facts):
+    """CREATE VIEW giving ``facts`` its plain column names and order back.
+
+    Names are looked up with scalar subqueries rather than joins, so a query
+    only pays for the name columns it actually reads.
+    """
+    lookups = NORMALIZED_COLUMNS[view]
+    columns = []
+    for row in conn.execute(f"PRAGMA table_info({facts})"):
+        column = row[1]
+        name = column[:-len("_id")] if column.endswith("_id") else None
+        if name in lookups:
+            columns.append(f"(SELECT name FROM {lookups[name]} WHERE id = f.{column}) AS {name}")
+        else:
+            columns.append(f"f.{column}")
+    return f"CREATE VIEW IF NOT EXISTS {view} AS SELECT {', '.join(columns)} FROM {facts} f"
+
+
+def create_indexes(conn, normalized=False):
+    plain = tuple(f"{table} " for table in FACT_TABLES)
+    indexes = {name: target for name, target in INDEXES.items()
+               if not (normalized and target.startswith(plain))}
+    if normalized:
+        indexes.update(NORMALIZED_INDEXES)
+    for name, target in indexes.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+
+def explain(conn, query, params=()):
+    """Return the EXPLAIN QUERY PLAN detail lines for a query."""
+    return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+
+def full_table_scans(conn, query, params=()):
+    """Plan lines that scan a table row by row instead of through an index."""
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return [
+        line for line in explain(conn, query, params)
+        if line.startswith("SCAN ") and line.split()[1] in tables and "INDEX" not in line
+    ]
+
+
+def catalogue_queries():
+    import sql_queries
+    return {
+        name: value for name, value in vars(sql_queries).items()
+        if name.endswith("_query") and isinstance(value, str)
+    }
+
+
+def check_query_plans(conn, queries=None):
+    """Map each catalogued query that still full-scans a table to those plan lines."""
+    queries = catalogue_queries() if queries is None else queries
+    problems = {}
+    for name, query in queries.items():
+        scans = full_table_scans(conn, query)
+        if scans:
+            problems[name] = scans
+    return problems
+
+
+if __name__ == "__main__":
+    conn = connect("ipl_analysis.db")
+    create_schema(conn)
+    conn.execute("ANALYZE")
+    for name, query in catalogue_queries().items():
+        print(f"\n📌 {name}")
+        for line in explain(conn, query):
+            print(f"   {line}")
+    problems = check_query_plans(conn)
+    if problems:
+        print(f"\n❌ Queries scanning without an index: {', '.join(problems)}")
+    else:
+        print("\n✅ Every catalogued query is served by an index.")
+    conn.close()
@@ -1,97 +1,72 @@
 import os
-import sqlite3
-import pandas as pd
-import matplotlib.pyplot as plt
-
-# Ensure folders exist
-os.makedirs("reports", exist_ok=True)
-os.makedirs("charts", exist_ok=True)
-
-def show_and_save_chart(df, x_col, y_col, title, filename, color='blue'):
-    df.plot(x=x_col, y=y_col, kind='bar', legend=False, color=color)
-    plt.title(title)
-    plt.xlabel(x_col)
-    plt.ylabel(y_col)
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
+import time
+
+from analytics_index import get_matchup_index
+from db_schema import connect
+from exceptions import IPLDatabaseError, IPLReportError
+from leaderboard import leaderboard_sql
+from logger_config import enable_metrics, instrumented, measure, print_metrics_summary, query_label
+from query_cache import get_query_cache
+
+DB_PATH = "ipl_analysis.db"
+
+# pandas and the chart service are imported on first use so the menu
+# appears without waiting for the heavy libraries to load.
+
+def read_sql(query, conn):
+    # Repeating a menu option is answered from the cache until new data lands
+    with measure(query_label(query), kind="query") as m:
+        df = get_query_cache().read_sql(conn, query)
+        m.rows = len(df)
+    return df
+
+def save_report(df, filename):
+    os.makedirs("reports", exist_ok=True)
+    df.to_csv(f"reports/{filename}", index=False)
+
+def show_and_save_chart(df, x_col, y_col, title, filename, color='blue', announce=True):
+    # Rendered off the main thread. The menu path (announce) waits for the
+    # PNG so its status line is printed before the next prompt, not over it.
+    from chart_service import get_chart_service
     chart_path = f"charts/{filename}.png"
-    plt.savefig(chart_path)
-    plt.show()
-    print(f"✅ Chart saved as {chart_path}")
+    future = get_chart_service().submit(df[[x_col, y_col]], {
+        "kind": "bar", "x": x_col, "y": y_col, "color": color, "title": title,
+        "xlabel": x_col, "ylabel": y_col, "rotation": 45, "ha": "right",
+    }, chart_path)
+    if announce:
+        error = future.exception()
+        print(f"✅ Chart saved as {chart_path}" if error is None else f"❌ Chart {chart_path} failed: {error}")
+    return future
 
 def create_database():
     print("✅ Database already exists as 'ipl_analysis.db'")
 
+@instrumented()
 def top_teams_by_wins(conn):
-    query = """
-        SELECT winner AS Team, COUNT(*) AS Wins
-        FROM matches
-        WHERE winner IS NOT NULL
-        GROUP BY winner
-        ORDER BY Wins DESC
-        LIMIT 5;
-    """
-    df = pd.read_sql_query(query, conn)
-    df.to_csv("reports/top_teams_by_wins.csv", index=False)
-    print(df)
-    show_and_save_chart(df, 'Team', 'Wins', 'Top 5 Teams by Wins', 'top_teams_by_wins')
+    query, _ = leaderboard_sql("wins", labels=("Team", "Wins"))
+    return read_sql(query, conn)
 
+@instrumented()
 def top_run_scorers(conn):
-    query = """
-        SELECT batsman AS Player, SUM(batsman_runs) AS Runs
-        FROM deliveries
-        GROUP BY batsman
-        ORDER BY Runs DESC
-        LIMIT 5;
-    """
-    df = pd.read_sql_query(query, conn)
-    df.to_csv("reports/top_run_scorers.csv", index=False)
-    print(df)
-    show_and_save_chart(df, 'Player', 'Runs', 'Top 5 Run Scorers', 'top_run_scorers', 'green')
+    query, _ = leaderboard_sql("runs", labels=("Player", "Runs"))
+    return read_sql(query, conn)
 
+@instrumented()
 def top_wicket_takers(conn):
-    query = """
-        SELECT bowler AS Player, COUNT(*) AS Wickets
-        FROM deliveries
-        WHERE dismissal_kind NOT IN ('run out', 'retired hurt', 'obstructing the field')
-        AND dismissal_kind IS NOT NULL
-        GROUP BY bowler
-        ORDER BY Wickets DESC
-        LIMIT 5;
-    """
-    df = pd.read_sql_query(query, conn)
-    df.to_csv("reports/top_wicket_takers.csv", index=False)
-    print(df)
-    show_and_save_chart(df, 'Player', 'Wickets', 'Top 5 Wicket Takers', 'top_wicket_takers', 'orange')
+    query, _ = leaderboard_sql("wickets", labels=("Player", "Wickets"))
+    return read_sql(query, conn)
 
+@instrumented()
 def top_six_hitters(conn):
-    query = """
-        SELECT batsman AS Player, COUNT(*) AS Sixes
-        FROM deliveries
-        WHERE batsman_runs = 6
-        GROUP BY batsman
-        ORDER BY Sixes DESC
-        LIMIT 5;
-    """
-    df = pd.read_sql_query(query, conn)
-    df.to_csv("reports/top_six_hitters.csv", index=False)
-    print(df)
-    show_and_save_chart(df, 'Player', 'Sixes', 'Top 5 Six Hitters', 'top_six_hitters', 'purple')
+    query, _ = leaderboard_sql("sixes", labels=("Player", "Sixes"))
+    return read_sql(query, conn)
 
+@instrumented()
 def economical_bowlers(conn):
-    query = """
-        SELECT bowler, ROUND(SUM(total_runs)*6.0/COUNT(*), 2) AS Economy
-        FROM deliveries
-        GROUP BY bowler
-        HAVING COUNT(*) >= 300
-        ORDER BY Economy ASC
-        LIMIT 5;
-    """
-    df = pd.read_sql_query(query, conn)
-    df.to_csv("reports/top_economical_bowlers.csv", index=False)
-    print(df)
-    show_and_save_chart(df, 'bowler', 'Economy', 'Top Economical Bowlers', 'top_economical_bowlers', 'red')
+    query, _ = leaderboard_sql("economy", min_balls=300, labels=("bowler", "Economy"))
+    return read_sql(query, conn)
 
+@instrumented()
 def matches_per_season(conn):
     query = """
         SELECT season AS Season, COUNT(*) AS Matches
@@ -99,24 +74,14 @@ def matches_per_season(conn):
         GROUP BY season
         ORDER BY season;
     """
-    df = pd.read_sql_query(query, conn)
-    df.to_csv("reports/matches_per_season.csv", index=False)
-    print(df)
-    show_and_save_chart(df, 'Season', 'Matches', 'Matches Per Season', 'matches_per_season', 'blue')
+    return read_sql(query, conn)
 
+@instrumented()
 def toss_vs_match_winner(conn):
-    query = """
-        SELECT CASE WHEN toss_winner = winner THEN 'Toss & Match Won'
-                    ELSE 'Only Toss or Match Won' END AS Result,
-               COUNT(*) AS Count
-        FROM matches
-        GROUP BY Result;
-    """
-    df = pd.read_sql_query(query, conn)
-    df.to_csv("reports/toss_vs_match_winner.csv", index=False)
-    print(df)
-    show_and_save_chart(df, 'Result', 'Count', 'Toss Winner vs Match Winner', 'toss_vs_match_winner', 'cyan')
+    # Served from the matchup index (analytics_index.py), not a scan of matches
+    return get_matchup_index(conn).toss_vs_match_winner()
 
+@instrumented()
 def matches_per_venue(conn):
     query = """
         SELECT venue AS Venue, COUNT(*) AS Matches
@@ -125,49 +90,109 @@ def matches_per_venue(conn):
         ORDER BY Matches DESC
         LIMIT 5;
     """
-    df = pd.read_sql_query(query, conn)
-    df.to_csv("reports/matches_per_venue.csv", index=False)
-    print(df)
-    show_and_save_chart(df, 'Venue', 'Matches', 'Top Venues by Matches', 'matches_per_venue', 'magenta')
+    return read_sql(query, conn)
 
+@instrumented()
 def win_percentage_by_innings(conn):
-    query = """
-        SELECT CASE WHEN win_by_runs > 0 THEN 'Bat First' ELSE 'Chase' END AS Strategy,
-               COUNT(*) AS Wins
-        FROM matches
-        WHERE winner IS NOT NULL
-        GROUP BY Strategy;
-    """
-    df = pd.read_sql_query(query, conn)
-    df.to_csv("reports/win_by_innings_strategy.csv", index=False)
+    return get_matchup_index(conn).win_by_innings_strategy()
+
+# Output name (reports/<name>.csv, charts/<name>.png) ->
+# (menu title, analysis, chart x column, y column, chart title, colour)
+ANALYSES = {
+    "top_teams_by_wins": ("Top 5 Teams by Wins", top_teams_by_wins,
+                          'Team', 'Wins', 'Top 5 Teams by Wins', 'blue'),
+    "top_run_scorers": ("Top 5 Run Scorers", top_run_scorers,
+                        'Player', 'Runs', 'Top 5 Run Scorers', 'green'),
+    "top_wicket_takers": ("Top 5 Wicket Takers", top_wicket_takers,
+                          'Player', 'Wickets', 'Top 5 Wicket Takers', 'orange'),
+    "top_six_hitters": ("Top 5 Six Hitters", top_six_hitters,
+                        'Player', 'Sixes', 'Top 5 Six Hitters', 'purple'),
+    "top_economical_bowlers": ("Top Economical Bowlers", economical_bowlers,
+                               'bowler', 'Economy', 'Top Economical Bowlers', 'red'),
+    "matches_per_season": ("Matches Per Season", matches_per_season,
+                           'Season', 'Matches', 'Matches Per Season', 'blue'),
+    "toss_vs_match_winner": ("Toss Winner vs Match Winner", toss_vs_match_winner,
+                             'Result', 'Count', 'Toss Winner vs Match Winner', 'cyan'),
+    "matches_per_venue": ("Top Venues by Matches", matches_per_venue,
+                          'Venue', 'Matches', 'Top Venues by Matches', 'magenta'),
+    "win_by_innings_strategy": ("Win % by Batting First or Chasing", win_percentage_by_innings,
+                                'Strategy', 'Wins', 'Win by Bat First vs Chase', 'gold'),
+}
+
+def run_analysis(conn, name):
+    """Menu path: query, save the report, print the frame and queue the chart."""
+    _, analysis, x_col, y_col, title, color = ANALYSES[name]
+    df = analysis(conn)
+    save_report(df, f"{name}.csv")
     print(df)
-    show_and_save_chart(df, 'Strategy', 'Wins', 'Win by Bat First vs Chase', 'win_by_innings_strategy', 'gold')
+    show_and_save_chart(df, x_col, y_col, title, name, color)
+    return df
+
+def run_batch(names=None, db_path=DB_PATH, workers=4, show=False):
+    """Run ``names`` (default: every analysis) without prompting.
+
+    The queries share one read-only connection and the process-wide query
+    cache and matchup index; reports are written on a thread pool and
+    charts on the chart service while the next query runs. Returns
+    {name: rows} for the analyses that succeeded and raises IPLReportError
+    naming those that failed.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    names = list(ANALYSES) if not names else list(names)
+    unknown = [name for name in names if name not in ANALYSES]
+    if unknown:
+        raise ValueError(f"Unknown analyses: {', '.join(unknown)} (choose from {', '.join(ANALYSES)})")
+
+    if not os.path.exists(db_path):
+        raise IPLDatabaseError(f"{db_path} not found; build it with main.py or ingest.py first.")
+    conn = connect(db_path, read_only=True)
+    pending, rows, failed = [], {}, {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for name in names:
+                _, analysis, x_col, y_col, title, color = ANALYSES[name]
+                try:
+                    df = analysis(conn)
+                except Exception as e:
+                    failed[name] = e
+                    continue
+                if show:
+                    print(f"\n📊 {ANALYSES[name][0]}\n{df}")
+                rows[name] = len(df)
+                pending.append((name, pool.submit(save_report, df, f"{name}.csv")))
+                pending.append((name, show_and_save_chart(df, x_col, y_col, title, name, color, announce=False)))
+            for name, future in pending:
+                if future.exception() is not None:
+                    failed.setdefault(name, future.exception())
+    finally:
+        conn.close()
+
+    for name in names:
+        if name in failed:
+            print(f"❌ {name}: {failed[name]}")
+        else:
+            print(f"✅ {name}: {rows[name]} rows -> reports/{name}.csv, charts/{name}.png")
+    if failed:
+        raise IPLReportError(f"{len(failed)} of {len(names)} analyses failed: {', '.join(failed)}")
+    return rows
 
 def main_menu():
-    db_path = "ipl_analysis.db"
-    conn = sqlite3.connect(db_path)
-
-    options = {
-        "1": ("Create Database (if not exists)", create_database),
-        "2": ("Top 5 Teams by Wins", lambda: top_teams_by_wins(conn)),
-        "3": ("Top 5 Run Scorers", lambda: top_run_scorers(conn)),
-        "4": ("Top 5 Wicket Takers", lambda: top_wicket_takers(conn)),
-        "5": ("Top 5 Six Hitters", lambda: top_six_hitters(conn)),
-        "6": ("Top Economical Bowlers", lambda: economical_bowlers(conn)),
-        "7": ("Matches Per Season", lambda: matches_per_season(conn)),
-        "8": ("Toss Winner vs Match Winner", lambda: toss_vs_match_winner(conn)),
-        "9": ("Top Venues by Matches", lambda: matches_per_venue(conn)),
-        "10": ("Win % by Batting First or Chasing", lambda: win_percentage_by_innings(conn)),
-        "11": ("Exit", None)
-    }
+    conn = connect(DB_PATH)
+
+    options = {"1": ("Create Database (if not exists)", create_database)}
+    for name, (title, *_) in ANALYSES.items():
+        options[str(len(options) + 1)] = (title, lambda name=name: run_analysis(conn, name))
+    exit_choice = str(len(options) + 1)
+    options[exit_choice] = ("Exit", None)
 
     while True:
         print("\n🎯 IPL FULL ANALYSIS MENU")
         for key, (desc, _) in options.items():
             print(f"{key}. {desc}")
-        choice = input("\nEnter your choice (1–11): ").strip()
+        choice = input(f"\nEnter your choice (1–{exit_choice}): ").strip()
 
-        if choice == "11":
+        if choice == exit_choice:
             print("👋 Exiting. Thank you!")
             break
         elif choice in options:
@@ -178,6 +203,48 @@ def main_menu():
             print("❌ Invalid choice. Please try again.")
 
     conn.close()
+    print_session_summary()
+
+def print_session_summary():
+    stats = get_query_cache().stats()
+    if stats["hits"] + stats["disk_hits"]:
+        print(f"📌 Query cache: {stats['hits'] + stats['disk_hits']} hits, {stats['misses']} misses")
+    print_metrics_summary()
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="IPL analyses: the interactive menu, or --batch to run "
+                                                 "them without prompting.")
+    parser.add_argument("--batch", nargs="*", metavar="NAME",
+                        help="run these analyses (default: all of them) and exit")
+    parser.add_argument("--list", action="store_true", help="list the analysis names and exit")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--workers", type=int, default=4, help="threads writing reports in batch mode")
+    parser.add_argument("--show", action="store_true", help="print each result frame in batch mode")
+    parser.add_argument("--metrics", action="store_true", help="record query timings and print a summary")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (title, *_) in ANALYSES.items():
+            print(f"{name:<26} {title}")
+        return 0
+    if args.metrics:
+        enable_metrics()
+    if args.batch is None:
+        main_menu()
+        return 0
+
+    started = time.perf_counter()
+    try:
+        run_batch(args.batch, db_path=args.db, workers=args.workers, show=args.show)
+    except (ValueError, IPLDatabaseError, IPLReportError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        print(f"⏱️  Batch finished in {time.perf_counter() - started:.2f}s")
+        print_session_summary()
+    return 0
 
 if __name__ == "__main__":
-    main_menu()
+    raise SystemExit(main())
@@ -0,0 +1,255 @@
+# ingest.py
+
+import logging
+import time
+
+import aggregates
+from dataset import SCHEMAS, read_csv_chunks, read_typed_csv
+from db_schema import FACT_TABLES, NORMALIZED_COLUMNS, create_schema, is_normalized
+from exceptions import IPLDataError
+
+MANIFEST_TABLE = "ingest_manifest"
+
+# Rows of deliveries.csv parsed per chunk by stream_ingest; peak memory is
+# bounded by this, not by the size of the file.
+STREAM_CHUNK_ROWS = 50_000
+
+logger = logging.getLogger(__name__)
+
+# Derived table name -> (source tables, refresh(conn, match_ids))
+DERIVED_TABLES = {}
+
+
+def register_derived_table(name, sources, refresh):
+    """Register a table to be refreshed when new rows land in ``sources``.
+
+    ``refresh`` is called inside the ingest transaction with the ids of the
+    newly loaded matches, so it only has to fold those rows in.
+    """
+    DERIVED_TABLES[name] = (tuple(sources), refresh)
+
+
+def frame_rows(frame):
+    """Yield plain Python tuples (None for missing values) ready for executemany."""
+    values = frame.astype(object).where(frame.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def table_exists(conn, name):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def ensure_manifest(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+            match_id INTEGER PRIMARY KEY,
+            batch INTEGER NOT NULL,
+            ingested_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # A database built by the old replace-everything path already holds
+    # matches; adopt them so they are not appended a second time.
+    empty = conn.execute(f"SELECT COUNT(*) FROM {MANIFEST_TABLE}").fetchone()[0] == 0
+    if empty and table_exists(conn, "matches"):
+        with conn:
+            conn.execute(f"INSERT OR IGNORE INTO {MANIFEST_TABLE} (match_id, batch) SELECT id, 0 FROM matches")
+
+
+def loaded_match_ids(conn):
+    return {row[0] for row in conn.execute(f"SELECT match_id FROM {MANIFEST_TABLE}")}
+
+
+def insert_frame(conn, name, frame):
+    placeholders = ", ".join("?" for _ in frame.columns)
+    columns = ", ".join(f'"{col}"' for col in frame.columns)
+    conn.executemany(f'INSERT INTO "{name}" ({columns}) VALUES ({placeholders})', frame_rows(frame))
+
+
+def encode_names(conn, name, frame):
+    """``frame`` with the name columns of ``name`` replaced by lookup-table
+    ids (``<column>_id``), adding names the lookup tables have not seen."""
+    columns = {col: lookup for col, lookup in NORMALIZED_COLUMNS[name].items() if col in frame}
+    encoded = frame.drop(columns=list(columns))
+    for lookup in sorted(set(columns.values())):
+        cols = [col for col in columns if columns[col] == lookup]
+        names = set()
+        for col in cols:
+            names.update(frame[col].dropna().astype(str).unique())
+        conn.executemany(f"INSERT OR IGNORE INTO {lookup} (name) VALUES (?)", ((n,) for n in sorted(names)))
+        ids = dict(conn.execute(f"SELECT name, id FROM {lookup}"))
+        for col in cols:
+            encoded[f"{col}_id"] = frame[col].astype(object).map(ids).astype("Int64")
+    return encoded
+
+
+def insert_rows(conn, name, frame):
+    """Insert into ``name``, or into its fact table when the database uses
+    the normalized layout."""
+    if name in FACT_TABLES and is_normalized(conn):
+        name, frame = FACT_TABLES[name], encode_names(conn, name, frame)
+    insert_frame(conn, name, frame)
+
+
+def refresh_derived_tables(conn, touched, match_ids):
+    refreshed = []
+    for name, (sources, refresh) in DERIVED_TABLES.items():
+        if touched.intersection(sources):
+            refresh(conn, match_ids)
+            refreshed.append(name)
+    return refreshed
+
+
+def backfill_derived_tables(conn):
+    """Fully build derived tables that are empty although matches are loaded,
+    e.g. after upgrading a database created before the table existed."""
+    if conn.execute(f"SELECT 1 FROM {MANIFEST_TABLE} LIMIT 1").fetchone() is None:
+        return []
+    rebuilt = []
+    with conn:
+        for name, (_, refresh) in DERIVED_TABLES.items():
+            if table_exists(conn, name) and conn.execute(f'SELECT 1 FROM "{name}" LIMIT 1').fetchone() is None:
+                refresh(conn, None)
+                rebuilt.append(name)
+    return rebuilt
+
+
+def ingest_new_matches(conn, matches, deliveries, normalized=None):
+    """Append matches (and their deliveries) not yet recorded in the manifest.
+
+    Everything happens in one transaction, so an interrupted run leaves the
+    database as it was and simply re-runs cleanly. Returns the new match ids.
+    ``normalized`` picks the layout of a new database (see create_schema).
+    """
+    create_schema(conn, normalized)
+    ensure_manifest(conn)
+    backfill_derived_tables(conn)
+
+    new_matches = matches[~matches["id"].isin(loaded_match_ids(conn))]
+    if new_matches.empty:
+        return []
+
+    match_ids = [int(i) for i in new_matches["id"]]
+    new_deliveries = deliveries[deliveries["match_id"].isin(match_ids)]
+    batch = conn.execute(f"SELECT COALESCE(MAX(batch), 0) + 1 FROM {MANIFEST_TABLE}").fetchone()[0]
+
+    with conn:
+        insert_rows(conn, "matches", new_matches)
+        insert_rows(conn, "deliveries", new_deliveries)
+        conn.executemany(
+            f"INSERT INTO {MANIFEST_TABLE} (match_id, batch) VALUES (?, ?)",
+            ((match_id, batch) for match_id in match_ids),
+        )
+        refresh_derived_tables(conn, {"matches", "deliveries"}, match_ids)
+    conn.execute("PRAGMA optimize")
+    return match_ids
+
+
+def _commit_batch(conn, matches, deliveries, match_ids, batch):
+    """Insert complete matches with their deliveries in one transaction."""
+    with conn:
+        insert_rows(conn, "matches", matches[matches["id"].isin(match_ids)])
+        if deliveries is not None:
+            insert_rows(conn, "deliveries", deliveries)
+        conn.executemany(
+            f"INSERT INTO {MANIFEST_TABLE} (match_id, batch) VALUES (?, ?)",
+            ((match_id, batch) for match_id in match_ids),
+        )
+        refresh_derived_tables(conn, {"matches", "deliveries"}, match_ids)
+
+
+def stream_ingest(conn, matches_path, deliveries_path, chunksize=STREAM_CHUNK_ROWS, normalized=None):
+    """Append new matches, streaming deliveries.csv in fixed-size chunks.
+
+    Each chunk is parsed with the declared integer dtypes and the matches it
+    completes are committed together with their manifest entries and derived
+    table refreshes, so an interrupted run keeps what it committed and the
+    next run picks up from there. Deliveries must be grouped by match (as in
+    the published data); the rows of a match that straddles a chunk boundary
+    are carried over into the next batch.
+
+    ``normalized`` picks the layout of a new database (see create_schema).
+    Returns {"match_ids", "rows", "seconds", "rows_per_sec"}.
+    """
+    import pandas as pd
+
+    started = time.perf_counter()
+    create_schema(conn, normalized)
+    ensure_manifest(conn)
+    backfill_derived_tables(conn)
+
+    matches = read_typed_csv(matches_path, SCHEMAS["matches"])
+    pending = set(int(i) for i in matches["id"]) - loaded_match_ids(conn)
+    batch = conn.execute(f"SELECT COALESCE(MAX(batch), 0) + 1 FROM {MANIFEST_TABLE}").fetchone()[0]
+
+    committed, done, rows, carry = [], set(), 0, None
+    for chunk in read_csv_chunks(deliveries_path, SCHEMAS["deliveries"], chunksize):
+        if chunk["match_id"].isin(done).any():
+            raise IPLDataError(f"{deliveries_path} is not grouped by match_id; "
+                               "load it with ingest_new_matches instead.")
+        chunk = chunk[chunk["match_id"].isin(pending)]
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        if chunk.empty:
+            continue
+        # The last match in the chunk may continue in the next one
+        last = chunk["match_id"].iloc[-1]
+        carry = chunk[chunk["match_id"] == last]
+        ready = chunk[chunk["match_id"] != last]
+        if ready.empty:
+            continue
+        match_ids = [int(i) for i in pd.unique(ready["match_id"])]
+        _commit_batch(conn, matches, ready, match_ids, batch)
+        pending.difference_update(match_ids)
+        done.update(match_ids)
+        committed.extend(match_ids)
+        rows += len(ready)
+        logger.info("Streamed %d deliveries (%d matches) so far.", rows, len(committed))
+
+    # The final carried-over match, plus any match without deliveries
+    if pending:
+        match_ids = sorted(pending)
+        _commit_batch(conn, matches, carry, match_ids, batch)
+        committed.extend(match_ids)
+        rows += 0 if carry is None else len(carry)
+    if committed:
+        conn.execute("PRAGMA optimize")
+
+    seconds = time.perf_counter() - started
+    rows_per_sec = rows / seconds if seconds > 0 else 0.0
+    logger.info("Stream ingest: %d matches, %d deliveries in %.2fs (%.0f rows/sec).",
+                len(committed), rows, seconds, rows_per_sec)
+    return {"match_ids": committed, "rows": rows, "seconds": seconds, "rows_per_sec": rows_per_sec}
+
+
+register_derived_table("batting_summary", ["deliveries"], aggregates.refresh_batting)
+register_derived_table("bowling_summary", ["deliveries"], aggregates.refresh_bowling)
+register_derived_table("team_summary", ["matches"], aggregates.refresh_teams)
+register_derived_table("batting_splits", ["deliveries"], aggregates.refresh_batting_splits)
+register_derived_table("bowling_splits", ["deliveries"], aggregates.refresh_bowling_splits)
+register_derived_table("head_to_head", ["matches"], aggregates.refresh_head_to_head)
+register_derived_table("venue_toss", ["matches"], aggregates.refresh_venue_toss)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from dataset import get_dataset
+    from db_schema import connect
+
+    parser = argparse.ArgumentParser(description="Stream new matches into the analysis database.")
+    parser.add_argument("--db", default="ipl_analysis.db")
+    parser.add_argument("--chunksize", type=int, default=STREAM_CHUNK_ROWS)
+    parser.add_argument("--normalized", action="store_true", default=None,
+                        help="create a new database with lookup tables and integer ids")
+    args = parser.parse_args()
+
+    dataset = get_dataset()
+    conn = connect(args.db)
+    stats = stream_ingest(conn, dataset.source_path("matches"), dataset.source_path("deliveries"),
+                          chunksize=args.chunksize, normalized=args.normalized)
+    conn.close()
+    print(f"✅ {len(stats['match_ids'])} new matches, {stats['rows']} deliveries "
+          f"in {stats['seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/sec)")
@@ -0,0 +1,387 @@
+# innings.py
+
+# Rebuilds match state from deliveries in bulk: scorecards, fall of wickets,
+# partnerships and over-by-over timelines for every innings at once. The
+# deliveries are sorted by (match_id, inning, over, ball) once; everything
+# after that is a segment-wise cumulative sum or a bincount over the sorted
+# arrays, with no per-innings Python loop.
+
+import os
+import time
+
+from dataset import COLUMNAR_FORMAT, get_dataset, write_columnar
+from db_schema import BOWLER_DISMISSALS, NOT_OUT_DISMISSALS
+from stats_engine import build_vocabulary, encode_ids
+
+INNINGS_FOLDER = os.path.join("output", "innings")
+INNINGS_TABLES = ["innings", "batting", "bowling", "fall_of_wickets", "partnerships", "timeline"]
+CHASE_BALLS = 120   # a full 20-over second innings, for the required rate
+
+
+def _segments(flags):
+    """Segment id of each row, given True where a new segment starts."""
+    return flags.cumsum() - 1
+
+
+def _segment_cumsum(values, segment, starts):
+    """Running total of ``values`` that restarts at every segment."""
+    import numpy as np
+
+    total = np.cumsum(values)
+    return total - (total - values)[starts][segment]
+
+
+def _overs(balls):
+    """Legal balls as the usual "overs.balls" notation, e.g. 19.4."""
+    import pandas as pd
+
+    balls = pd.Series(balls)
+    return (balls // 6).astype(str) + "." + (balls % 6).astype(str)
+
+
+def _group(keys):
+    """(unique keys, index of each row's key in them)."""
+    import numpy as np
+
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, inverse
+
+
+class InningsData:
+    """Deliveries sorted into innings order, as plain arrays."""
+
+    def __init__(self, deliveries):
+        import numpy as np
+
+        d = deliveries
+
+        def ints(name):
+            return d[name].fillna(0).to_numpy(dtype=np.int64) if name in d else np.zeros(len(d), np.int64)
+
+        match_id, inning, over, ball = ints("match_id"), ints("inning"), ints("over"), ints("ball")
+        order = np.lexsort((ball, over, inning, match_id))
+        self.match_id, self.inning, self.over, self.ball = match_id[order], inning[order], over[order], ball[order]
+        for name in ("batsman_runs", "total_runs", "extra_runs", "wide_runs", "noball_runs",
+                     "bye_runs", "legbye_runs", "penalty_runs"):
+            setattr(self, name, ints(name)[order])
+
+        self.players = build_vocabulary([d[c] for c in ("batsman", "non_striker", "bowler", "player_dismissed",
+                                                         "fielder") if c in d])
+        self.teams = build_vocabulary([d["batting_team"], d["bowling_team"]])
+        self.batsman = encode_ids(d["batsman"], self.players)[order]
+        self.non_striker = encode_ids(d["non_striker"], self.players)[order] if "non_striker" in d \
+            else np.full(len(d), -1, np.int32)
+        self.bowler = encode_ids(d["bowler"], self.players)[order]
+        self.dismissed = encode_ids(d["player_dismissed"], self.players)[order]
+        self.fielder = encode_ids(d["fielder"], self.players)[order] if "fielder" in d \
+            else np.full(len(d), -1, np.int32)
+        self.batting_team = encode_ids(d["batting_team"], self.teams)[order]
+        self.bowling_team = encode_ids(d["bowling_team"], self.teams)[order]
+        kind = d["dismissal_kind"].astype(object).where(d["dismissal_kind"].notna(), None).to_numpy()[order]
+        self.dismissal_kind = kind
+
+        self.wicket = (self.dismissed >= 0) & ~np.isin(kind, NOT_OUT_DISMISSALS)
+        self.bowler_wicket = np.isin(kind, BOWLER_DISMISSALS)
+        self.faced = self.wide_runs == 0                            # counts as a ball faced
+        self.legal = self.faced & (self.noball_runs == 0)           # counts towards the over
+        self.conceded = self.total_runs - self.bye_runs - self.legbye_runs - self.penalty_runs
+
+        new = np.ones(len(order), dtype=bool)
+        new[1:] = (np.diff(self.match_id) != 0) | (np.diff(self.inning) != 0)
+        self.starts = np.flatnonzero(new)
+        self.innings = _segments(new)                               # innings number of each row
+
+    def __len__(self):
+        return len(self.match_id)
+
+    def names(self, ids):
+        import numpy as np
+
+        names = self.players.to_numpy(dtype=object)
+        return np.where(ids >= 0, names[np.maximum(ids, 0)], None)
+
+    def team_names(self, ids):
+        import numpy as np
+
+        names = self.teams.to_numpy(dtype=object)
+        return np.where(ids >= 0, names[np.maximum(ids, 0)], None)
+
+
+def innings_totals(data):
+    """One row per innings: score, wickets, legal balls and extras."""
+    import numpy as np
+    import pandas as pd
+
+    n = len(data.starts)
+    runs = np.bincount(data.innings, data.total_runs, minlength=n).astype(np.int64)
+    balls = np.bincount(data.innings, data.legal, minlength=n).astype(np.int64)
+    return pd.DataFrame({
+        "match_id": data.match_id[data.starts],
+        "inning": data.inning[data.starts],
+        "batting_team": data.team_names(data.batting_team[data.starts]),
+        "bowling_team": data.team_names(data.bowling_team[data.starts]),
+        "runs": runs,
+        "wickets": np.bincount(data.innings, data.wicket, minlength=n).astype(np.int64),
+        "balls": balls,
+        "overs": _overs(balls),
+        "extras": np.bincount(data.innings, data.extra_runs, minlength=n).astype(np.int64),
+        "run_rate": np.round(runs * 6.0 / np.maximum(balls, 1), 2),
+    })
+
+
+def batting_scorecards(data):
+    """One row per innings and batter (including those who never faced), in
+    batting order, with how they were out."""
+    import numpy as np
+    import pandas as pd
+
+    n_players = len(data.players) + 1
+    # Striker and non-striker of each ball, interleaved so the first
+    # occurrence of a key is the batter's arrival at the crease
+    appearances = np.empty(2 * len(data), dtype=np.int64)
+    appearances[0::2] = data.innings * n_players + data.batsman
+    appearances[1::2] = data.innings * n_players + data.non_striker
+    seen = np.empty(2 * len(data), dtype=bool)
+    seen[0::2], seen[1::2] = data.batsman >= 0, data.non_striker >= 0
+    keys, first = np.unique(appearances[seen], return_index=True)
+    innings, player = keys // n_players, keys % n_players
+
+    # Batting order: rank of the arrival within the innings
+    order = np.lexsort((first, innings))
+    keys, innings, player = keys[order], innings[order], player[order]
+    new = np.ones(len(keys), dtype=bool)
+    new[1:] = innings[1:] != innings[:-1]
+    starts = np.flatnonzero(new)
+    position = np.arange(len(keys)) - starts[_segments(new)] + 1
+
+    # Per-ball stats land on the striker's row
+    by_key = np.argsort(keys)
+    sorted_keys = keys[by_key]
+    valid = np.flatnonzero(data.batsman >= 0)
+    row = by_key[np.searchsorted(sorted_keys, data.innings[valid] * n_players + data.batsman[valid])]
+
+    def per_batter(weights):
+        return np.bincount(row, weights[valid], minlength=len(keys)).astype(np.int64)
+
+    runs, balls = per_batter(data.batsman_runs), per_batter(data.faced)
+
+    # Dismissals: the row of whoever was out (the non-striker for some run outs)
+    out = np.flatnonzero(data.dismissed >= 0)
+    out_keys = data.innings[out] * n_players + data.dismissed[out]
+    found = np.minimum(np.searchsorted(sorted_keys, out_keys), len(keys) - 1)
+    known = sorted_keys[found] == out_keys
+    out_rows, out = by_key[found[known]], out[known]
+    dismissal = np.full(len(keys), None, dtype=object)
+    bowler = np.full(len(keys), -1, dtype=np.int64)
+    fielder = np.full(len(keys), -1, dtype=np.int64)
+    dismissal[out_rows] = data.dismissal_kind[out]
+    bowler[out_rows] = np.where(data.bowler_wicket[out], data.bowler[out], -1)
+    fielder[out_rows] = data.fielder[out]
+
+    first_ball = data.starts[innings]
+    return pd.DataFrame({
+        "match_id": data.match_id[first_ball],
+        "inning": data.inning[first_ball],
+        "batting_team": data.team_names(data.batting_team[first_ball]),
+        "position": position,
+        "batsman": data.names(player),
+        "runs": runs,
+        "balls": balls,
+        "fours": per_batter(data.batsman_runs == 4),
+        "sixes": per_batter(data.batsman_runs == 6),
+        "strike_rate": np.round(runs * 100.0 / np.maximum(balls, 1), 2),
+        "dismissal_kind": dismissal,
+        "bowler": data.names(bowler),
+        "fielder": data.names(fielder),
+    })
+
+
+def bowling_scorecards(data):
+    """One row per innings and bowler, in the order they came on."""
+    import numpy as np
+    import pandas as pd
+
+    n_players = len(data.players) + 1
+    valid = np.flatnonzero(data.bowler >= 0)
+    keys = data.innings[valid] * n_players + data.bowler[valid]
+    unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    def per_bowler(weights, index=inverse, rows=valid):
+        return np.bincount(index, weights[rows], minlength=len(unique)).astype(np.int64)
+
+    balls, runs = per_bowler(data.legal), per_bowler(data.conceded)
+
+    # Maidens: complete overs by one bowler without a run conceded
+    over_keys, over_inverse = _group(keys * 32 + data.over[valid])
+    over_balls = np.bincount(over_inverse, data.legal[valid], minlength=len(over_keys))
+    over_runs = np.bincount(over_inverse, data.conceded[valid], minlength=len(over_keys))
+    maiden = (over_balls >= 6) & (over_runs == 0)
+    maidens = np.bincount(np.searchsorted(unique, over_keys // 32), maiden, minlength=len(unique)).astype(np.int64)
+
+    order = np.argsort(valid[first], kind="stable")
+    first_ball = valid[first]
+    frame = pd.DataFrame({
+        "match_id": data.match_id[first_ball],
+        "inning": data.inning[first_ball],
+        "bowling_team": data.team_names(data.bowling_team[first_ball]),
+        "bowler": data.names(unique % n_players),
+        "balls": balls,
+        "overs": _overs(balls),
+        "maidens": maidens,
+        "runs": runs,
+        "wickets": per_bowler(data.bowler_wicket),
+        "dots": per_bowler(data.legal & (data.total_runs == 0)),
+        "wides": per_bowler(data.wide_runs > 0),
+        "noballs": per_bowler(data.noball_runs > 0),
+        "economy": np.round(runs * 6.0 / np.maximum(balls, 1), 2),
+    })
+    return frame.iloc[order].reset_index(drop=True)
+
+
+def fall_of_wickets(data):
+    """One row per wicket: the score, wicket number and over when it fell."""
+    import numpy as np
+    import pandas as pd
+
+    score = _segment_cumsum(data.total_runs, data.innings, data.starts)
+    wickets = _segment_cumsum(data.wicket.astype(np.int64), data.innings, data.starts)
+    balls = _segment_cumsum(data.legal.astype(np.int64), data.innings, data.starts)
+    rows = np.flatnonzero(data.wicket)
+    return pd.DataFrame({
+        "match_id": data.match_id[rows],
+        "inning": data.inning[rows],
+        "wicket": wickets[rows],
+        "score": score[rows],
+        "overs": _overs(balls[rows]).to_numpy(),
+        "batsman": data.names(data.dismissed[rows]),
+        "dismissal_kind": data.dismissal_kind[rows],
+    })
+
+
+def partnerships(data):
+    """One row per partnership: the pair, runs, balls and each batter's share.
+
+    A partnership runs from one wicket to the next; the pair is the striker
+    and non-striker of its first ball.
+    """
+    import numpy as np
+    import pandas as pd
+
+    before = _segment_cumsum(data.wicket.astype(np.int64), data.innings, data.starts) - data.wicket
+    new = np.ones(len(data), dtype=bool)
+    new[1:] = (data.innings[1:] != data.innings[:-1]) | (before[1:] != before[:-1])
+    segment = _segments(new)
+    starts = np.flatnonzero(new)
+    n = len(starts)
+
+    first, second = data.batsman[starts], data.non_striker[starts]
+    on_strike = data.batsman
+    runs = np.bincount(segment, data.total_runs, minlength=n).astype(np.int64)
+    first_runs = np.bincount(segment, data.batsman_runs * (on_strike == first[segment]), minlength=n).astype(np.int64)
+    second_runs = np.bincount(segment, data.batsman_runs * (on_strike == second[segment]), minlength=n).astype(np.int64)
+    return pd.DataFrame({
+        "match_id": data.match_id[starts],
+        "inning": data.inning[starts],
+        "wicket": before[starts] + 1,
+        "batsman_1": data.names(first),
+        "batsman_2": data.names(second),
+        "runs": runs,
+        "balls": np.bincount(segment, data.faced, minlength=n).astype(np.int64),
+        "batsman_1_runs": first_runs,
+        "batsman_2_runs": second_runs,
+        "extras": runs - first_runs - second_runs,
+    })
+
+
+def timelines(data, totals=None):
+    """One row per innings and over: runs and wickets in the over, the
+    cumulative score and run rate, and in second innings the target and
+    the rate still required (over a full 20 overs; D/L targets aside)."""
+    import numpy as np
+    import pandas as pd
+
+    totals = innings_totals(data) if totals is None else totals
+    keys, inverse = _group(data.innings * 64 + data.over)
+    n = len(keys)
+    innings, over = keys // 64, keys % 64
+    runs = np.bincount(inverse, data.total_runs, minlength=n).astype(np.int64)
+    wickets = np.bincount(inverse, data.wicket, minlength=n).astype(np.int64)
+    balls = np.bincount(inverse, data.legal, minlength=n).astype(np.int64)
+
+    new = np.ones(n, dtype=bool)
+    new[1:] = innings[1:] != innings[:-1]
+    segment, starts = _segments(new), np.flatnonzero(new)
+    score = _segment_cumsum(runs, segment, starts)
+    fallen = _segment_cumsum(wickets, segment, starts)
+    bowled = _segment_cumsum(balls, segment, starts)
+
+    # Target: the first innings of the same match, for second innings only
+    match, inning = totals["match_id"].to_numpy(), totals["inning"].to_numpy()
+    previous = np.maximum(np.arange(len(totals)) - 1, 0)
+    chasing = (inning == 2) & (match[previous] == match) & (inning[previous] == 1)
+    target = np.where(chasing, totals["runs"].to_numpy()[previous] + 1, 0)[innings]
+    needed = target - score
+    left = CHASE_BALLS - bowled
+    required = np.where((target > 0) & (needed > 0) & (left > 0),
+                        np.round(needed * 6.0 / np.maximum(left, 1), 2), np.nan)
+    return pd.DataFrame({
+        "match_id": match[innings],
+        "inning": inning[innings],
+        "over": over,
+        "runs": runs,
+        "wickets": wickets,
+        "score": score,
+        "total_wickets": fallen,
+        "balls": bowled,
+        "run_rate": np.round(score * 6.0 / np.maximum(bowled, 1), 2),
+        "target": pd.Series(target).where(target > 0).astype("Int64"),
+        "required_rate": required,
+    })
+
+
+def reconstruct(deliveries):
+    """Every innings table for ``deliveries``, as {name: frame}."""
+    data = InningsData(deliveries)
+    totals = innings_totals(data)
+    return {
+        "innings": totals,
+        "batting": batting_scorecards(data),
+        "bowling": bowling_scorecards(data),
+        "fall_of_wickets": fall_of_wickets(data),
+        "partnerships": partnerships(data),
+        "timeline": timelines(data, totals),
+    }
+
+
+def write_innings_tables(tables, folder=INNINGS_FOLDER):
+    """Write each table as a columnar file; returns their paths."""
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for name, frame in tables.items():
+        path = os.path.join(folder, f"{name}.{COLUMNAR_FORMAT}")
+        write_columnar(frame, path)
+        paths.append(path)
+    return paths
+
+
+def innings_paths(folder=INNINGS_FOLDER):
+    return [os.path.join(folder, f"{name}.{COLUMNAR_FORMAT}") for name in INNINGS_TABLES]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild scorecards, partnerships and timelines.")
+    parser.add_argument("--output", default=INNINGS_FOLDER)
+    args = parser.parse_args()
+
+    deliveries = get_dataset().deliveries
+    started = time.perf_counter()
+    tables = reconstruct(deliveries)
+    built = time.perf_counter()
+    write_innings_tables(tables, args.output)
+    written = time.perf_counter()
+    for name, frame in tables.items():
+        print(f"✅ {name}: {len(frame)} rows")
+    print(f"📊 {len(deliveries)} deliveries: rebuilt in {built - started:.2f}s, "
+          f"written to {args.output} in {written - built:.2f}s")
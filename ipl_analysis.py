@@ -1,11 +1,16 @@
 # ipl_analysis.py
 
-import pandas as pd
-import numpy as np
-import sqlite3
 import os
-import matplotlib.pyplot as plt
 import logging
+import argparse
+
+from build_cache import BuildManifest
+from chart_service import get_chart_service, wait_for_charts
+from dataset import get_dataset
+from db_schema import connect
+from ingest import stream_ingest
+from logger_config import enable_metrics, instrumented, print_metrics_summary
+from memory import describe
 
 # Setup
 DATA_FOLDER = "data"
@@ -13,42 +18,52 @@ DB_PATH = "db/ipl_analysis.db"
 OUTPUT_FOLDER = "output"
 LOG_FILE = "logs/ipl_analysis.log"
 
-os.makedirs("db", exist_ok=True)
-os.makedirs("output", exist_ok=True)
-os.makedirs("logs", exist_ok=True)
 
-# Logging configuration
-logging.basicConfig(filename=LOG_FILE, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Folders and logging are set up on first use rather than at import time
+def setup():
+    os.makedirs("db", exist_ok=True)
+    os.makedirs("output", exist_ok=True)
+    os.makedirs("logs", exist_ok=True)
+    logging.basicConfig(filename=LOG_FILE, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Load data
+# Load data (parsed once per process and cached on disk, see dataset.py)
+@instrumented()
 def load_data():
     try:
-        matches = pd.read_csv(os.path.join(DATA_FOLDER, "matches.csv"))
-        deliveries = pd.read_csv(os.path.join(DATA_FOLDER, "deliveries.csv"))
+        dataset = get_dataset()
+        matches, deliveries = dataset.matches, dataset.deliveries
         logging.info("CSV files loaded successfully.")
+        # Both frames are downcast on load: pandas defaults -> in memory
+        for name, report in dataset.memory_reports.items():
+            logging.info(f"{name}: {describe(report)}")
         return matches, deliveries
     except Exception as e:
         logging.error(f"Error loading CSV files: {e}")
         raise
 
 # Create SQLite DB
+@instrumented()
 def create_database():
+    setup()
     try:
-        matches, deliveries = load_data()
-        conn = sqlite3.connect(DB_PATH)
-        matches.to_sql("matches", conn, index=False, if_exists="replace")
-        deliveries.to_sql("deliveries", conn, index=False, if_exists="replace")
+        dataset = get_dataset()
+        conn = connect(DB_PATH)
+        stats = stream_ingest(conn, dataset.source_path("matches"), dataset.source_path("deliveries"))
         conn.close()
-        logging.info("Database created successfully.")
+        logging.info(f"Database created successfully ({len(stats['match_ids'])} new matches, "
+                     f"{stats['rows_per_sec']:.0f} rows/sec).")
         print(f"✅ Database created at: {os.path.abspath(DB_PATH)}")
     except Exception as e:
         logging.error(f"DB creation failed: {e}")
         print("❌ Error creating database.")
 
 # Team-wise Report
+@instrumented()
 def generate_team_report():
+    import pandas as pd
+    setup()
     try:
-        matches, _ = load_data()
+        matches = get_dataset().matches
 
         total_matches = pd.concat([matches['team1'], matches['team2']]).value_counts().reset_index()
         total_matches.columns = ['team', 'total_matches']
@@ -63,15 +78,13 @@ def generate_team_report():
 
         team_status.to_csv(os.path.join(OUTPUT_FOLDER, "team_report.csv"), index=False)
 
-        # Plot
-        plt.figure(figsize=(10, 6))
-        plt.bar(team_status['team'], team_status['win_percentage'], color='green')
-        plt.xticks(rotation=45)
-        plt.ylabel("Win Percentage")
-        plt.title("Team-wise Win Percentage")
-        plt.tight_layout()
-        plt.savefig(os.path.join(OUTPUT_FOLDER, "team_win_plot.png"))
-        plt.close()
+        # Plot (rendered in the background)
+        get_chart_service().submit(
+            team_status[['team', 'win_percentage']].astype({'team': str}),
+            {"kind": "column", "x": "team", "y": "win_percentage", "color": "green",
+             "ylabel": "Win Percentage", "title": "Team-wise Win Percentage",
+             "rotation": 45, "figsize": (10, 6)},
+            os.path.join(OUTPUT_FOLDER, "team_win_plot.png"))
 
         print("\n📊 TEAM REPORT GENERATED:")
         print(team_status)
@@ -81,16 +94,32 @@ def generate_team_report():
         logging.error(f"Error in team report: {e}")
         print("❌ Error generating team report.")
 
-# Season-wise Report
-def generate_season_report():
+def season_report_path(seasons=None):
+    """output/season_report.csv, or season_report_<first>-<last>.csv for a
+    season-limited run so it never replaces the full report."""
+    if seasons is None:
+        return os.path.join(OUTPUT_FOLDER, "season_report.csv")
+    from partitions import season_range
+    first, last = season_range(seasons)
+    return os.path.join(OUTPUT_FOLDER, f"season_report_{first}-{last}.csv")
+
+# Season-wise Report (``seasons``: a season or (first, last); only those partitions are read)
+@instrumented()
+def generate_season_report(seasons=None):
+    import pandas as pd
+    setup()
     try:
-        matches, _ = load_data()
+        if seasons is None:
+            matches = get_dataset().matches
+        else:
+            from partitions import get_partitions
+            matches = get_partitions().read("matches", seasons)
 
         season_matches = pd.melt(matches, id_vars=['season'], value_vars=['team1', 'team2'],
                                  var_name='role', value_name='team')
-        season_matches = season_matches.groupby(['season', 'team']).size().reset_index(name='matches_played')
+        season_matches = season_matches.groupby(['season', 'team'], observed=True).size().reset_index(name='matches_played')
 
-        season_wins = matches.groupby(['season', 'winner']).size().reset_index(name='matches_won')
+        season_wins = matches.groupby(['season', 'winner'], observed=True).size().reset_index(name='matches_won')
         season_wins.rename(columns={'winner': 'team'}, inplace=True)
 
         season_perf = pd.merge(season_matches, season_wins, on=['season', 'team'], how='left')
@@ -98,7 +127,7 @@ def generate_season_report():
         season_perf['win_rate'] = round((season_perf['matches_won'] / season_perf['matches_played']) * 100, 2)
 
         season_perf = season_perf.sort_values(['season', 'win_rate'], ascending=[True, False])
-        season_perf.to_csv(os.path.join(OUTPUT_FOLDER, "season_report.csv"), index=False)
+        season_perf.to_csv(season_report_path(seasons), index=False)
 
         print("\n📅 SEASON REPORT GENERATED:")
         print(season_perf)
@@ -109,21 +138,21 @@ def generate_season_report():
         print("❌ Error generating season report.")
 
 # Player Performance
+@instrumented()
 def generate_player_analysis():
+    setup()
     try:
-        matches, _ = load_data()
+        matches = get_dataset().matches
         top_players = matches['player_of_match'].value_counts().head(10).reset_index()
         top_players.columns = ['Player', 'Awards']
 
         top_players.to_csv(os.path.join(OUTPUT_FOLDER, "top_players.csv"), index=False)
 
-        plt.figure(figsize=(10, 6))
-        plt.barh(top_players['Player'], top_players['Awards'], color='orange')
-        plt.xlabel("Player of the Match Awards")
-        plt.title("Top 10 Players")
-        plt.tight_layout()
-        plt.savefig(os.path.join(OUTPUT_FOLDER, "top_players_plot.png"))
-        plt.close()
+        get_chart_service().submit(
+            top_players.astype({'Player': str}),
+            {"kind": "barh", "x": "Player", "y": "Awards", "color": "orange",
+             "xlabel": "Player of the Match Awards", "title": "Top 10 Players", "figsize": (10, 6)},
+            os.path.join(OUTPUT_FOLDER, "top_players_plot.png"))
 
         print("\n🏅 PLAYER PERFORMANCE GENERATED:")
         print(top_players)
@@ -131,3 +160,46 @@ def generate_player_analysis():
     except Exception as e:
         logging.error(f"Error in player analysis: {e}")
         print("❌ Error generating player performance report.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the IPL analysis reports.")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every output even if its inputs are unchanged")
+    parser.add_argument("--metrics", action="store_true",
+                        help="record per-step timings to logs/metrics.jsonl and print a summary")
+    parser.add_argument("--seasons", type=int, nargs="+", metavar="SEASON",
+                        help="limit the season report to one season or FIRST LAST")
+    args = parser.parse_args(argv)
+
+    setup()
+    if args.metrics:
+        enable_metrics()
+    dataset = get_dataset()
+    data_version = {"matches": dataset.version("matches"), "deliveries": dataset.version("deliveries")}
+    seasons = (args.seasons[0], args.seasons[-1]) if args.seasons else None
+    manifest = BuildManifest(force=args.force)
+    # (key, step, targets, modules whose helpers the step calls)
+    loading = ["dataset", "memory"]
+    steps = [
+        ("create_database", create_database, [DB_PATH], ["ingest", "aggregates", "db_schema", *loading]),
+        ("team_report", generate_team_report,
+         [os.path.join(OUTPUT_FOLDER, "team_report.csv"), os.path.join(OUTPUT_FOLDER, "team_win_plot.png")],
+         ["chart_service", *loading]),
+        ("season_report", generate_season_report if seasons is None else lambda: generate_season_report(seasons),
+         [season_report_path(seasons)], ["partitions", *loading]),
+        ("player_analysis", generate_player_analysis,
+         [os.path.join(OUTPUT_FOLDER, "top_players.csv"), os.path.join(OUTPUT_FOLDER, "top_players_plot.png")],
+         ["chart_service", *loading]),
+    ]
+    for key, step, targets, code in steps:
+        params = dict(data_version, seasons=seasons) if key == "season_report" else data_version
+        if not manifest.run_if_stale(f"ipl_analysis.{key}", step, targets, params=params, code=code):
+            print(f"⏭️  {key} is up to date.")
+    wait_for_charts()
+    manifest.save()
+    print_metrics_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,50 @@
+import os
+
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Load the reports generated earlier
-team_status = pd.read_csv("team_report.csv")
-season_perf = pd.read_csv("season_report.csv")
-
-sns.set(style="whitegrid")
-
-# --- Team-wise Win % Bar Plot ---
-plt.figure(figsize=(12, 6))
-sns.barplot(data=team_status.sort_values('win_percentage', ascending=False),
-            x='team', y='win_percentage', palette='viridis')
-plt.title('Team-wise Win Percentage')
-plt.xticks(rotation=45, ha='right')
-plt.tight_layout()
-plt.savefig("team_win_percentage.png")
-plt.show()
-
-# --- Season-wise Win Rate Heatmap ---
-season_pivot = season_perf.pivot(index='team', columns='season', values='win_rate').fillna(0)
-plt.figure(figsize=(15, 10))
-sns.heatmap(season_pivot, annot=True, fmt=".1f", cmap="YlGnBu", linewidths=0.5)
-plt.title('Season-wise Team Win Rate (%)')
-plt.tight_layout()
-plt.savefig("season_win_rate_heatmap.png")
-plt.show()
-
-# --- Top Team Per Season Line Plot ---
-top_teams = season_perf.sort_values(['season', 'win_rate'], ascending=[True, False]) \
-                       .groupby('season').first().reset_index()
-
-plt.figure(figsize=(12, 6))
-sns.lineplot(data=top_teams, x='season', y='win_rate', hue='team', marker='o', palette='tab10')
-plt.title('Top Performing Team Each Season by Win Rate')
-plt.tight_layout()
-plt.savefig("top_team_per_season.png")
-plt.show()
+
+from analytics_index import get_matchup_index
+from chart_service import get_chart_service
+from db_schema import connect
+
+
+def main():
+    # Load the reports generated earlier
+    team_status = pd.read_csv("team_report.csv")
+    season_perf = pd.read_csv("season_report.csv")
+
+    charts = get_chart_service()
+    try:
+        # --- Team-wise Win % Bar Plot ---
+        charts.submit(team_status.sort_values('win_percentage', ascending=False)[['team', 'win_percentage']],
+                      {"kind": "sns_bar", "x": "team", "y": "win_percentage", "palette": "viridis",
+                       "style": "whitegrid", "title": "Team-wise Win Percentage",
+                       "rotation": 45, "ha": "right", "figsize": (12, 6)},
+                      "team_win_percentage.png")
+
+        # --- Season-wise Win Rate Heatmap ---
+        # Read from the matchup index when the database is built; otherwise pivot the report
+        if os.path.exists("ipl_analysis.db"):
+            season_pivot = get_matchup_index(connect("ipl_analysis.db", read_only=True)).season_win_rates()
+        else:
+            season_pivot = season_perf.pivot(index='team', columns='season', values='win_rate').fillna(0)
+        charts.submit(season_pivot,
+                      {"kind": "heatmap", "cmap": "YlGnBu", "fmt": ".1f", "style": "whitegrid",
+                       "title": "Season-wise Team Win Rate (%)", "figsize": (15, 10)},
+                      "season_win_rate_heatmap.png")
+
+        # --- Top Team Per Season Line Plot ---
+        top_teams = season_perf.sort_values(['season', 'win_rate'], ascending=[True, False]) \
+                               .groupby('season').first().reset_index()
+
+        charts.submit(top_teams[['season', 'win_rate', 'team']],
+                      {"kind": "sns_line", "x": "season", "y": "win_rate", "hue": "team", "palette": "tab10",
+                       "style": "whitegrid", "title": "Top Performing Team Each Season by Win Rate",
+                       "figsize": (12, 6)},
+                      "top_team_per_season.png")
+    finally:
+        # Chart workers are spawned and re-import this script, hence the guard below
+        charts.shutdown()
+
+
+if __name__ == "__main__":
+    main()
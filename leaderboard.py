@@ -0,0 +1,144 @@
+# leaderboard.py
+
+import numbers
+
+from aggregates import PHASES
+
+# Where each role's numbers live: the per-season summary table (enough when
+# filtering by season alone) and the per-match, per-phase splits table.
+ROLES = {
+    "batting": {"key": "batsman", "summary": "batting_summary", "splits": "batting_splits"},
+    "bowling": {"key": "bowler", "summary": "bowling_summary", "splits": "bowling_splits"},
+    "team": {"key": "team", "summary": "team_summary", "splits": None},
+}
+
+# Team results per match and side, for team leaderboards filtered by venue
+TEAM_MATCHES = """(
+        SELECT id AS match_id, team1 AS team, CASE WHEN winner = team1 THEN 1 ELSE 0 END AS wins, 1 AS matches
+        FROM matches
+        UNION ALL
+        SELECT id, team2, CASE WHEN winner = team2 THEN 1 ELSE 0 END, 1
+        FROM matches
+    )"""
+
+# metric -> (role, SQL expression, sort order, HAVING condition or None)
+METRICS = {
+    "runs": ("batting", "SUM(runs)", "DESC", None),
+    "fours": ("batting", "SUM(fours)", "DESC", "SUM(fours) > 0"),
+    "sixes": ("batting", "SUM(sixes)", "DESC", "SUM(sixes) > 0"),
+    "strike_rate": ("batting", "ROUND(SUM(runs) * 100.0 / SUM(balls), 2)", "DESC", "SUM(balls) > 0"),
+    "batting_average": ("batting", "ROUND(SUM(runs) * 1.0 / SUM(dismissals), 2)", "DESC", "SUM(dismissals) > 0"),
+    "wickets": ("bowling", "SUM(wickets)", "DESC", "SUM(wickets) > 0"),
+    "economy": ("bowling", "ROUND(SUM(runs_conceded) * 6.0 / SUM(balls), 2)", "ASC", "SUM(balls) > 0"),
+    "bowling_average": ("bowling", "ROUND(SUM(runs_conceded) * 1.0 / SUM(wickets), 2)", "ASC", "SUM(wickets) > 0"),
+    "bowling_strike_rate": ("bowling", "ROUND(SUM(balls) * 1.0 / SUM(wickets), 2)", "ASC", "SUM(wickets) > 0"),
+    "wins": ("team", "SUM(wins)", "DESC", "SUM(wins) > 0"),
+    "matches": ("team", "SUM(matches)", "DESC", None),
+}
+
+
+def _season_range(seasons):
+    if seasons is None:
+        return None
+    if isinstance(seasons, numbers.Integral):     # numpy ints too, e.g. matches["season"].max()
+        return int(seasons), int(seasons)
+    first, last = seasons
+    return int(first), int(last)
+
+
+def leaderboard_sql(metric, seasons=None, venue=None, team=None, phase=None, k=5, min_balls=0, labels=None):
+    """SQL and parameters for the top ``k`` by ``metric``.
+
+    ``seasons`` is a season or an inclusive (first, last) range, ``team`` the
+    player's side (or the team itself for team metrics) and ``phase`` one of
+    PHASES. ``min_balls`` counts balls faced or bowled. ``labels`` names the
+    two result columns (default: the player/team key and the metric).
+
+    Seasons, k and min_balls are validated integers written into the SQL;
+    venue, team and phase are bound as parameters, so a given combination of
+    filters always produces the same statement and reuses the prepared one.
+    Filtering by season only reads the per-season summaries; venue, team
+    (for players) or phase read the per-match splits.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}'. Choose from: {', '.join(METRICS)}")
+    if phase is not None and phase not in PHASES:
+        raise ValueError(f"Unknown phase '{phase}'. Choose from: {', '.join(PHASES)}")
+    role, expression, order, having = METRICS[metric]
+    if role == "team" and (phase is not None or min_balls):
+        raise ValueError("Team metrics cannot be filtered by phase or balls.")
+
+    info = ROLES[role]
+    key = info["key"]
+    key_label, value_label = labels or (key if role == "team" else "player", metric)
+    seasons = _season_range(seasons)
+    conditions, params = [], []
+
+    if venue is None and phase is None and (team is None or role == "team"):
+        source = info["summary"]
+        if seasons:
+            conditions.append(f"season BETWEEN {seasons[0]} AND {seasons[1]}")
+        if team is not None:
+            conditions.append("team = ?")
+            params.append(team)
+    else:
+        splits = info["splits"] or TEAM_MATCHES
+        # Only season and venue live on matches; skip the join otherwise
+        source = f"{splits} s JOIN matches m ON m.id = s.match_id" if seasons or venue else f"{splits} s"
+        if seasons:
+            conditions.append(f"m.season BETWEEN {seasons[0]} AND {seasons[1]}")
+        for column, value in (("m.venue", venue), ("s.team", team), ("s.phase", phase)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+
+    having_conditions = [having] if having else []
+    if min_balls:
+        having_conditions.append(f"SUM(balls) >= {int(min_balls)}")
+
+    sql = f"SELECT {key} AS {key_label}, {expression} AS {value_label}\nFROM {source}\n"
+    if conditions:
+        sql += f"WHERE {' AND '.join(conditions)}\n"
+    sql += f"GROUP BY {key}\n"
+    if having_conditions:
+        sql += f"HAVING {' AND '.join(having_conditions)}\n"
+    # Ties are broken by name so results are deterministic
+    sql += f"ORDER BY {value_label} {order}, {key_label}\n"
+    if k is not None:
+        sql += f"LIMIT {int(k)}"
+    return sql + ";", tuple(params)
+
+
+def leaderboard(conn, metric, cache=None, **filters):
+    """Run leaderboard_sql and return the frame (through ``cache`` if given)."""
+    import pandas as pd
+
+    sql, params = leaderboard_sql(metric, **filters)
+    if cache is not None:
+        return cache.read_sql(conn, sql, params)
+    return pd.read_sql_query(sql, conn, params=params or None)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from db_schema import connect
+
+    parser = argparse.ArgumentParser(description="Print a leaderboard from the analysis database.")
+    parser.add_argument("metric", choices=list(METRICS))
+    parser.add_argument("--seasons", type=int, nargs="+", metavar="SEASON", help="one season or FIRST LAST")
+    parser.add_argument("--venue")
+    parser.add_argument("--team")
+    parser.add_argument("--phase", choices=list(PHASES))
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--min-balls", type=int, default=0)
+    parser.add_argument("--db", default="ipl_analysis.db")
+    args = parser.parse_args()
+
+    seasons = None
+    if args.seasons:
+        seasons = (args.seasons[0], args.seasons[-1])
+    conn = connect(args.db, read_only=True)
+    print(leaderboard(conn, args.metric, seasons=seasons, venue=args.venue, team=args.team,
+                      phase=args.phase, k=args.k, min_balls=args.min_balls).to_string(index=False))
+    conn.close()
@@ -0,0 +1,361 @@
+# live_feed.py
+
+# Streaming mode for live matches: tails an append-only JSONL feed of
+# deliveries (one deliveries.csv row per line) and folds each ball into
+# running totals, so leaderboards, team totals and the current run rate
+# are always up to date without re-running main.py. Applying a ball
+# touches a fixed number of counters and one top-k list per leaderboard,
+# however long the history; reading the state copies those lists.
+# The totals are checkpointed to SQLite (db_schema.LIVE_DDL) with the feed
+# offset they correspond to, so a restart resumes exactly where it left off.
+#
+#   python live_feed.py feed.jsonl [--follow] [--db ipl_analysis.db]
+#   python live_feed.py feed.jsonl --replay data/deliveries.csv [--rate 200]
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+
+from db_schema import BOWLER_DISMISSALS, NOT_OUT_DISMISSALS, connect, create_live_tables
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "ipl_analysis.db"
+DEFAULT_K = 10
+CHECKPOINT_BALLS = 120          # checkpoint at least every 20 overs of feed...
+CHECKPOINT_SECONDS = 5.0        # ...or every few seconds, whichever comes first
+POLL_SECONDS = 0.2
+
+# Leaderboards kept incrementally: metric -> (role, position in the role's counters)
+BOARDS = {
+    "runs": ("batting", 0),
+    "fours": ("batting", 2),
+    "sixes": ("batting", 3),
+    "wickets": ("bowling", 2),
+}
+BATTING_COLUMNS = ["runs", "balls", "fours", "sixes", "dismissals"]
+BOWLING_COLUMNS = ["balls", "runs_conceded", "wickets"]
+
+
+class TopK:
+    """The ``k`` largest values by name, ties broken by name.
+
+    Counts only ever grow, so a name can only enter the list when its own
+    value changes: each update is a bounded insert into at most k + 1
+    entries, independent of how many names there are.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self._entries = []      # sorted (-value, name)
+        self._values = {}
+
+    def update(self, name, value):
+        current = self._values.get(name)
+        if current == value:
+            return
+        if current is not None:
+            self._entries.remove((-current, name))
+        elif len(self._entries) >= self.k and (-value, name) >= self._entries[-1]:
+            return
+        self._values[name] = value
+        bisect.insort(self._entries, (-value, name))
+        if len(self._entries) > self.k:
+            _, dropped = self._entries.pop()
+            del self._values[dropped]
+
+    def items(self):
+        return [(name, -value) for value, name in self._entries]
+
+
+def _int(value):
+    return int(value) if value not in (None, "") else 0
+
+
+class LiveAggregates:
+    """Running batting, bowling and innings totals for a stream of balls.
+
+    Counters follow the summary tables (aggregates.py): balls faced exclude
+    wides, balls bowled count every delivery, only BOWLER_DISMISSALS
+    credit the bowler and NOT_OUT_DISMISSALS (retired hurt) are no
+    dismissal. Team run rates use legal balls (no wides or no-balls).
+    """
+
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.batting = {}       # batsman -> [runs, balls, fours, sixes, dismissals]
+        self.bowling = {}       # bowler -> [balls, runs_conceded, wickets]
+        self.innings = {}       # (match_id, inning) -> [batting_team, runs, wickets, legal_balls]
+        self.current = None     # (match_id, inning) of the latest ball
+        self.balls = 0
+        self.boards = {metric: TopK(k) for metric in BOARDS}
+        self.dirty = {"batting": set(), "bowling": set(), "innings": set()}
+        self._lock = threading.Lock()
+
+    def apply(self, ball):
+        """Fold one delivery (a dict of deliveries.csv fields) into the totals."""
+        batsman, bowler, dismissed = ball.get("batsman"), ball.get("bowler"), ball.get("player_dismissed")
+        runs, total = _int(ball.get("batsman_runs")), _int(ball.get("total_runs"))
+        wide, noball = _int(ball.get("wide_runs")), _int(ball.get("noball_runs"))
+        key = (_int(ball.get("match_id")), _int(ball.get("inning")))
+        # Scored the same way as innings.py: a retired-hurt batsman is not out
+        out = bool(dismissed) and ball.get("dismissal_kind") not in NOT_OUT_DISMISSALS
+        with self._lock:
+            if batsman:
+                stats = self.batting.setdefault(batsman, [0, 0, 0, 0, 0])
+                stats[0] += runs
+                stats[1] += wide == 0
+                stats[2] += runs == 4
+                stats[3] += runs == 6
+                self._touch("batting", batsman, stats)
+            if out:
+                stats = self.batting.setdefault(dismissed, [0, 0, 0, 0, 0])
+                stats[4] += 1
+                self.dirty["batting"].add(dismissed)
+            if bowler:
+                stats = self.bowling.setdefault(bowler, [0, 0, 0])
+                stats[0] += 1
+                stats[1] += total
+                stats[2] += ball.get("dismissal_kind") in BOWLER_DISMISSALS
+                self._touch("bowling", bowler, stats)
+            innings = self.innings.setdefault(key, [ball.get("batting_team"), 0, 0, 0])
+            innings[1] += total
+            innings[2] += out
+            innings[3] += wide == 0 and noball == 0
+            self.dirty["innings"].add(key)
+            self.current = key
+            self.balls += 1
+
+    def _touch(self, role, name, stats):
+        self.dirty[role].add(name)
+        for metric, (board_role, position) in BOARDS.items():
+            if board_role == role and stats[position]:
+                self.boards[metric].update(name, stats[position])
+
+    def leaderboard(self, metric):
+        """[(player, value)] for one of BOARDS, best first."""
+        if metric not in BOARDS:
+            raise ValueError(f"Unknown live metric '{metric}'. Choose from: {', '.join(BOARDS)}")
+        with self._lock:
+            return self.boards[metric].items()
+
+    def innings_state(self, key=None):
+        """{"match_id", "inning", "team", "runs", "wickets", "overs", "run_rate"}
+        for ``key`` (default: the innings of the latest ball), or None."""
+        with self._lock:
+            key = key or self.current
+            if key not in self.innings:
+                return None
+            team, runs, wickets, legal = self.innings[key]
+        return {"match_id": key[0], "inning": key[1], "team": team, "runs": runs, "wickets": wickets,
+                "overs": f"{legal // 6}.{legal % 6}", "run_rate": round(runs * 6.0 / legal, 2) if legal else 0.0}
+
+    def state(self):
+        """Everything a dashboard shows: balls seen, the current innings and
+        every leaderboard."""
+        return {"balls": self.balls, "current": self.innings_state(),
+                "leaderboards": {metric: self.leaderboard(metric) for metric in BOARDS}}
+
+    # --- checkpoints ---
+
+    def checkpoint(self, conn, feed, offset):
+        """Write the rows changed since the last checkpoint and the feed
+        position they correspond to, in one transaction."""
+        with self._lock:
+            batting = [(name, *self.batting[name]) for name in self.dirty["batting"]]
+            bowling = [(name, *self.bowling[name]) for name in self.dirty["bowling"]]
+            innings = [(*key, *self.innings[key]) for key in self.dirty["innings"]]
+            position = (feed, offset, self.balls, *(self.current or (None, None)))
+            for names in self.dirty.values():
+                names.clear()
+        with conn:
+            conn.executemany(f"INSERT OR REPLACE INTO live_batting (batsman, {', '.join(BATTING_COLUMNS)}) "
+                             "VALUES (?, ?, ?, ?, ?, ?)", batting)
+            conn.executemany(f"INSERT OR REPLACE INTO live_bowling (bowler, {', '.join(BOWLING_COLUMNS)}) "
+                             "VALUES (?, ?, ?, ?)", bowling)
+            conn.executemany("INSERT OR REPLACE INTO live_innings "
+                             "(match_id, inning, batting_team, runs, wickets, legal_balls) "
+                             "VALUES (?, ?, ?, ?, ?, ?)", innings)
+            conn.execute("INSERT OR REPLACE INTO live_feed (feed, offset, balls, match_id, inning) "
+                         "VALUES (?, ?, ?, ?, ?)", position)
+
+    def restore(self, conn, feed):
+        """Load the last checkpoint of ``feed``; returns the feed offset to
+        resume from. A database holding another feed's totals is cleared."""
+        create_live_tables(conn)
+        row = conn.execute("SELECT offset, balls, match_id, inning FROM live_feed WHERE feed = ?",
+                           (feed,)).fetchone()
+        if row is None:
+            with conn:
+                for table in ("live_batting", "live_bowling", "live_innings", "live_feed"):
+                    conn.execute(f"DELETE FROM {table}")
+            return 0
+        offset, balls, match_id, inning = row
+        with self._lock:
+            self.balls = balls
+            self.current = (match_id, inning) if match_id is not None else None
+            for name, *stats in conn.execute(f"SELECT batsman, {', '.join(BATTING_COLUMNS)} FROM live_batting"):
+                self.batting[name] = stats
+                self._touch("batting", name, stats)
+            for name, *stats in conn.execute(f"SELECT bowler, {', '.join(BOWLING_COLUMNS)} FROM live_bowling"):
+                self.bowling[name] = stats
+                self._touch("bowling", name, stats)
+            for match_id, inning, *stats in conn.execute(
+                    "SELECT match_id, inning, batting_team, runs, wickets, legal_balls FROM live_innings"):
+                self.innings[(match_id, inning)] = stats
+            for names in self.dirty.values():
+                names.clear()
+        return offset
+
+
+def tail(path, offset=0, follow=False, stop=None, poll=POLL_SECONDS):
+    """Yield (record, offset after it) for each complete line of the JSONL
+    file at ``path`` from byte ``offset``; with ``follow``, wait for more
+    lines until ``stop`` (a threading.Event) is set. Lines that are not
+    valid JSON are logged and skipped."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            line = f.readline()
+            if line.endswith(b"\n"):
+                offset += len(line)
+                if line.strip():
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning("Skipped a malformed line ending at byte %d of %s.", offset, path)
+                        continue
+                    yield record, offset
+                continue
+            f.seek(offset)      # a partly written line is read again once complete
+            if not follow or (stop is not None and stop.is_set()):
+                return
+            time.sleep(poll)
+
+
+class LiveIngest:
+    """Tails ``feed_path`` into LiveAggregates, checkpointing to ``db_path``."""
+
+    def __init__(self, feed_path, db_path=DB_PATH, k=DEFAULT_K,
+                 checkpoint_balls=CHECKPOINT_BALLS, checkpoint_seconds=CHECKPOINT_SECONDS):
+        self.feed_path = feed_path
+        self.feed = os.path.abspath(feed_path)
+        self.db_path = db_path
+        self.checkpoint_balls = checkpoint_balls
+        self.checkpoint_seconds = checkpoint_seconds
+        self.aggregates = LiveAggregates(k)
+        conn = connect(db_path)
+        try:
+            self.offset = self.aggregates.restore(conn, self.feed)
+        finally:
+            conn.close()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def state(self):
+        return self.aggregates.state()
+
+    def run(self, follow=False):
+        """Apply every ball appended since the last checkpoint (and keep
+        tailing with ``follow`` until stop()); returns the balls applied."""
+        conn = connect(self.db_path)
+        applied, since, last = 0, 0, time.monotonic()
+        try:
+            for ball, offset in tail(self.feed_path, self.offset, follow, self._stop):
+                self.aggregates.apply(ball)
+                self.offset = offset
+                applied += 1
+                since += 1
+                if since >= self.checkpoint_balls or time.monotonic() - last >= self.checkpoint_seconds:
+                    self.aggregates.checkpoint(conn, self.feed, self.offset)
+                    since, last = 0, time.monotonic()
+        finally:
+            # Whatever stopped the tail, keep what was applied
+            try:
+                self.aggregates.checkpoint(conn, self.feed, self.offset)
+            finally:
+                conn.close()
+        return applied
+
+    def start(self):
+        """Tail the feed on a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, kwargs={"follow": True}, name="live-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def replay(csv_path, feed_path, rate=None, limit=None):
+    """Append the rows of a deliveries CSV to ``feed_path`` as JSONL, at
+    ``rate`` balls per second (None = as fast as possible)."""
+    import csv
+
+    with open(csv_path, newline="") as src, open(feed_path, "a") as feed:
+        for i, row in enumerate(csv.DictReader(src)):
+            if limit is not None and i >= limit:
+                break
+            feed.write(json.dumps({k: v for k, v in row.items() if v != ""}) + "\n")
+            if rate:
+                feed.flush()
+                time.sleep(1.0 / rate)
+
+
+def print_state(state):
+    current = state["current"]
+    if current:
+        print(f"\n📊 Match {current['match_id']}, innings {current['inning']}: {current['team']} "
+              f"{current['runs']}/{current['wickets']} in {current['overs']} overs "
+              f"(RR {current['run_rate']}) — {state['balls']} balls seen")
+    for metric, rows in state["leaderboards"].items():
+        print(f"   {metric:<8} " + ", ".join(f"{name} {value}" for name, value in rows[:5]))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fold a live JSONL delivery feed into running leaderboards.")
+    parser.add_argument("feed", help="append-only JSONL file, one delivery per line")
+    parser.add_argument("--db", default=DB_PATH, help="database the running totals are checkpointed to")
+    parser.add_argument("--follow", action="store_true", help="keep tailing the feed until Ctrl+C")
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help="leaderboard length")
+    parser.add_argument("--replay", metavar="CSV", help="append this deliveries CSV to the feed first")
+    parser.add_argument("--rate", type=float, help="with --replay: balls per second (default: all at once)")
+    args = parser.parse_args()
+
+    if args.replay and not args.rate:
+        replay(args.replay, args.feed)
+    open(args.feed, "a").close()
+    ingest = LiveIngest(args.feed, args.db, k=args.k)
+    if args.replay and args.rate:
+        # Write the feed in the background and watch it arrive
+        threading.Thread(target=replay, args=(args.replay, args.feed, args.rate), daemon=True).start()
+        args.follow = True
+
+    if args.follow:
+        ingest.start()
+        try:
+            while True:
+                time.sleep(2)
+                print_state(ingest.state())
+        except KeyboardInterrupt:
+            print("\n📌 Stopping; writing a final checkpoint.")
+        finally:
+            ingest.stop()
+    else:
+        start = time.perf_counter()
+        applied = ingest.run()
+        seconds = time.perf_counter() - start
+        print(f"✅ Applied {applied} balls in {seconds:.2f}s"
+              + (f" ({seconds / applied * 1e6:.1f} µs per ball incl. checkpoints)" if applied else ""))
+        read_start = time.perf_counter()
+        state = ingest.state()
+        print(f"⏱️  State read in {(time.perf_counter() - read_start) * 1e6:.0f} µs")
+        print_state(state)
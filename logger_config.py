@@ -1,7 +1,12 @@
 # logger_config.py
 
+import functools
+import json
 import logging
 import os
+import sys
+import threading
+import time
 
 def setup_logger(name="ipl_logger", log_file="ipl_project.log", level=logging.DEBUG):
     os.makedirs("logs", exist_ok=True)
@@ -23,3 +28,193 @@ def setup_logger(name="ipl_logger", log_file="ipl_project.log", level=logging.DE
         logger.addHandler(stream_handler)
 
     return logger
+
+
+# --- Instrumentation ---
+#
+# measure()/instrumented() record wall time, CPU time, how far the
+# process's peak RSS grew, and row counts per stage or SQL query as JSON
+# lines in logs/metrics.jsonl, and
+# print_metrics_summary() prints a table at the end of a run. Off by default
+# (enable_metrics() or IPL_METRICS=1); while off, measure() hands back a
+# shared no-op object and instrumented() calls straight through.
+
+METRICS_FILE = "metrics.jsonl"
+
+
+class _MetricsState:
+    def __init__(self):
+        self.enabled = os.environ.get("IPL_METRICS") == "1"
+        self.trace_memory = False
+        self.log_file = METRICS_FILE
+        self.records = []
+        self.lock = threading.Lock()
+
+
+_metrics = _MetricsState()
+
+
+def enable_metrics(log_file=METRICS_FILE, trace_memory=False):
+    """Start recording. ``trace_memory`` adds the Python heap peak per
+    measurement via tracemalloc, which slows allocation-heavy code down."""
+    _metrics.enabled = True
+    _metrics.log_file = log_file
+    _metrics.trace_memory = trace_memory
+    if trace_memory:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def disable_metrics():
+    _metrics.enabled = False
+
+
+def metrics_enabled():
+    return _metrics.enabled
+
+
+def query_label(sql):
+    """Short one-line label for a SQL statement."""
+    text = " ".join(sql.split())
+    return text if len(text) <= 60 else text[:57] + "..."
+
+
+def count_rows(value):
+    """Row count of a frame or sequence result, None for anything else."""
+    shape = getattr(value, "shape", None)
+    if shape:
+        return int(shape[0])
+    if isinstance(value, list):
+        return len(value)
+    return None
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:         # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+class Measurement:
+    """Context manager timing one stage or query; set ``rows`` inside the block.
+
+    With ``emit=False`` the record is only kept on ``self.record`` (used in
+    pipeline workers, which hand it back to the parent to be recorded).
+    """
+
+    def __init__(self, name, kind="stage", rows=None, emit=True):
+        self.name = name
+        self.kind = kind
+        self.rows = rows
+        self.emit = emit
+        self.record = None
+
+    def __enter__(self):
+        if _metrics.trace_memory:
+            import tracemalloc
+            tracemalloc.reset_peak()
+        self._rss = _peak_rss_mb()
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.thread_time() - self._cpu
+        peak = _peak_rss_mb()
+        # ru_maxrss is the process's lifetime high-water mark: what this
+        # measurement tells is how far it pushed that mark up
+        self.record = {
+            "ts": round(time.time(), 3), "kind": self.kind, "name": self.name,
+            "wall_s": round(wall, 6), "cpu_s": round(cpu, 6),
+            "rss_growth_mb": None if peak is None else round(peak - self._rss, 1),
+            "process_peak_rss_mb": peak, "rows": self.rows, "ok": exc_type is None,
+        }
+        if _metrics.trace_memory:
+            import tracemalloc
+            self.record["py_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1 << 20), 1)
+        if self.emit:
+            record_metrics(self.record)
+        return False
+
+
+class _NullMeasurement:
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_MEASUREMENT = _NullMeasurement()
+
+
+def measure(name, kind="stage", rows=None):
+    if not _metrics.enabled:
+        return _NULL_MEASUREMENT
+    return Measurement(name, kind, rows)
+
+
+def instrumented(name=None, kind="stage"):
+    """Decorator measuring each call; rows are taken from the return value."""
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _metrics.enabled:
+                return fn(*args, **kwargs)
+            with Measurement(label, kind) as m:
+                result = fn(*args, **kwargs)
+                m.rows = count_rows(result)
+            return result
+        return wrapper
+    return decorate
+
+
+def record_metrics(record):
+    """Keep a finished record for the summary and append it to the JSON log."""
+    line = json.dumps(record)
+    with _metrics.lock:
+        _metrics.records.append(record)
+        os.makedirs("logs", exist_ok=True)
+        with open(os.path.join("logs", _metrics.log_file), "a") as f:
+            f.write(line + "\n")
+
+
+def metrics_summary():
+    """Per (kind, name) totals of the records so far, slowest first."""
+    totals = {}
+    with _metrics.lock:
+        records = list(_metrics.records)
+    for record in records:
+        entry = totals.setdefault((record["kind"], record["name"]),
+                                  {"kind": record["kind"], "name": record["name"], "calls": 0,
+                                   "wall_s": 0.0, "cpu_s": 0.0, "rss_growth_mb": None, "rows": None})
+        entry["calls"] += 1
+        entry["wall_s"] += record["wall_s"]
+        entry["cpu_s"] += record["cpu_s"]
+        if record.get("rss_growth_mb") is not None:
+            entry["rss_growth_mb"] = max(entry["rss_growth_mb"] or 0, record["rss_growth_mb"])
+        if record["rows"] is not None:
+            entry["rows"] = (entry["rows"] or 0) + record["rows"]
+    return sorted(totals.values(), key=lambda e: e["wall_s"], reverse=True)
+
+
+def print_metrics_summary():
+    rows = metrics_summary()
+    if not rows:
+        return
+    print(f"\n⏱️  {'kind':<6} {'name':<45} {'calls':>5} {'wall s':>8} {'cpu s':>8} {'+rss MB':>7} {'rows':>8}")
+    for e in rows:
+        rss = "-" if e["rss_growth_mb"] is None else f"{e['rss_growth_mb']:.0f}"
+        count = "-" if e["rows"] is None else str(e["rows"])
+        print(f"   {e['kind']:<6} {e['name'][:45]:<45} {e['calls']:>5} {e['wall_s']:>8.3f} "
+              f"{e['cpu_s']:>8.3f} {rss:>7} {count:>8}")
@@ -1,8 +1,6 @@
-import pandas as pd
-import sqlite3
+import argparse
+import logging
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 from sql_queries import (
     top_teams_query, top_batsmen_query,
@@ -10,111 +8,215 @@ from sql_queries import (
     top_bowlers_query, most_matches_played_query
 )
 from visualizations import plot_top_teams, plot_top_batsmen
-from exceptions import IPLDataError, IPLDatabaseError, IPLReportError
+from chart_service import wait_for_charts
+from dataset import get_dataset
+from db_schema import connect
+from ingest import stream_ingest
+from innings import innings_paths, reconstruct, write_innings_tables
+from partitions import CATALOGUE_PATH, get_partitions
+from exceptions import IPLDataError, IPLDatabaseError
+from pipeline import Pipeline, Stage
+from build_cache import BuildManifest
 
-# Manual import of logger_config to avoid import error
-import importlib.util
+from logger_config import enable_metrics, measure, print_metrics_summary, query_label, setup_logger
+from memory import describe
 
-module_path = os.path.join(os.getcwd(), 'logger_config.py')
-spec = importlib.util.spec_from_file_location("logger_config", module_path)
-logger_config = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(logger_config)
+# Handlers are attached in main(); importing this module has no side effects
+logger = logging.getLogger("main_logger")
 
-setup_logger = logger_config.setup_logger
-logger = setup_logger("main_logger")
+DB_PATH = "ipl_analysis.db"
 
-try:
-    os.makedirs("plots", exist_ok=True)
 
-    # Load data
-    try:
-        matches_df = pd.read_csv("data/matches.csv")
-        deliveries_df = pd.read_csv("data/deliveries.csv")
-        logger.info("CSV files loaded successfully.")
-    except Exception as e:
-        logger.critical("Failed to load CSV files.")
-        raise IPLDataError("CSV loading failed.") from e
+# --- Stages ---
 
-    # Connect to SQLite DB
-    try:
-        conn = sqlite3.connect("ipl_analysis.db")
-        logger.info("Connected to SQLite database.")
-    except Exception as e:
-        logger.critical("Database connection failed.")
-        raise IPLDatabaseError("DB connection failed.") from e
+def load_matches():
+    dataset = get_dataset()
+    matches_df = dataset.matches
+    # Downcast on load: pandas defaults -> in memory
+    logger.info("Matches loaded successfully (%s).", describe(dataset.memory_reports["matches"]))
+    return matches_df
 
-    # Save DataFrames to SQL
-    try:
-        matches_df.to_sql("matches", conn, index=False, if_exists="replace")
-        deliveries_df.to_sql("deliveries", conn, index=False, if_exists="replace")
-        logger.info("Data written to database successfully.")
-    except Exception as e:
-        logger.error("Failed to write data to DB.")
-        raise IPLDatabaseError("DB write failed.") from e
 
-    # Team report
+def write_database():
+    # Append only matches not yet in the DB, streaming deliveries.csv in
+    # chunks so memory stays flat however large the file grows
+    dataset = get_dataset()
+    conn = connect(DB_PATH)
     try:
-        team1_counts = matches_df['team1'].value_counts()
-        team2_counts = matches_df['team2'].value_counts()
-        total_matches = (team1_counts + team2_counts).reset_index()
-        total_matches.columns = ['team', 'matches_played']
+        stats = stream_ingest(conn, dataset.source_path("matches"), dataset.source_path("deliveries"))
+    finally:
+        conn.close()
+    logger.info("Data written to database successfully (%d new matches, %.0f rows/sec).",
+                len(stats["match_ids"]), stats["rows_per_sec"])
+    return DB_PATH
 
-        total_wins = matches_df['winner'].value_counts().reset_index()
-        total_wins.columns = ['team', 'matches_won']
 
-        team_status = pd.merge(total_matches, total_wins, on='team', how='left')
-        team_status['matches_won'].fillna(0, inplace=True)
-        team_status['win_percentage'] = round((team_status['matches_won'] / team_status['matches_played']) * 100, 2)
+def team_report(matches):
+    import pandas as pd
 
-        team_status.to_csv("team_report.csv", index=False)
-        logger.info("Team report generated.")
-    except Exception as e:
-        logger.error("Failed to generate team report.")
-        raise IPLReportError("Team report generation failed.") from e
+    team1_counts = matches['team1'].value_counts()
+    team2_counts = matches['team2'].value_counts()
+    total_matches = (team1_counts + team2_counts).reset_index()
+    total_matches.columns = ['team', 'matches_played']
 
-    # Season report
-    try:
-        season_matches = pd.melt(matches_df, id_vars=['season'], value_vars=['team1', 'team2'],
-                                 var_name='position', value_name='team')
-        season_matches = season_matches.groupby(['season', 'team']).size().reset_index(name='matches_played')
+    total_wins = matches['winner'].value_counts().reset_index()
+    total_wins.columns = ['team', 'matches_won']
 
-        season_wins = matches_df.groupby(['season', 'winner']).size().reset_index(name='matches_won')
-        season_wins.rename(columns={'winner': 'team'}, inplace=True)
+    team_status = pd.merge(total_matches, total_wins, on='team', how='left')
+    team_status['matches_won'] = team_status['matches_won'].fillna(0)
+    team_status['win_percentage'] = round((team_status['matches_won'] / team_status['matches_played']) * 100, 2)
 
-        season_perf = pd.merge(season_matches, season_wins, on=['season', 'team'], how='left')
-        season_perf['matches_won'].fillna(0, inplace=True)
-        season_perf['win_rate'] = round((season_perf['matches_won'] / season_perf['matches_played']) * 100, 2)
+    team_status.to_csv("team_report.csv", index=False)
+    logger.info("Team report generated.")
+    return "team_report.csv"
 
-        season_perf.to_csv("season_report.csv", index=False)
-        logger.info("Season report generated.")
-    except Exception as e:
-        logger.error("Failed to generate season report.")
-        raise IPLReportError("Season report generation failed.") from e
 
-    # Top Teams and Batsmen from SQL
-    try:
-        pd.read_sql(top_teams_query, conn).to_csv("top_teams.csv", index=False)
-        pd.read_sql(top_batsmen_query, conn).to_csv("top_batsmen.csv", index=False)
-        logger.info("Top teams and batsmen reports saved.")
-    except Exception as e:
-        logger.error("SQL query execution failed.")
-        raise IPLReportError("SQL report failure.") from e
+def season_report(matches):
+    import pandas as pd
+
+    season_matches = pd.melt(matches, id_vars=['season'], value_vars=['team1', 'team2'],
+                             var_name='position', value_name='team')
+    season_matches = season_matches.groupby(['season', 'team'], observed=True).size().reset_index(name='matches_played')
+
+    season_wins = matches.groupby(['season', 'winner'], observed=True).size().reset_index(name='matches_won')
+    season_wins.rename(columns={'winner': 'team'}, inplace=True)
+
+    season_perf = pd.merge(season_matches, season_wins, on=['season', 'team'], how='left')
+    season_perf['matches_won'] = season_perf['matches_won'].fillna(0)
+    season_perf['win_rate'] = round((season_perf['matches_won'] / season_perf['matches_played']) * 100, 2)
 
-    # Extra queries
+    season_perf.to_csv("season_report.csv", index=False)
+    logger.info("Season report generated.")
+    return "season_report.csv"
+
+
+def innings_tables():
+    # Scorecards, partnerships and run-rate timelines for every innings
+    paths = write_innings_tables(reconstruct(get_dataset().deliveries))
+    logger.info("Innings tables written to %s.", os.path.dirname(paths[0]))
+    return tuple(paths)
+
+
+def season_partitions():
+    # Per-season columnar files for season-scoped reads; only changed seasons are rewritten
+    partitions = get_partitions()
+    stats = partitions.refresh()
+    logger.info("Season partitions: %d written, %d unchanged.", len(stats["written"]), stats["kept"])
+    return partitions.catalogue_path
+
+
+def save_queries(db_path, reports):
+    import pandas as pd
+
+    conn = connect(db_path, read_only=True)
     try:
-        pd.read_sql(economical_bowlers_query, conn).to_csv("economical_bowlers.csv", index=False)
-        pd.read_sql(most_sixes_query, conn).to_csv("most_sixes.csv", index=False)
-        pd.read_sql(top_bowlers_query, conn).to_csv("top_bowlers.csv", index=False)
-        pd.read_sql(most_matches_played_query, conn).to_csv("most_matches_played.csv", index=False)
-        logger.info("Additional SQL reports saved.")
-    except Exception as e:
-        logger.error("Failed to save extra SQL results.")
-        raise IPLReportError("Additional SQL report error.") from e
+        for query, path in reports:
+            with measure(query_label(query), kind="query") as m:
+                frame = pd.read_sql(query, conn)
+                m.rows = len(frame)
+            frame.to_csv(path, index=False)
+    finally:
+        conn.close()
+    return tuple(path for _, path in reports)
 
-    # Plots
+
+def top_reports(db_path):
+    # Top Teams and Batsmen from SQL
+    paths = save_queries(db_path, [
+        (top_teams_query, "top_teams.csv"),
+        (top_batsmen_query, "top_batsmen.csv"),
+    ])
+    logger.info("Top teams and batsmen reports saved.")
+    return paths
+
+
+def extra_reports(db_path):
+    paths = save_queries(db_path, [
+        (economical_bowlers_query, "economical_bowlers.csv"),
+        (most_sixes_query, "most_sixes.csv"),
+        (top_bowlers_query, "top_bowlers.csv"),
+        (most_matches_played_query, "most_matches_played.csv"),
+    ])
+    logger.info("Additional SQL reports saved.")
+    return paths
+
+
+def plots(top_teams_csv, top_batsmen_csv):
+    # Both charts render in parallel on the chart service; the stage waits
+    # for them so it is only recorded as built once the PNGs exist
     plot_top_teams()
     plot_top_batsmen()
+    wait_for_charts()
     logger.info("Visualizations generated successfully.")
 
-except Exception as e:
-    logger.critical("Fatal error in main execution: %s", str(e))
+
+STAGES = [
+    Stage("load_matches", load_matches, outputs=["matches"],
+          error=IPLDataError, message="CSV loading failed.",
+          params=lambda: get_dataset().version("matches"),
+          code=["dataset", "memory"]),
+    Stage("write_database", write_database, outputs=["db_path"],
+          error=IPLDatabaseError, message="DB write failed.",
+          targets=[DB_PATH],
+          params=lambda: [get_dataset().version("matches"), get_dataset().version("deliveries")],
+          code=["ingest", "aggregates", "db_schema", "dataset", "memory"]),
+    Stage("team_report", team_report, inputs=["matches"], outputs=["team_report_csv"],
+          message="Team report generation failed.",
+          targets=["team_report.csv"]),
+    Stage("season_report", season_report, inputs=["matches"], outputs=["season_report_csv"],
+          message="Season report generation failed.",
+          targets=["season_report.csv"]),
+    Stage("innings_tables", innings_tables, outputs=["innings_paths"],
+          message="Innings reconstruction failed.",
+          targets=innings_paths(),
+          params=lambda: get_dataset().version("deliveries"),
+          code=["innings", "stats_engine", "dataset", "memory"]),
+    Stage("season_partitions", season_partitions, outputs=["partition_catalogue"],
+          message="Season partitioning failed.",
+          targets=[CATALOGUE_PATH],
+          params=lambda: [get_dataset().version("matches"), get_dataset().version("deliveries")],
+          code=["partitions", "dataset", "memory"]),
+    Stage("top_reports", top_reports, inputs=["db_path"], outputs=["top_teams_csv", "top_batsmen_csv"],
+          message="SQL report failure.",
+          targets=["top_teams.csv", "top_batsmen.csv"],
+          params=[top_teams_query, top_batsmen_query],
+          code=["sql_queries"]),
+    Stage("extra_reports", extra_reports, inputs=["db_path"],
+          outputs=["economical_bowlers_csv", "most_sixes_csv", "top_bowlers_csv", "most_matches_played_csv"],
+          message="Additional SQL report error.",
+          targets=["economical_bowlers.csv", "most_sixes.csv", "top_bowlers.csv", "most_matches_played.csv"],
+          params=[economical_bowlers_query, most_sixes_query, top_bowlers_query, most_matches_played_query],
+          code=["sql_queries"]),
+    Stage("plots", plots, inputs=["top_teams_csv", "top_batsmen_csv"],
+          message="Visualization failed.",
+          targets=["plots/top_teams.png", "plots/top_batsmen.png"],
+          code=["visualizations", "chart_service"]),
+]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the IPL reports.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of stages to run at once (default: CPU count)")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every output even if its inputs are unchanged")
+    parser.add_argument("--metrics", action="store_true",
+                        help="record per-stage timings to logs/metrics.jsonl and print a summary")
+    args = parser.parse_args(argv)
+
+    setup_logger("main_logger")
+    if args.metrics:
+        enable_metrics()
+    try:
+        Pipeline(STAGES, logger=logger).run(max_workers=args.workers, executor=args.executor,
+                                            manifest=BuildManifest(force=args.force))
+    except Exception as e:
+        logger.critical("Fatal error in main execution: %s", str(e))
+        return 1
+    finally:
+        print_metrics_summary()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,228 @@
+# partitions.py
+
+# Per-season partitions of the typed tables: one columnar file per table
+# and season under cache/partitions/, listed in a catalogue with each
+# partition's row count and content digest. Season-scoped reads open only
+# the partitions in range. A refresh after the source CSVs change rewrites
+# just the partitions whose rows changed, so a new season writes one new
+# file per table and finished seasons are never rewritten.
+
+import hashlib
+import json
+import logging
+import numbers
+import os
+import threading
+
+from dataset import CACHE_FOLDER, COLUMNAR_FORMAT, SCHEMAS, TABLES, get_dataset, read_columnar, write_columnar
+from exceptions import IPLDataError
+
+logger = logging.getLogger(__name__)
+
+PARTITION_FOLDER = os.path.join(CACHE_FOLDER, "partitions")
+CATALOGUE_FILE = "catalogue.json"
+CATALOGUE_PATH = os.path.join(PARTITION_FOLDER, CATALOGUE_FILE)
+
+
+def season_range(seasons):
+    """(first, last) for a season, an inclusive (first, last) pair or None (all)."""
+    if seasons is None:
+        return None
+    if isinstance(seasons, numbers.Integral):     # numpy ints too, e.g. matches["season"].max()
+        return int(seasons), int(seasons)
+    first, last = seasons
+    return int(first), int(last)
+
+
+def frame_digest(frame):
+    """Content hash of a frame's rows (values, not category codes)."""
+    import pandas as pd
+
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    digest = hashlib.sha256(hashes.tobytes())
+    digest.update(",".join(frame.columns).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def split_by_season(matches, deliveries):
+    """{table: {season: frame}}; deliveries follow their match's season and
+    deliveries of unknown matches are left out (with a warning)."""
+    import pandas as pd
+
+    season_of = pd.Series(matches["season"].to_numpy(), index=matches["id"].to_numpy())
+    delivery_seasons = deliveries["match_id"].map(season_of)
+    orphans = delivery_seasons.isna()
+    if orphans.any():
+        logger.warning("Left %d deliveries of %d matches not in matches out of the partitions.",
+                       int(orphans.sum()), deliveries.loc[orphans, "match_id"].nunique())
+    parts = {"matches": {}, "deliveries": {}}
+    for table, frame, seasons in (("matches", matches, matches["season"]),
+                                  ("deliveries", deliveries, delivery_seasons)):
+        for season, rows in seasons.groupby(seasons, sort=True).indices.items():
+            part = frame.iloc[rows].reset_index(drop=True)
+            for col in part.columns:
+                if isinstance(part[col].dtype, pd.CategoricalDtype):
+                    part[col] = part[col].cat.remove_unused_categories()
+            parts[table][int(season)] = part
+    return parts
+
+
+def combine(frames, schema):
+    """Concatenate partitions, giving every column of a categorical domain
+    (see dataset.SCHEMAS) one shared set of categories again."""
+    import pandas as pd
+
+    domains = {}
+    for col, kind in schema.items():
+        if col in frames[0].columns and not kind.startswith(("int", "uint", "float")):
+            domains.setdefault(kind, []).append(col)
+    frames = [frame.copy() for frame in frames]
+    for cols in domains.values():
+        values = set()
+        for frame in frames:
+            for col in cols:
+                column = frame[col]
+                if isinstance(column.dtype, pd.CategoricalDtype):
+                    values.update(column.cat.categories)
+                else:   # an all-null column comes back without categories
+                    values.update(column.dropna().unique())
+        dtype = pd.CategoricalDtype(sorted(values))
+        for frame in frames:
+            for col in cols:
+                frame[col] = frame[col].astype(dtype)
+    return pd.concat(frames, ignore_index=True)
+
+
+class SeasonPartitions:
+    """Catalogue of the per-season partition files of ``dataset``'s tables."""
+
+    def __init__(self, dataset=None, folder=PARTITION_FOLDER):
+        self.dataset = dataset or get_dataset()
+        self.folder = folder
+        self._lock = threading.Lock()
+        self.catalogue = self._read_catalogue()
+
+    @property
+    def catalogue_path(self):
+        return os.path.join(self.folder, CATALOGUE_FILE)
+
+    def _read_catalogue(self):
+        try:
+            with open(self.catalogue_path) as f:
+                catalogue = json.load(f)
+        except (OSError, ValueError):
+            return {"format": COLUMNAR_FORMAT, "sources": {}, "partitions": {}}
+        if catalogue.get("format") != COLUMNAR_FORMAT:
+            catalogue = {"format": COLUMNAR_FORMAT, "sources": {}, "partitions": {}}
+        return catalogue
+
+    def _write_catalogue(self):
+        tmp_path = self.catalogue_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.catalogue, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.catalogue_path)
+
+    def _sources(self):
+        return {name: self.dataset.version(name) for name in TABLES}
+
+    def refresh(self):
+        """Bring the partitions up to date with the source CSVs.
+
+        Returns {"written": [...], "kept": n, "removed": [...]} with
+        "table/season" labels; nothing is read when the sources are unchanged.
+        """
+        with self._lock:
+            sources = self._sources()
+            if self.catalogue["sources"] == sources:
+                return {"written": [], "kept": sum(map(len, self.catalogue["partitions"].values())),
+                        "removed": []}
+
+            parts = split_by_season(self.dataset.matches, self.dataset.deliveries)
+            written, removed, kept = [], [], 0
+            for table, seasons in parts.items():
+                folder = os.path.join(self.folder, table)
+                os.makedirs(folder, exist_ok=True)
+                old = self.catalogue["partitions"].get(table, {})
+                new = {}
+                for season, frame in seasons.items():
+                    entry = {"file": os.path.join(table, f"season={season}.{COLUMNAR_FORMAT}"),
+                             "rows": len(frame), "digest": frame_digest(frame)}
+                    previous = old.get(str(season))
+                    if previous == entry and os.path.exists(os.path.join(self.folder, entry["file"])):
+                        kept += 1
+                    else:
+                        write_columnar(frame, os.path.join(self.folder, entry["file"]))
+                        written.append(f"{table}/{season}")
+                    new[str(season)] = entry
+                for season in set(old) - set(new):
+                    path = os.path.join(self.folder, old[season]["file"])
+                    if os.path.exists(path):
+                        os.remove(path)
+                    removed.append(f"{table}/{season}")
+                self.catalogue["partitions"][table] = new
+            self.catalogue["sources"] = sources
+            self._write_catalogue()
+            return {"written": written, "kept": kept, "removed": removed}
+
+    def seasons(self, table="matches"):
+        self.refresh()
+        return sorted(int(season) for season in self.catalogue["partitions"].get(table, {}))
+
+    def prune(self, table, seasons=None):
+        """Catalogue entries of ``table`` for the partitions ``seasons`` touches."""
+        if table not in TABLES:
+            raise KeyError(f"Unknown table: {table}")
+        self.refresh()
+        bounds = season_range(seasons)
+        entries = self.catalogue["partitions"].get(table, {})
+        return [entries[season] for season in sorted(entries, key=int)
+                if bounds is None or bounds[0] <= int(season) <= bounds[1]]
+
+    def read(self, table, seasons=None, columns=None):
+        """``table`` restricted to ``seasons`` (a season or an inclusive
+        (first, last) range), reading only those partitions."""
+        entries = self.prune(table, seasons)
+        if not entries:
+            all_entries = self.prune(table)
+            if not all_entries:
+                raise IPLDataError(f"No partitions for {table}; is {TABLES[table]} empty?")
+            sample = read_columnar(os.path.join(self.folder, all_entries[0]["file"]), columns)
+            return sample.head(0)
+        frames = [read_columnar(os.path.join(self.folder, entry["file"]), columns) for entry in entries]
+        return combine(frames, SCHEMAS.get(table, {}))
+
+
+_default_partitions = None
+_default_lock = threading.Lock()
+
+
+def get_partitions():
+    """Process-wide season partitions of the shared dataset."""
+    global _default_partitions
+    with _default_lock:
+        if _default_partitions is None:
+            _default_partitions = SeasonPartitions()
+        return _default_partitions
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build the per-season partitions and read a season range.")
+    parser.add_argument("--seasons", type=int, nargs="+", metavar="SEASON", help="one season or FIRST LAST")
+    args = parser.parse_args()
+
+    partitions = get_partitions()
+    start = time.perf_counter()
+    stats = partitions.refresh()
+    print(f"✅ Partitions: {len(stats['written'])} written, {stats['kept']} unchanged, "
+          f"{len(stats['removed'])} removed ({time.perf_counter() - start:.2f}s)")
+    if args.seasons:
+        seasons = (args.seasons[0], args.seasons[-1])
+        for table in TABLES:
+            start = time.perf_counter()
+            frame = partitions.read(table, seasons)
+            touched = len(partitions.prune(table, seasons))
+            print(f"📊 {table} {seasons[0]}-{seasons[1]}: {len(frame)} rows from {touched} of "
+                  f"{len(partitions.prune(table))} partitions in {(time.perf_counter() - start) * 1000:.1f} ms")
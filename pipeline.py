@@ -0,0 +1,222 @@
+# pipeline.py
+
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from build_cache import code_version, digest
+from exceptions import IPLDataError, IPLDatabaseError, IPLReportError
+from logger_config import Measurement, count_rows, metrics_enabled, record_metrics
+
+IPL_ERRORS = (IPLDataError, IPLDatabaseError, IPLReportError)
+
+
+class Stage:
+    """A named unit of work in the report pipeline.
+
+    ``fn`` is called with one keyword argument per name in ``inputs`` and
+    returns the values of ``outputs`` (a single value when there is one
+    output, a tuple otherwise). Any failure that is not already one of the
+    IPL exceptions is raised as ``error(message)``.
+
+    ``targets`` are the files the stage writes and ``params`` (a value or a
+    zero-argument callable) whatever besides its code and upstream stages
+    decides their content, e.g. a data version or query text. Its code is
+    the source of the module defining ``fn`` and of the modules named in
+    ``code``, the ones whose helpers it calls. When run with a build
+    manifest, a stage whose targets were built from the same fingerprint is
+    skipped and its recorded outputs are reused.
+    """
+
+    def __init__(self, name, fn, inputs=(), outputs=(), error=IPLReportError, message=None,
+                 targets=(), params=None, code=()):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.error = error
+        self.message = message or f"Stage '{name}' failed."
+        self.targets = tuple(targets)
+        self.params = params
+        self.code = tuple(code)
+
+    def resolve_params(self):
+        return self.params() if callable(self.params) else self.params
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+
+def _run_stage(fn, kwargs, name=None):
+    """Run a stage in a pool worker; with a ``name`` it is measured there and
+    the metrics record travels back with the value (also from a process)."""
+    if name is None:
+        return fn(**kwargs), None
+    with Measurement(name, "stage", emit=False) as m:
+        value = fn(**kwargs)
+        m.rows = count_rows(value)
+    return value, m.record
+
+
+class Pipeline:
+    """Dependency graph of stages, run concurrently where inputs allow."""
+
+    def __init__(self, stages, logger=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.logger = logger or logging.getLogger(__name__)
+        self.producers = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in self.producers:
+                    raise ValueError(f"Output '{output}' is produced by both "
+                                     f"'{self.producers[output]}' and '{stage.name}'")
+                self.producers[output] = stage.name
+        self.dependencies = {
+            stage.name: {self.producers[i] for i in stage.inputs if i in self.producers}
+            for stage in stages
+        }
+        self._check_graph()
+
+    def _check_graph(self):
+        for stage in self.stages.values():
+            missing = [i for i in stage.inputs if i not in self.producers]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' needs inputs nobody produces: {missing}")
+        # Kahn's algorithm: anything left over sits on a cycle
+        pending = {name: set(deps) for name, deps in self.dependencies.items()}
+        while pending:
+            ready = [name for name, deps in pending.items() if not deps]
+            if not ready:
+                raise ValueError(f"Dependency cycle between stages: {sorted(pending)}")
+            for name in ready:
+                del pending[name]
+            for deps in pending.values():
+                deps.difference_update(ready)
+
+    def fingerprints(self, names):
+        """Fingerprint each stage from its code, params and upstream fingerprints."""
+        prints = {}
+        for name in self._topological(names):
+            stage = self.stages[name]
+            upstream = sorted(prints[dep] for dep in self.dependencies[name])
+            prints[name] = digest(name, code_version(stage.fn, stage.code), stage.resolve_params(), upstream)
+        return prints
+
+    def plan(self, selected, manifest):
+        """Split ``selected`` into stages to run and fresh stages whose
+        recorded outputs are restored instead."""
+        prints = self.fingerprints(selected)
+        fresh = {name for name in selected
+                 if self.stages[name].targets
+                 and manifest.is_fresh(name, prints[name], self.stages[name].targets)}
+        # Stale stages with targets, and side-effect stages, always run; pure
+        # producers (loaders) only run when something that runs needs them.
+        to_run = {name for name in selected - fresh
+                  if self.stages[name].targets or not self.stages[name].outputs}
+        stack = list(to_run)
+        while stack:
+            for dep in self.dependencies[stack.pop()]:
+                if dep not in fresh and dep not in to_run:
+                    to_run.add(dep)
+                    stack.append(dep)
+        return to_run, fresh, prints
+
+    def run(self, max_workers=None, executor="thread", only=None, manifest=None):
+        """Run the stages (or ``only`` these and what they depend on).
+
+        Returns {output name: value}. The first failing stage stops new
+        stages from being scheduled and its IPL exception is re-raised once
+        the stages already running have finished. With a ``manifest``
+        (build_cache.BuildManifest) stages that are up to date are skipped.
+        """
+        selected = self._closure(only) if only else set(self.stages)
+        max_workers = max_workers or os.cpu_count() or 1
+        pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+
+        results = {}
+        prints = {}
+        if manifest is not None:
+            selected, restored, prints = self.plan(selected, manifest)
+            for name in restored:
+                results.update(manifest.outputs(name))
+                self.logger.info("Stage '%s' is up to date, skipped.", name)
+            if not selected:
+                self.logger.info("Everything is up to date.")
+                return results
+
+        measured = metrics_enabled()
+        done, running, failure = set(), {}, None
+        with pool_class(max_workers=max_workers) as pool:
+            while True:
+                if failure is None:
+                    for name in sorted(selected - done - set(running.values())):
+                        if self.dependencies[name] & selected <= done:
+                            stage = self.stages[name]
+                            kwargs = {i: results[i] for i in stage.inputs}
+                            self.logger.debug("Starting stage '%s'.", name)
+                            running[pool.submit(_run_stage, stage.fn, kwargs,
+                                                name if measured else None)] = name
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    stage = self.stages[name]
+                    try:
+                        value, record = future.result()
+                    except Exception as e:
+                        self.logger.error("Stage '%s' failed: %s", name, e)
+                        if failure is None and isinstance(e, IPL_ERRORS):
+                            failure = e
+                        elif failure is None:
+                            failure = stage.error(stage.message)
+                            failure.__cause__ = e
+                        continue
+                    if record is not None:
+                        record_metrics(record)
+                    outputs = self._unpack(stage, value)
+                    results.update(outputs)
+                    done.add(name)
+                    if manifest is not None and stage.targets:
+                        manifest.record(name, prints[name], outputs)
+                    self.logger.debug("Finished stage '%s'.", name)
+
+        if manifest is not None:
+            manifest.save()
+        if failure is not None:
+            raise failure
+        return results
+
+    def _topological(self, names):
+        ordered, seen = [], set()
+
+        def visit(name):
+            if name not in seen:
+                seen.add(name)
+                for dep in sorted(self.dependencies[name]):
+                    visit(dep)
+                ordered.append(name)
+
+        for name in sorted(names):
+            visit(name)
+        return ordered
+
+    def _closure(self, names):
+        selected, stack = set(), list(names)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage: {name}")
+            if name not in selected:
+                selected.add(name)
+                stack.extend(self.dependencies[name])
+        return selected
+
+    @staticmethod
+    def _unpack(stage, value):
+        if not stage.outputs:
+            return {}
+        if len(stage.outputs) == 1:
+            return {stage.outputs[0]: value}
+        return dict(zip(stage.outputs, value))
@@ -0,0 +1,171 @@
+# query_cache.py
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from dataset import CACHE_FOLDER
+from ingest import MANIFEST_TABLE
+
+QUERY_CACHE_FOLDER = os.path.join(CACHE_FOLDER, "queries")
+QUERY_CACHE_SIZE = 128          # frames kept in memory
+QUERY_CACHE_DISK_FILES = 512    # frames kept on disk
+
+
+def normalize_sql(sql):
+    """Whitespace- and terminator-insensitive form of a statement."""
+    return " ".join(sql.split()).rstrip(";").rstrip()
+
+
+def _file_state(path):
+    """(size, mtime_ns) of the database file and its write-ahead log, which
+    change with every committed write (and when the file is rebuilt)."""
+    state = []
+    for name in (path, path + "-wal"):
+        try:
+            stat = os.stat(name)
+            state.append((stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            state.append(None)
+    return tuple(state)
+
+
+def data_version(conn):
+    """Identify the data a query would read: which database file, its schema
+    version, the ingest counter (matches and batches in the manifest) and a
+    write stamp.
+
+    For a database file the stamp is the size and mtime of the file and its
+    WAL, so writes that bypass the ingest manifest (rebuild_summaries, live
+    feed checkpoints) or a file deleted and rebuilt also move the version,
+    whichever connection or process made them. The key means the same thing
+    to every connection, which lets it key the on-disk tier too. In-memory
+    databases live on one connection: their stamp is PRAGMA data_version
+    (commits by other connections) and total_changes (its own writes).
+    """
+    path = next((row[2] for row in conn.execute("PRAGMA database_list") if row[1] == "main"), "")
+    schema = conn.execute("PRAGMA schema_version").fetchone()[0]
+    try:
+        loaded, batch = conn.execute(f"SELECT COUNT(*), COALESCE(MAX(batch), 0) FROM {MANIFEST_TABLE}").fetchone()
+    except sqlite3.OperationalError:   # no manifest yet
+        loaded, batch = 0, 0
+    if path:
+        return (os.path.abspath(path), schema, loaded, batch, _file_state(path))
+    # In-memory databases have no path; tell them apart by connection
+    stamp = (conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes)
+    return (f":memory:{id(conn)}", schema, loaded, batch, stamp)
+
+
+class QueryCache:
+    """LRU cache of query result frames, with an optional on-disk tier.
+
+    Entries are keyed by normalized SQL, parameters and data_version(), so a
+    result is reused until the database is written to. Cached values
+    (frames, or the dicts query_service stores) are handed out as copies,
+    so callers may modify what they get back.
+    """
+
+    def __init__(self, max_entries=QUERY_CACHE_SIZE, disk_folder=None, max_disk_files=QUERY_CACHE_DISK_FILES):
+        self.max_entries = max_entries
+        self.disk_folder = disk_folder
+        self.max_disk_files = max_disk_files
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(sql, params, version):
+        text = repr((normalize_sql(sql), tuple(params), version))
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def read_sql(self, conn, sql, params=()):
+        """pd.read_sql_query through the cache."""
+        import pandas as pd
+        return self.get_or_run(conn, sql, params, lambda: pd.read_sql_query(sql, conn, params=params or None))
+
+    def get_or_run(self, conn, sql, params, run):
+        """Return the cached frame for ``sql`` or compute it with ``run()``."""
+        key = self.key(sql, params, data_version(conn))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key].copy()
+
+        frame = self._read_disk(key)
+        if frame is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            frame = run()
+            with self._lock:
+                self.misses += 1
+            self._write_disk(key, frame)
+        self._remember(key, frame)
+        return frame.copy()
+
+    def _remember(self, key, frame):
+        with self._lock:
+            self._entries[key] = frame
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_folder, f"{key}.pkl")
+
+    def _read_disk(self, key):
+        if self.disk_folder is None or not os.path.exists(self._disk_path(key)):
+            return None
+        try:
+            with open(self._disk_path(key), "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    def _write_disk(self, key, frame):
+        if self.disk_folder is None:
+            return
+        os.makedirs(self.disk_folder, exist_ok=True)
+        path = self._disk_path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(frame, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        files = [os.path.join(self.disk_folder, name) for name in os.listdir(self.disk_folder)
+                 if name.endswith(".pkl")]
+        if len(files) > self.max_disk_files:
+            files.sort(key=os.path.getmtime)
+            for old in files[:len(files) - self.max_disk_files]:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                    "entries": len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_query_cache():
+    """Process-wide query cache; IPL_QUERY_CACHE_DISK=1 adds the disk tier."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            disk = QUERY_CACHE_FOLDER if os.environ.get("IPL_QUERY_CACHE_DISK") == "1" else None
+            _cache = QueryCache(disk_folder=disk)
+        return _cache
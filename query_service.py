@@ -0,0 +1,375 @@
+# query_service.py
+
+# Local HTTP/JSON service for the catalogued queries (sql_queries.py,
+# run_queries.py) and parameterized leaderboards (leaderboard.py). Queries
+# run on a fixed pool of read-only connections, one per worker thread, so
+# any number of readers share the WAL database while ingest keeps writing.
+#
+#   GET  /queries                      -> {name: description}
+#   GET  /query/<name>?param=value...  -> {"name", "columns", "rows", "ms"}
+#   POST /query   {"name", "params"}   -> same
+#   POST /batch   [{"name", "params"}, ...] -> list of results, one snapshot
+#   GET  /health                       -> pool and cache counters
+#
+# Identical requests already in flight share one execution, a batch runs
+# on one connection in one read transaction, and at most ``max_pending``
+# queries wait for a worker: beyond that requests get 503 and Retry-After.
+#
+#   python query_service.py [--port 8765] [--workers 4] [--max-pending 64]
+
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from exceptions import IPLDatabaseError
+
+DB_PATH = "ipl_analysis.db"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 64
+LEADERBOARD = "leaderboard"
+LEADERBOARD_PARAMS = ("metric", "seasons", "venue", "team", "phase", "k", "min_balls")
+
+
+class QueryServiceBusy(IPLDatabaseError):
+    """Raised when the service already has ``max_pending`` queries waiting."""
+    def __init__(self, message="Query service is busy; retry shortly"):
+        super().__init__(message)
+
+
+class UnknownQuery(KeyError):
+    """Raised for a query name that is not in the catalogue."""
+
+
+def query_catalogue():
+    """{name: (description, sql)} for every fixed query the service serves."""
+    import run_queries
+    from db_schema import catalogue_queries
+
+    catalogue = {name: ("sql_queries.py", sql) for name, sql in catalogue_queries().items()}
+    catalogue.update({spec["name"]: (spec["title"], spec["query"]) for spec in run_queries.QUERIES})
+    return catalogue
+
+
+def _seasons(value):
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, (list, tuple)):
+        return int(value[0]), int(value[-1])
+    first, _, last = str(value).partition("-")
+    return (int(first), int(last)) if last else int(first)
+
+
+def leaderboard_request(params):
+    """SQL and parameters for a leaderboard request; ``params`` may hold
+    strings (from a query string): seasons is "2016" or "2013-2017"."""
+    from leaderboard import leaderboard_sql
+
+    unknown = set(params) - set(LEADERBOARD_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown leaderboard parameters: {', '.join(sorted(unknown))}")
+    if "metric" not in params:
+        raise ValueError("A leaderboard needs a metric.")
+    for name in ("metric", "venue", "team", "phase"):
+        if params.get(name) is not None and not isinstance(params[name], str):
+            raise ValueError(f"Leaderboard parameter '{name}' must be a string.")
+    filters = {name: params[name] for name in ("venue", "team", "phase") if params.get(name) is not None}
+    try:
+        if params.get("seasons") is not None:
+            filters["seasons"] = _seasons(params["seasons"])
+        for name in ("k", "min_balls"):
+            if params.get(name) is not None:
+                filters[name] = int(params[name])
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Bad leaderboard parameter: {e}") from e
+    return leaderboard_sql(params["metric"], **filters)
+
+
+class ConnectionPool:
+    """Fixed set of read-only connections handed out one at a time."""
+
+    def __init__(self, db_path, size):
+        from db_schema import connect
+
+        self._idle = queue.Queue()
+        self._connections = [connect(db_path, read_only=True, check_same_thread=False) for _ in range(size)]
+        for conn in self._connections:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        for conn in self._connections:
+            conn.close()
+
+
+class QueryService:
+    """Runs named queries on a connection pool with coalescing and back-pressure.
+
+    ``workers`` threads each take a pooled connection per task; ``cache``
+    (a query_cache.QueryCache, or None) keeps results until the database changes.
+    """
+
+    def __init__(self, db_path=DB_PATH, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING, cache=None):
+        if not os.path.exists(db_path):
+            raise IPLDatabaseError(f"{db_path} not found; run the ingest (ingest.py or main.py) first.")
+        self.catalogue = query_catalogue()
+        self.pool = ConnectionPool(db_path, workers)
+        self.cache = cache
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query")
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.pending = 0
+        self.served = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def describe(self):
+        """{name: description} of the queries clients can ask for."""
+        names = {name: title for name, (title, _) in self.catalogue.items()}
+        names[LEADERBOARD] = f"Top k by metric; parameters: {', '.join(LEADERBOARD_PARAMS)}"
+        return names
+
+    def resolve(self, name, params=None):
+        """(sql, parameters) for ``name``; UnknownQuery for names not in the
+        catalogue, ValueError for a malformed request or bad parameters."""
+        if not isinstance(name, str):
+            raise ValueError("A query needs a name (a string).")
+        if params is not None and not isinstance(params, dict):
+            raise ValueError(f"Parameters of '{name}' must be an object.")
+        params = params or {}
+        if name == LEADERBOARD:
+            return leaderboard_request(params)
+        if name not in self.catalogue:
+            raise UnknownQuery(name)
+        if params:
+            raise ValueError(f"'{name}' takes no parameters.")
+        return self.catalogue[name][1], ()
+
+    def _execute(self, conn, sql, params):
+        def run():
+            cursor = conn.execute(sql, params)
+            return {"columns": [col[0] for col in cursor.description], "rows": cursor.fetchall()}
+
+        if self.cache is not None:
+            return self.cache.get_or_run(conn, sql, params, run)
+        return run()
+
+    def _reserve_locked(self, count):
+        if self.pending + count > self.max_pending:
+            self.rejected += count
+            raise QueryServiceBusy()
+        self.pending += count
+
+    def _release(self, count):
+        with self._lock:
+            self.pending -= count
+            self.served += count
+
+    def submit(self, name, params=None):
+        """Future of {"columns", "rows"} for one query."""
+        sql, sql_params = self.resolve(name, params)
+        key = (sql, sql_params)
+
+        def task():
+            try:
+                with self.pool.connection() as conn:
+                    return self._execute(conn, sql, sql_params)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                self._release(1)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            self._reserve_locked(1)
+            future = self._inflight[key] = self._executor.submit(task)
+        return future
+
+    def submit_batch(self, requests):
+        """Future of a list of results for ``requests`` ({"name", "params"}),
+        read on one connection inside one transaction. A batch larger than
+        max_pending could never be accepted: ValueError, not busy."""
+        if len(requests) > self.max_pending:
+            raise ValueError(f"A batch holds at most {self.max_pending} queries, got {len(requests)}.")
+        if not all(isinstance(request, dict) for request in requests):
+            raise ValueError('Each batch entry must be an object with a "name" and optional "params".')
+        resolved = [self.resolve(request.get("name"), request.get("params")) for request in requests]
+        with self._lock:
+            self._reserve_locked(len(resolved))
+
+        def task():
+            try:
+                with self.pool.connection() as conn:
+                    conn.execute("BEGIN")
+                    try:
+                        return [self._execute(conn, sql, params) for sql, params in resolved]
+                    finally:
+                        conn.execute("COMMIT")
+            finally:
+                self._release(len(resolved))
+
+        return self._executor.submit(task)
+
+    def query(self, name, params=None, timeout=None):
+        return self.submit(name, params).result(timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = {"pending": self.pending, "served": self.served, "coalesced": self.coalesced,
+                     "rejected": self.rejected, "max_pending": self.max_pending}
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.pool.close()
+
+
+def _params_from_query_string(text):
+    return {name: values[-1] for name, values in parse_qs(text).items()}
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, so load tests measure queries, not handshakes
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    service = None                  # set per server by make_server()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _run(self, fn):
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except QueryServiceBusy as e:
+            return self._send(503, {"error": str(e)}, {"Retry-After": "1"})
+        except UnknownQuery as e:
+            return self._send(404, {"error": f"Unknown query {e}"})
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        except Exception as e:
+            return self._send(500, {"error": str(e)})
+        ms = round((time.perf_counter() - start) * 1000, 3)
+        if isinstance(result, dict) and "rows" in result:
+            result = dict(result, ms=ms)
+        return self._send(200, result)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/queries":
+            return self._send(200, self.service.describe())
+        if url.path == "/health":
+            return self._send(200, self.service.stats())
+        if url.path.startswith("/query/"):
+            name = url.path[len("/query/"):]
+            params = _params_from_query_string(url.query)
+            return self._run(lambda: dict(self.service.query(name, params), name=name))
+        return self._send(404, {"error": f"No route {url.path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        try:
+            body = self._body()
+        except ValueError as e:
+            return self._send(400, {"error": f"Invalid JSON: {e}"})
+        if url.path == "/query" and isinstance(body, dict):
+            name = body.get("name")
+            return self._run(lambda: dict(self.service.query(name, body.get("params")), name=name))
+        if url.path == "/batch" and isinstance(body, list):
+            return self._run(lambda: [dict(result, name=request["name"]) for request, result
+                                      in zip(body, self.service.submit_batch(body).result())])
+        if url.path in ("/query", "/batch"):
+            return self._send(400, {"error": f"Bad request body for {url.path}"})
+        return self._send(404, {"error": f"No route {url.path}"})
+
+
+class QueryServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128   # the default of 5 drops connection bursts into SYN retries
+
+
+def make_server(service, host="127.0.0.1", port=DEFAULT_PORT):
+    """A QueryServer serving ``service``; port 0 picks a free one."""
+    handler = type("Handler", (QueryRequestHandler,), {"service": service})
+    return QueryServer((host, port), handler)
+
+
+@contextmanager
+def serve_in_background(db_path=DB_PATH, host="127.0.0.1", port=0, **options):
+    """Run the service in this process for the duration of the block;
+    yields its base URL."""
+    service = QueryService(db_path, **options)
+    server = make_server(service, host, port)
+    thread = threading.Thread(target=server.serve_forever, name="query-service", daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def main(argv=None):
+    import argparse
+
+    from query_cache import QueryCache
+
+    parser = argparse.ArgumentParser(description="Serve the catalogued queries over HTTP/JSON.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="pooled connections / threads")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                        help="queries allowed to wait before requests get 503")
+    parser.add_argument("--no-cache", action="store_true", help="run every query against the database")
+    args = parser.parse_args(argv)
+
+    service = QueryService(args.db, workers=args.workers, max_pending=args.max_pending,
+                           cache=None if args.no_cache else QueryCache())
+    server = make_server(service, args.host, args.port)
+    print(f"✅ Serving {len(service.describe())} queries on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n📌 Stopping the query service.")
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
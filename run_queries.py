@@ -1,136 +1,331 @@
 # run_queries.py
 
-import sqlite3
 import pandas as pd
 
-def execute_query(conn, query, title):
+from db_schema import connect, is_normalized
+from query_cache import get_query_cache
+
+QUERIES = [
+    {
+        "name": "top_teams",
+        "title": "Top 5 Teams by Wins",
+        "query": """
+            SELECT winner AS Team, COUNT(*) AS Wins
+            FROM matches
+            WHERE winner IS NOT NULL
+            GROUP BY winner
+            ORDER BY Wins DESC
+            LIMIT 5;
+        """
+    },
+    {
+        "name": "top_appearances",
+        "title": "Top 5 Players by Appearances",
+        "query": """
+            SELECT player, COUNT(*) AS Matches
+            FROM (
+                SELECT player_of_match AS player FROM matches
+                UNION ALL
+                SELECT batsman AS player FROM deliveries
+            )
+            GROUP BY player
+            ORDER BY Matches DESC
+            LIMIT 5;
+        """
+    },
+    {
+        "name": "top_six_hitters",
+        "title": "Top 5 Six Hitters",
+        "query": """
+            SELECT batsman, COUNT(*) AS Sixes
+            FROM deliveries
+            WHERE batsman_runs = 6
+            GROUP BY batsman
+            ORDER BY Sixes DESC
+            LIMIT 5;
+        """
+    },
+    {
+        "name": "economical_bowlers",
+        "title": "Top 5 Economical Bowlers (Min 300 balls)",
+        "query": """
+            SELECT bowler,
+                   ROUND(SUM(total_runs) * 6.0 / COUNT(*), 2) AS Economy
+            FROM deliveries
+            GROUP BY bowler
+            HAVING COUNT(*) >= 300
+            ORDER BY Economy ASC
+            LIMIT 5;
+        """
+    },
+    {
+        "name": "top_run_scorers",
+        "title": "Top 5 Run Scorers",
+        "query": """
+            SELECT batsman, SUM(batsman_runs) AS Total_Runs
+            FROM deliveries
+            GROUP BY batsman
+            ORDER BY Total_Runs DESC
+            LIMIT 5;
+        """
+    },
+    {
+        "name": "top_wicket_takers",
+        "title": "Top 5 Wicket Takers (excluding run outs)",
+        "query": """
+            SELECT bowler, COUNT(*) AS Wickets
+            FROM deliveries
+            WHERE dismissal_kind NOT IN ('run out', 'retired hurt', 'obstructing the field')
+              AND dismissal_kind IS NOT NULL
+            GROUP BY bowler
+            ORDER BY Wickets DESC
+            LIMIT 5;
+        """
+    },
+    {
+        "name": "matches_per_season",
+        "title": "Matches Played Per Season",
+        "query": """
+            SELECT season, COUNT(*) AS Total_Matches
+            FROM matches
+            GROUP BY season
+            ORDER BY season;
+        """
+    },
+    {
+        "name": "toss_vs_match_winner",
+        "title": "Toss Winner vs Match Winner",
+        "query": """
+            SELECT CASE WHEN toss_winner = winner THEN 'Toss & Match Won'
+                        ELSE 'Only Toss or Match Won' END AS Result,
+                   COUNT(*) AS Count
+            FROM matches
+            GROUP BY 1;
+        """
+    },
+    {
+        "name": "top_venues",
+        "title": "Top 5 Venues with Most Matches",
+        "query": """
+            SELECT venue, COUNT(*) AS Matches
+            FROM matches
+            GROUP BY venue
+            ORDER BY Matches DESC
+            LIMIT 5;
+        """
+    },
+    {
+        "name": "win_by_batting_first",
+        "title": "Win Percentage by Batting First or Second",
+        "query": """
+            SELECT win_by_runs > 0 AS Batting_First,
+                   COUNT(*) AS Wins
+            FROM matches
+            WHERE winner IS NOT NULL
+            GROUP BY Batting_First;
+        """
+    }
+]
+
+# Single-pass batch plan. Catalogue queries are grouped by the table and key
+# they aggregate over, and each group is answered by one fused scan that
+# computes every aggregate the group needs; the per-query frames are then cut
+# from those scans.
+BOWLER_EXCLUDED = "('run out', 'retired hurt', 'obstructing the field')"
+
+FUSED_SCANS = {
+    "deliveries_by_batsman": """
+        SELECT batsman,
+               SUM(batsman_runs) AS runs,
+               SUM(CASE WHEN batsman_runs = 6 THEN 1 ELSE 0 END) AS sixes,
+               COUNT(*) AS balls
+        FROM deliveries
+        GROUP BY batsman
+    """,
+    "deliveries_by_bowler": f"""
+        SELECT bowler,
+               SUM(total_runs) AS runs,
+               COUNT(*) AS balls,
+               SUM(CASE WHEN dismissal_kind NOT IN {BOWLER_EXCLUDED} THEN 1 ELSE 0 END) AS wickets
+        FROM deliveries
+        GROUP BY bowler
+    """,
+    "matches": """
+        SELECT season, toss_winner, winner, win_by_runs, player_of_match, venue
+        FROM matches
+    """,
+}
+
+# On a normalized database (db_schema.NORMALIZED_COLUMNS) the per-player
+# scans group the fact table by integer id and look each name up once,
+# instead of resolving a name through the view for every delivery.
+NORMALIZED_FUSED_SCANS = {
+    "deliveries_by_batsman": """
+        SELECT p.name AS batsman, s.runs, s.sixes, s.balls
+        FROM (
+            SELECT batsman_id,
+                   SUM(batsman_runs) AS runs,
+                   SUM(CASE WHEN batsman_runs = 6 THEN 1 ELSE 0 END) AS sixes,
+                   COUNT(*) AS balls
+            FROM delivery_facts
+            GROUP BY batsman_id
+        ) s
+        LEFT JOIN players p ON p.id = s.batsman_id
+    """,
+    "deliveries_by_bowler": f"""
+        SELECT p.name AS bowler, s.runs, s.balls, s.wickets
+        FROM (
+            SELECT bowler_id,
+                   SUM(total_runs) AS runs,
+                   COUNT(*) AS balls,
+                   SUM(CASE WHEN dismissal_kind NOT IN {BOWLER_EXCLUDED} THEN 1 ELSE 0 END) AS wickets
+            FROM delivery_facts
+            GROUP BY bowler_id
+        ) s
+        LEFT JOIN players p ON p.id = s.bowler_id
+    """,
+}
+
+# name -> (fused scans it reads, fn(scans) returning the query's frame)
+BATCH_AGGREGATES = {}
+
+
+def batch_aggregate(name, *scans):
+    def register(fn):
+        BATCH_AGGREGATES[name] = (scans, fn)
+        return fn
+    return register
+
+
+def _top(series, key, value, k=5, ascending=False):
+    # Ties keep the key order so results are deterministic
+    series = series.sort_index().sort_values(ascending=ascending, kind="stable")
+    if k is not None:
+        series = series.head(k)
+    return pd.DataFrame({key: series.index, value: series.to_numpy()})
+
+
+def _column(scan, key, value):
+    return scan.set_index(key)[value]
+
+
+@batch_aggregate("top_teams", "matches")
+def _top_teams(scans):
+    return _top(scans["matches"]["winner"].value_counts(), "Team", "Wins")
+
+
+@batch_aggregate("top_appearances", "matches", "deliveries_by_batsman")
+def _top_appearances(scans):
+    awards = scans["matches"]["player_of_match"].value_counts(dropna=False)
+    faced = _column(scans["deliveries_by_batsman"], "batsman", "balls")
+    return _top(awards.add(faced, fill_value=0).astype("int64"), "player", "Matches")
+
+
+@batch_aggregate("top_six_hitters", "deliveries_by_batsman")
+def _top_six_hitters(scans):
+    sixes = _column(scans["deliveries_by_batsman"], "batsman", "sixes")
+    return _top(sixes[sixes > 0], "batsman", "Sixes")
+
+
+@batch_aggregate("economical_bowlers", "deliveries_by_bowler")
+def _economical_bowlers(scans):
+    by_bowler = scans["deliveries_by_bowler"].set_index("bowler")
+    by_bowler = by_bowler[by_bowler["balls"] >= 300]
+    economy = (by_bowler["runs"] * 6.0 / by_bowler["balls"]).round(2)
+    return _top(economy, "bowler", "Economy", ascending=True)
+
+
+@batch_aggregate("top_run_scorers", "deliveries_by_batsman")
+def _top_run_scorers(scans):
+    return _top(_column(scans["deliveries_by_batsman"], "batsman", "runs"), "batsman", "Total_Runs")
+
+
+@batch_aggregate("top_wicket_takers", "deliveries_by_bowler")
+def _top_wicket_takers(scans):
+    wickets = _column(scans["deliveries_by_bowler"], "bowler", "wickets")
+    return _top(wickets[wickets > 0], "bowler", "Wickets")
+
+
+@batch_aggregate("matches_per_season", "matches")
+def _matches_per_season(scans):
+    counts = scans["matches"]["season"].value_counts().sort_index()
+    return pd.DataFrame({"season": counts.index, "Total_Matches": counts.to_numpy()})
+
+
+@batch_aggregate("toss_vs_match_winner", "matches")
+def _toss_vs_match_winner(scans):
+    m = scans["matches"]
+    won_both = m["toss_winner"].eq(m["winner"]) & m["winner"].notna()
+    result = won_both.map({True: "Toss & Match Won", False: "Only Toss or Match Won"})
+    counts = result.value_counts().sort_index()
+    return pd.DataFrame({"Result": counts.index, "Count": counts.to_numpy()})
+
+
+@batch_aggregate("top_venues", "matches")
+def _top_venues(scans):
+    return _top(scans["matches"]["venue"].value_counts(), "venue", "Matches")
+
+
+@batch_aggregate("win_by_batting_first", "matches")
+def _win_by_batting_first(scans):
+    m = scans["matches"]
+    m = m[m["winner"].notna()]
+    counts = (m["win_by_runs"] > 0).astype("int64").value_counts().sort_index()
+    return pd.DataFrame({"Batting_First": counts.index, "Wins": counts.to_numpy()})
+
+
+def _read_sql(conn, query, cache):
+    if cache is None:
+        return pd.read_sql_query(query, conn)
+    return cache.read_sql(conn, query)
+
+
+def run_batch(conn, queries=QUERIES, cache=None):
+    """Run the catalogue with one fused scan per (table, group key).
+
+    Queries without a batch implementation fall back to their own SQL.
+    With a query_cache.QueryCache the scans and fallback queries are only
+    run again once new data has been ingested.
+    Returns {query name: result frame}.
+    """
+    needed = {scan for q in queries if q["name"] in BATCH_AGGREGATES
+              for scan in BATCH_AGGREGATES[q["name"]][0]}
+    fused = dict(FUSED_SCANS, **NORMALIZED_FUSED_SCANS) if is_normalized(conn) else FUSED_SCANS
+    scans = {name: _read_sql(conn, fused[name], cache) for name in needed}
+
+    results = {}
+    for q in queries:
+        if q["name"] in BATCH_AGGREGATES:
+            results[q["name"]] = BATCH_AGGREGATES[q["name"]][1](scans)
+        else:
+            results[q["name"]] = _read_sql(conn, q["query"], cache)
+    return results
+
+
+def execute_query(conn, query, title, cache=None):
     print(f"\n📌 {title}")
     print("-" * 60)
     try:
-        df = pd.read_sql_query(query, conn)
+        df = _read_sql(conn, query, cache)
         print(df.to_string(index=False))
     except Exception as e:
         print(f"❌ Error executing query: {e}")
 
-def run_all_queries():
+def run_all_queries(batch=True):
     db_path = "ipl_analysis.db"
+    cache = get_query_cache()
     try:
-        conn = sqlite3.connect(db_path)
-
-        queries = [
-            {
-                "title": "Top 5 Teams by Wins",
-                "query": """
-                    SELECT winner AS Team, COUNT(*) AS Wins
-                    FROM matches
-                    WHERE winner IS NOT NULL
-                    GROUP BY winner
-                    ORDER BY Wins DESC
-                    LIMIT 5;
-                """
-            },
-            {
-                "title": "Top 5 Players by Appearances",
-                "query": """
-                    SELECT player, COUNT(*) AS Matches
-                    FROM (
-                        SELECT player_of_match AS player FROM matches
-                        UNION ALL
-                        SELECT batsman AS player FROM deliveries
-                    )
-                    GROUP BY player
-                    ORDER BY Matches DESC
-                    LIMIT 5;
-                """
-            },
-            {
-                "title": "Top 5 Six Hitters",
-                "query": """
-                    SELECT batsman, COUNT(*) AS Sixes
-                    FROM deliveries
-                    WHERE batsman_runs = 6
-                    GROUP BY batsman
-                    ORDER BY Sixes DESC
-                    LIMIT 5;
-                """
-            },
-            {
-                "title": "Top 5 Economical Bowlers (Min 300 balls)",
-                "query": """
-                    SELECT bowler,
-                           ROUND(SUM(total_runs) * 6.0 / COUNT(*), 2) AS Economy
-                    FROM deliveries
-                    GROUP BY bowler
-                    HAVING COUNT(*) >= 300
-                    ORDER BY Economy ASC
-                    LIMIT 5;
-                """
-            },
-            {
-                "title": "Top 5 Run Scorers",
-                "query": """
-                    SELECT batsman, SUM(batsman_runs) AS Total_Runs
-                    FROM deliveries
-                    GROUP BY batsman
-                    ORDER BY Total_Runs DESC
-                    LIMIT 5;
-                """
-            },
-            {
-                "title": "Top 5 Wicket Takers (excluding run outs)",
-                "query": """
-                    SELECT bowler, COUNT(*) AS Wickets
-                    FROM deliveries
-                    WHERE dismissal_kind NOT IN ('run out', 'retired hurt', 'obstructing the field')
-                      AND dismissal_kind IS NOT NULL
-                    GROUP BY bowler
-                    ORDER BY Wickets DESC
-                    LIMIT 5;
-                """
-            },
-            {
-                "title": "Matches Played Per Season",
-                "query": """
-                    SELECT season, COUNT(*) AS Total_Matches
-                    FROM matches
-                    GROUP BY season
-                    ORDER BY season;
-                """
-            },
-            {
-                "title": "Toss Winner vs Match Winner",
-                "query": """
-                    SELECT CASE WHEN toss_winner = winner THEN 'Toss & Match Won'
-                                ELSE 'Only Toss or Match Won' END AS Result,
-                           COUNT(*) AS Count
-                    FROM matches
-                    GROUP BY Result;
-                """
-            },
-            {
-                "title": "Top 5 Venues with Most Matches",
-                "query": """
-                    SELECT venue, COUNT(*) AS Matches
-                    FROM matches
-                    GROUP BY venue
-                    ORDER BY Matches DESC
-                    LIMIT 5;
-                """
-            },
-            {
-                "title": "Win Percentage by Batting First or Second",
-                "query": """
-                    SELECT win_by_runs > 0 AS Batting_First,
-                           COUNT(*) AS Wins
-                    FROM matches
-                    WHERE winner IS NOT NULL
-                    GROUP BY Batting_First;
-                """
-            }
-        ]
-
-        for q in queries:
-            execute_query(conn, q["query"], q["title"])
+        conn = connect(db_path)
+
+        if batch:
+            results = run_batch(conn, cache=cache)
+            for q in QUERIES:
+                print(f"\n📌 {q['title']}")
+                print("-" * 60)
+                print(results[q["name"]].to_string(index=False))
+        else:
+            for q in QUERIES:
+                execute_query(conn, q["query"], q["title"], cache)
 
         conn.close()
     except Exception as e:
@@ -0,0 +1,272 @@
+# simulator.py
+
+# Monte Carlo odds for the rest of a season. Team strength comes from past
+# results in the matches table: an overall rating per team, a head-to-head
+# adjustment per pair and a toss-winner advantage per venue, all shrunk
+# towards even odds and weighted towards recent seasons. The remaining
+# league fixtures and the playoffs (top four; qualifier 1, eliminator,
+# qualifier 2, final) are then played out for many seasons at once as
+# NumPy arrays, in chunks spread over a process pool.
+#
+#   python simulator.py --season 2019 --played 30 [--sims 200000] [--workers 4]
+#   python simulator.py --season 2019 --fixtures remaining.csv
+
+import os
+import time
+
+DEFAULT_SIMS = 200_000
+CHUNK_SIMS = 25_000             # seasons simulated per array batch
+RECENCY_DECAY = 0.7             # weight of a season relative to the one after it
+PRIOR_MATCHES = 10              # pseudo-matches at 50% every rating is shrunk with
+PRIOR_HEAD_TO_HEAD = 10
+PRIOR_VENUE = 20
+PLAYOFF_TEAMS = 4
+POINTS_PER_WIN = 2
+POINTS_NO_RESULT = 1
+PLAYOFF_FORMAT_SINCE = 2011     # 3 playoff matches (semis and final) before, 4 since
+
+
+def _logit(p):
+    import numpy as np
+    return np.log(p) - np.log1p(-p)
+
+
+def playoff_matches(season):
+    return 4 if season >= PLAYOFF_FORMAT_SINCE else 3
+
+
+class StrengthModel:
+    """Match win probabilities for the teams of one season.
+
+    ``pair_logit[a, b]`` is the log-odds of team ``a`` beating ``b``
+    (rating difference plus head-to-head adjustment) and ``toss_logit[v]``
+    the log-odds boost of the toss winner at venue ``v``; ``toss_logit[-1]``
+    is the all-venue value, used for unknown venues and the playoffs.
+    """
+
+    def __init__(self, teams, venues, pair_logit, toss_logit, ratings):
+        self.teams = list(teams)
+        self.venues = list(venues)
+        self.pair_logit = pair_logit
+        self.toss_logit = toss_logit
+        self.ratings = ratings
+        self._team = {team: i for i, team in enumerate(self.teams)}
+        self._venue = {venue: i for i, venue in enumerate(self.venues)}
+
+    @classmethod
+    def from_matches(cls, history, teams, season, decay=RECENCY_DECAY):
+        """Fit on ``history`` (matches frame rows already played) for
+        ``teams``, weighting each match by decay ** (season - its season)."""
+        import numpy as np
+
+        teams = list(teams)
+        position = {team: i for i, team in enumerate(teams)}
+        n = len(teams)
+        weight = decay ** (season - history["season"].to_numpy(dtype=float))
+
+        def ids(column):
+            return np.array([position.get(value, -1) for value in history[column].astype(object)], dtype=np.int64)
+
+        team1, team2, winner, toss_winner = ids("team1"), ids("team2"), ids("winner"), ids("toss_winner")
+        decided = history["winner"].notna().to_numpy()
+
+        # Overall: weighted wins over weighted decided matches
+        played = np.zeros(n)
+        won = np.zeros(n)
+        for side in (team1, team2):
+            keep = (side >= 0) & decided
+            np.add.at(played, side[keep], weight[keep])
+        keep = (winner >= 0) & decided
+        np.add.at(won, winner[keep], weight[keep])
+        ratings = _logit((won + PRIOR_MATCHES * 0.5) / (played + PRIOR_MATCHES))
+        expected = 1 / (1 + np.exp(-(ratings[:, None] - ratings[None, :])))
+
+        # Head-to-head: how far each pair's record strays from the ratings
+        pair_played = np.zeros((n, n))
+        pair_won = np.zeros((n, n))
+        both = (team1 >= 0) & (team2 >= 0) & decided
+        np.add.at(pair_played, (team1[both], team2[both]), weight[both])
+        np.add.at(pair_played, (team2[both], team1[both]), weight[both])
+        loser = np.where(winner == team1, team2, team1)
+        np.add.at(pair_won, (winner[both], loser[both]), weight[both])
+        shrunk = (pair_won + PRIOR_HEAD_TO_HEAD * expected) / (pair_played + PRIOR_HEAD_TO_HEAD)
+        adjustment = _logit(shrunk) - _logit(expected)
+        adjustment = (adjustment - adjustment.T) / 2     # keep p(a beats b) + p(b beats a) = 1
+        pair_logit = ratings[:, None] - ratings[None, :] + adjustment
+
+        # Venue/toss: share of decided matches the toss winner went on to win
+        venues = sorted(history["venue"].dropna().astype(str).unique())
+        venue_position = {venue: i for i, venue in enumerate(venues)}
+        venue = np.array([venue_position.get(v, -1) for v in history["venue"].astype(object)], dtype=np.int64)
+        toss_won = (history["toss_winner"].astype(object) == history["winner"].astype(object)).to_numpy()
+        keep = decided & (venue >= 0)
+        venue_played = np.bincount(venue[keep], weights=weight[keep], minlength=len(venues))
+        venue_toss_won = np.bincount(venue[keep], weights=(weight * toss_won)[keep], minlength=len(venues))
+        overall = (venue_toss_won.sum() + PRIOR_VENUE * 0.5) / (venue_played.sum() + PRIOR_VENUE)
+        share = (venue_toss_won + PRIOR_VENUE * overall) / (venue_played + PRIOR_VENUE)
+        toss_logit = np.append(_logit(share), _logit(overall))
+        return cls(teams, venues, pair_logit, toss_logit, ratings)
+
+    def team_ids(self, names):
+        import numpy as np
+        return np.array([self._team[name] for name in names], dtype=np.int64)
+
+    def venue_ids(self, names):
+        import numpy as np
+        return np.array([self._venue.get(name, -1) for name in names], dtype=np.int64)
+
+
+def _play(rng, pair_logit, shape, home, away, venue_toss):
+    """Winners (an array of ``shape``) of a batch of matches: ``home`` and
+    ``away`` are team ids and ``venue_toss`` the toss log-odds, each
+    broadcastable to ``shape``."""
+    import numpy as np
+
+    home_toss = rng.random(shape) < 0.5
+    logit = pair_logit[home, away] + np.where(home_toss, venue_toss, -venue_toss)
+    home_wins = rng.random(shape) < 1 / (1 + np.exp(-logit))
+    return np.where(home_wins, home, away)
+
+
+def simulate_chunk(model_arrays, points, home, away, venue, sims, seed):
+    """Play out ``sims`` seasons; returns (qualified, titles, table positions)
+    counts per team. Runs in the worker processes."""
+    import numpy as np
+
+    pair_logit, toss_logit = model_arrays
+    rng = np.random.default_rng(seed)
+    n_teams = len(points)
+
+    winners = _play(rng, pair_logit, (sims, len(home)), home, away, toss_logit[venue])
+    offsets = (np.arange(sims) * n_teams)[:, None]
+    wins = np.bincount((winners + offsets).ravel(), minlength=sims * n_teams).reshape(sims, n_teams)
+    table = points + POINTS_PER_WIN * wins
+    # Net run rate is not simulated: equal points are split at random
+    order = np.argsort(-(table + rng.random((sims, n_teams)) * 0.5), axis=1)
+    top = order[:, :PLAYOFF_TEAMS]
+
+    neutral = toss_logit[-1]
+    first = _play(rng, pair_logit, (sims,), top[:, 0], top[:, 1], neutral)
+    first_loser = np.where(first == top[:, 0], top[:, 1], top[:, 0])
+    eliminator = _play(rng, pair_logit, (sims,), top[:, 2], top[:, 3], neutral)
+    second = _play(rng, pair_logit, (sims,), first_loser, eliminator, neutral)
+    champion = _play(rng, pair_logit, (sims,), first, second, neutral)
+
+    qualified = np.bincount(top.ravel(), minlength=n_teams)
+    titles = np.bincount(champion, minlength=n_teams)
+    # positions[team, place]: order holds the team in each place
+    positions = np.bincount((order * n_teams + np.arange(n_teams)).ravel(),
+                            minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+    return qualified, titles, positions
+
+
+def season_fixtures(matches, season, played=None):
+    """(played matches, remaining league fixtures) of ``season`` in match
+    order: the first ``played`` league matches count as played (None =
+    every league match, leaving only the playoffs)."""
+    season_matches = matches[matches["season"] == season].sort_values("id")
+    league = season_matches.iloc[:len(season_matches) - playoff_matches(season)]
+    played = len(league) if played is None else played
+    if not 0 <= played <= len(league):
+        raise ValueError(f"{season} has {len(league)} league matches; --played must be between 0 and that.")
+    return league.iloc[:played], league.iloc[played:]
+
+
+def standings(model, played):
+    """League points per model team from the matches already played."""
+    import numpy as np
+
+    points = np.zeros(len(model.teams), dtype=np.int64)
+    for team1, team2, winner in played[["team1", "team2", "winner"]].astype(object).itertuples(index=False):
+        if winner is None or winner != winner:
+            points[model._team[team1]] += POINTS_NO_RESULT
+            points[model._team[team2]] += POINTS_NO_RESULT
+        else:
+            points[model._team[winner]] += POINTS_PER_WIN
+    return points
+
+
+def simulate_season(matches, season, played=None, fixtures=None, sims=DEFAULT_SIMS, workers=None,
+                    seed=0, chunk=CHUNK_SIMS):
+    """Qualification and title odds for ``season`` from its current table.
+
+    ``matches`` is the full matches frame. Results up to ``played`` league
+    matches are known; the rest of the league (or ``fixtures``, a frame of
+    team1, team2, venue) is simulated ``sims`` times. Returns a frame per
+    team (points, expected wins, qualify %, title %, most likely position)
+    and run statistics.
+    """
+    import numpy as np
+    import pandas as pd
+    from concurrent.futures import ProcessPoolExecutor
+
+    done, remaining = season_fixtures(matches, season, played)
+    if fixtures is not None:
+        remaining = fixtures
+    history = pd.concat([matches[matches["season"] < season], done])
+    season_matches = matches[matches["season"] == season]
+    teams = sorted(set(season_matches["team1"].astype(str)) | set(season_matches["team2"].astype(str)))
+    model = StrengthModel.from_matches(history, teams, season)
+
+    points = standings(model, done)
+    home = model.team_ids(remaining["team1"].astype(str))
+    away = model.team_ids(remaining["team2"].astype(str))
+    venue = model.venue_ids(remaining["venue"].astype(object).where(remaining["venue"].notna(), ""))
+    arrays = (model.pair_logit, model.toss_logit)
+
+    sizes = [min(chunk, sims - start) for start in range(0, sims, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    if workers == 1 or len(sizes) == 1:
+        results = [simulate_chunk(arrays, points, home, away, venue, n, s) for n, s in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+            results = list(pool.map(simulate_chunk, [arrays] * len(sizes), [points] * len(sizes),
+                                    [home] * len(sizes), [away] * len(sizes), [venue] * len(sizes),
+                                    sizes, seeds))
+    seconds = time.perf_counter() - start
+
+    qualified = sum(r[0] for r in results)
+    titles = sum(r[1] for r in results)
+    positions = sum(r[2] for r in results)
+    odds = pd.DataFrame({
+        "team": model.teams,
+        "points": points,
+        "rating": np.round(model.ratings, 3),
+        "qualify_pct": np.round(qualified * 100.0 / sims, 2),
+        "title_pct": np.round(titles * 100.0 / sims, 2),
+        "likely_position": positions.argmax(axis=1) + 1,
+    }).sort_values(["qualify_pct", "title_pct"], ascending=False).reset_index(drop=True)
+    stats = {"sims": sims, "fixtures": len(remaining), "seconds": seconds,
+             "seasons_per_sec": sims / seconds if seconds else float("inf"), "workers": workers}
+    return odds, stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import pandas as pd
+
+    from dataset import get_dataset
+
+    parser = argparse.ArgumentParser(description="Simulate the rest of a season and print playoff odds.")
+    parser.add_argument("--season", type=int, required=True)
+    parser.add_argument("--played", type=int, help="league matches already played (default: all)")
+    parser.add_argument("--fixtures", help="CSV of remaining fixtures (team1, team2, venue)")
+    parser.add_argument("--sims", type=int, default=DEFAULT_SIMS)
+    parser.add_argument("--workers", type=int, help="processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the odds to this CSV")
+    args = parser.parse_args()
+
+    fixtures = pd.read_csv(args.fixtures) if args.fixtures else None
+    odds, stats = simulate_season(get_dataset().matches, args.season, args.played, fixtures,
+                                  sims=args.sims, workers=args.workers, seed=args.seed)
+    print(f"\n📊 {args.season}: {stats['fixtures']} fixtures left, {stats['sims']:,} simulated seasons")
+    print(odds.to_string(index=False))
+    print(f"⏱️  {stats['seasons_per_sec']:,.0f} seasons/sec on {stats['workers']} worker(s) "
+          f"({stats['seconds']:.2f}s)")
+    if args.output:
+        odds.to_csv(args.output, index=False)
+        print(f"✅ Odds saved to {args.output}")
@@ -1,63 +1,25 @@
 # sql_queries.py
 
+# Leaderboards read the per-season summary tables maintained at ingest
+# (see aggregates.py) rather than re-aggregating every delivery. Each one is
+# an instance of leaderboard.leaderboard_sql, which takes filters too.
+
+from leaderboard import leaderboard_sql
+
 # 1. Top 5 Teams by Wins
-top_teams_query = """
-SELECT winner AS team, COUNT(*) AS wins
-FROM matches
-WHERE winner IS NOT NULL
-GROUP BY winner
-ORDER BY wins DESC
-LIMIT 5;
-"""
+top_teams_query, _ = leaderboard_sql("wins", labels=("team", "wins"))
 
 # 2. Top 5 Batsmen by Runs
-top_batsmen_query = """
-SELECT batsman, SUM(batsman_runs) AS total_runs
-FROM deliveries
-GROUP BY batsman
-ORDER BY total_runs DESC
-LIMIT 5;
-"""
+top_batsmen_query, _ = leaderboard_sql("runs", labels=("batsman", "total_runs"))
 
 # 3. Most Economical Bowlers (min 300 balls)
-economical_bowlers_query = """
-SELECT bowler,
-       ROUND(SUM(total_runs) * 6.0 / COUNT(ball), 2) AS economy
-FROM deliveries
-GROUP BY bowler
-HAVING COUNT(ball) >= 300
-ORDER BY economy ASC
-LIMIT 5;
-"""
+economical_bowlers_query, _ = leaderboard_sql("economy", min_balls=300, labels=("bowler", "economy"))
 
 # 4. Most Sixes by Batsmen
-most_sixes_query = """
-SELECT batsman, COUNT(*) AS sixes
-FROM deliveries
-WHERE batsman_runs = 6
-GROUP BY batsman
-ORDER BY sixes DESC
-LIMIT 5;
-"""
+most_sixes_query, _ = leaderboard_sql("sixes", labels=("batsman", "sixes"))
 
 # 5. Top 5 Bowlers by Wickets (dismissals only)
-top_bowlers_query = """
-SELECT bowler, COUNT(*) AS wickets
-FROM deliveries
-WHERE dismissal_kind IN ('caught', 'bowled', 'lbw', 'stumped', 'caught and bowled', 'hit wicket')
-GROUP BY bowler
-ORDER BY wickets DESC
-LIMIT 5;
-"""
+top_bowlers_query, _ = leaderboard_sql("wickets", labels=("bowler", "wickets"))
 
 # 6. Most Matches Played by a Team
-most_matches_played_query = """
-SELECT team, COUNT(*) AS matches_played FROM (
-    SELECT team1 AS team FROM matches
-    UNION ALL
-    SELECT team2 AS team FROM matches
-) t
-GROUP BY team
-ORDER BY matches_played DESC
-LIMIT 5;
-"""
+most_matches_played_query, _ = leaderboard_sql("matches", labels=("team", "matches_played"))
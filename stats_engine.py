@@ -0,0 +1,259 @@
+# stats_engine.py
+
+# In-memory stats over dictionary-encoded frames: players, teams and venues
+# become dense integer ids once, and every per-player aggregate is a
+# np.bincount over contiguous arrays instead of a GROUP BY on text.
+
+from db_schema import NOT_OUT_DISMISSALS
+
+BOWLER_EXCLUDED = ("run out", "retired hurt", "obstructing the field")
+
+
+def build_vocabulary(columns):
+    """Sorted union of the values in ``columns`` (an Index)."""
+    import pandas as pd
+
+    values = []
+    for col in columns:
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            values.append(pd.Index(col.cat.categories))
+        else:
+            values.append(pd.Index(col.dropna().unique()))
+    union = values[0]
+    for index in values[1:]:
+        union = union.union(index)
+    return pd.Index(sorted(union.astype(str)))
+
+
+def encode_ids(col, vocabulary):
+    """Dense int32 ids of ``col`` in ``vocabulary``; -1 for missing values."""
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        # Map each category once, then look the row codes up
+        lookup = np.append(vocabulary.get_indexer(col.cat.categories.astype(str)), -1).astype(np.int32)
+        return lookup[col.cat.codes.to_numpy()]
+    ids = vocabulary.get_indexer(col.astype(object).where(col.notna(), None))
+    return ids.astype(np.int32)
+
+
+class StatsEngine:
+    """Batting, bowling and team aggregates for one snapshot of the data.
+
+    Building the engine encodes the string columns; each stat afterwards is
+    one pass over an int32 id array, and every stat of a role is computed
+    together and kept, so further leaderboards only sort.
+    """
+
+    def __init__(self, matches, deliveries):
+        import numpy as np
+
+        d, m = deliveries, matches
+        self.players = build_vocabulary([d["batsman"], d["bowler"], d["player_dismissed"], m["player_of_match"]])
+        self.teams = build_vocabulary([m["team1"], m["team2"]])
+        self.venues = build_vocabulary([m["venue"]])
+
+        self.batsman = encode_ids(d["batsman"], self.players)
+        self.bowler = encode_ids(d["bowler"], self.players)
+        self.dismissed = encode_ids(d["player_dismissed"], self.players)
+        self.award = encode_ids(m["player_of_match"], self.players)
+        self.team1 = encode_ids(m["team1"], self.teams)
+        self.team2 = encode_ids(m["team2"], self.teams)
+        self.winner = encode_ids(m["winner"], self.teams)
+        self.toss_winner = encode_ids(m["toss_winner"], self.teams)
+        self.venue = encode_ids(m["venue"], self.venues)
+        self.season = m["season"].to_numpy(dtype=np.int32)
+        self.win_by_runs = m["win_by_runs"].fillna(0).to_numpy(dtype=np.int32)
+
+        def ints(name):
+            return d[name].fillna(0).to_numpy(dtype=np.int32) if name in d else np.zeros(len(d), np.int32)
+
+        self.batsman_runs = ints("batsman_runs")
+        self.total_runs = ints("total_runs")
+        self.wide_runs = ints("wide_runs")
+        kind = d["dismissal_kind"].astype(object)
+        self.bowler_wicket = (kind.notna() & ~kind.isin(BOWLER_EXCLUDED)).to_numpy()
+        # A retired-hurt batsman is not out (as in aggregates.py)
+        self.dismissed = np.where(kind.isin(NOT_OUT_DISMISSALS).to_numpy(), -1, self.dismissed)
+        self._batting = None
+        self._bowling = None
+
+    @classmethod
+    def from_dataset(cls, dataset=None):
+        from dataset import get_dataset
+
+        dataset = dataset or get_dataset()
+        return cls(dataset.matches, dataset.deliveries)
+
+    @classmethod
+    def for_seasons(cls, seasons, partitions=None):
+        """Engine over ``seasons`` only (a season or an inclusive (first,
+        last) range), reading just those season partitions."""
+        from partitions import get_partitions
+
+        partitions = partitions or get_partitions()
+        return cls(partitions.read("matches", seasons), partitions.read("deliveries", seasons))
+
+    def _count(self, ids, weights=None, size=None):
+        import numpy as np
+
+        valid = ids >= 0
+        return np.bincount(ids[valid], weights=None if weights is None else weights[valid],
+                           minlength=size or len(self.players)).astype(np.int64)
+
+    def batting(self):
+        """Per player: runs, balls (all deliveries faced), legal balls, fours,
+        sixes and dismissals, as arrays indexed by player id."""
+        if self._batting is None:
+            runs = self.batsman_runs
+            self._batting = {
+                "runs": self._count(self.batsman, runs),
+                "balls": self._count(self.batsman),
+                "legal_balls": self._count(self.batsman, (self.wide_runs == 0).astype(float)),
+                "fours": self._count(self.batsman, (runs == 4).astype(float)),
+                "sixes": self._count(self.batsman, (runs == 6).astype(float)),
+                "dismissals": self._count(self.dismissed),
+            }
+        return self._batting
+
+    def bowling(self):
+        """Per player: balls bowled, runs conceded and wickets (run outs and
+        the like excluded)."""
+        if self._bowling is None:
+            self._bowling = {
+                "balls": self._count(self.bowler),
+                "runs": self._count(self.bowler, self.total_runs),
+                "wickets": self._count(self.bowler, self.bowler_wicket.astype(float)),
+            }
+        return self._bowling
+
+    def batting_frame(self):
+        import pandas as pd
+
+        frame = pd.DataFrame(self.batting(), index=self.players)
+        frame = frame[frame["balls"] > 0]
+        frame["strike_rate"] = (frame["runs"] * 100.0 / frame["legal_balls"]).round(2)
+        return frame
+
+    def bowling_frame(self):
+        import pandas as pd
+
+        frame = pd.DataFrame(self.bowling(), index=self.players)
+        frame = frame[frame["balls"] > 0]
+        frame["economy"] = (frame["runs"] * 6.0 / frame["balls"]).round(2)
+        return frame
+
+    # --- run_queries.QUERIES equivalents (same names, columns and ties) ---
+
+    def _top(self, values, names, key, value, keep=None, k=5, ascending=False):
+        import numpy as np
+        import pandas as pd
+
+        ids = np.flatnonzero(keep) if keep is not None else np.arange(len(values))
+        order = np.argsort(values[ids] if ascending else -values[ids], kind="stable")[:k]
+        ids = ids[order]
+        return pd.DataFrame({key: names[ids].to_numpy(dtype=object), value: values[ids]})
+
+    def top_teams(self):
+        wins = self._count(self.winner, size=len(self.teams))
+        return self._top(wins, self.teams, "Team", "Wins", keep=wins > 0)
+
+    def top_appearances(self):
+        import numpy as np
+        import pandas as pd
+
+        awards = self._count(self.award)
+        total = awards + self.batting()["balls"]
+        frame = self._top(total, self.players, "player", "Matches", keep=total > 0)
+        # Matches with no award winner count as one more "player" in the SQL
+        missing = int((self.award < 0).sum())
+        if missing:
+            frame = pd.concat([frame, pd.DataFrame({"player": [None], "Matches": [missing]})], ignore_index=True)
+            order = np.argsort(-frame["Matches"].to_numpy(), kind="stable")[:5]
+            frame = frame.iloc[order].reset_index(drop=True)
+        return frame
+
+    def top_six_hitters(self):
+        sixes = self.batting()["sixes"]
+        return self._top(sixes, self.players, "batsman", "Sixes", keep=sixes > 0)
+
+    def economical_bowlers(self, min_balls=300):
+        import numpy as np
+
+        bowling = self.bowling()
+        balls = bowling["balls"]
+        economy = np.round(bowling["runs"] * 6.0 / np.maximum(balls, 1), 2)
+        return self._top(economy, self.players, "bowler", "Economy", keep=balls >= min_balls, ascending=True)
+
+    def top_run_scorers(self):
+        batting = self.batting()
+        return self._top(batting["runs"], self.players, "batsman", "Total_Runs", keep=batting["balls"] > 0)
+
+    def top_wicket_takers(self):
+        wickets = self.bowling()["wickets"]
+        return self._top(wickets, self.players, "bowler", "Wickets", keep=wickets > 0)
+
+    def matches_per_season(self):
+        import numpy as np
+        import pandas as pd
+
+        seasons, counts = np.unique(self.season, return_counts=True)
+        return pd.DataFrame({"season": seasons, "Total_Matches": counts})
+
+    def toss_vs_match_winner(self):
+        import pandas as pd
+
+        both = int(((self.toss_winner == self.winner) & (self.winner >= 0)).sum())
+        counts = {"Only Toss or Match Won": len(self.winner) - both, "Toss & Match Won": both}
+        counts = {label: n for label, n in counts.items() if n}
+        return pd.DataFrame({"Result": list(counts), "Count": list(counts.values())})
+
+    def top_venues(self):
+        venues = self._count(self.venue, size=len(self.venues))
+        return self._top(venues, self.venues, "venue", "Matches")
+
+    def win_by_batting_first(self):
+        import numpy as np
+        import pandas as pd
+
+        decided = self.winner >= 0
+        counts = np.bincount((self.win_by_runs[decided] > 0).astype(np.int64), minlength=2)
+        keep = counts > 0
+        return pd.DataFrame({"Batting_First": np.arange(2)[keep], "Wins": counts[keep]})
+
+    def run_queries(self, names=None):
+        """{query name: frame} for run_queries.QUERIES (or just ``names``)."""
+        from run_queries import QUERIES
+
+        names = names or [q["name"] for q in QUERIES]
+        return {name: getattr(self, name)() for name in names}
+
+
+if __name__ == "__main__":
+    import time
+
+    from db_schema import connect
+    from run_queries import run_batch
+
+    engine_start = time.perf_counter()
+    engine = StatsEngine.from_dataset()
+    built = time.perf_counter()
+    results = engine.run_queries()
+    done = time.perf_counter()
+
+    conn = connect("ipl_analysis.db", read_only=True)
+    sql_start = time.perf_counter()
+    expected = run_batch(conn)
+    sql_done = time.perf_counter()
+    conn.close()
+
+    print(f"📊 Stats engine: build {(built - engine_start) * 1000:.1f} ms, "
+          f"all queries {(done - built) * 1000:.1f} ms")
+    print(f"📊 SQL run_batch: {(sql_done - sql_start) * 1000:.1f} ms")
+    mismatched = [name for name, frame in results.items()
+                  if frame.astype(str).values.tolist() != expected[name].astype(str).values.tolist()]
+    if mismatched:
+        print(f"❌ Different results for: {', '.join(mismatched)}")
+    else:
+        print("✅ Same results as the SQL path.")
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from db_schema import connect
+from ingest import ingest_new_matches
+
+
+def _build_db(matches, deliveries, path=":memory:", normalized=None):
+    conn = connect(str(path))
+    ingest_new_matches(conn, matches, deliveries, normalized)
+    return conn
+
+
+def _make_frames(match_ids):
+    n = len(match_ids)
+    matches = pd.DataFrame({"id": match_ids, "season": [2017] * n,
+                            "team1": ["A"] * n, "team2": ["B"] * n, "winner": ["A"] * n})
+    deliveries = pd.DataFrame({"match_id": [m for m in match_ids for _ in range(2)],
+                               "inning": [1] * 2 * n, "over": [1] * 2 * n, "ball": [1, 2] * n,
+                               "batsman": ["x", "y"] * n, "batsman_runs": [4, 1] * n})
+    return matches, deliveries
+
+
+def _sample_frames():
+    matches = pd.DataFrame({
+        "id": [1, 2, 3, 4, 5],
+        "season": [2016, 2016, 2017, 2017, 2017],
+        "team1": ["A", "B", "A", "C", "A"],
+        "team2": ["B", "A", "B", "A", "C"],
+        "toss_winner": ["A", "A", "B", "C", "A"],
+        "toss_decision": ["bat", "field", "field", "bat", "bat"],
+        "winner": ["A", "B", "A", "C", None],
+        "win_by_runs": [10, 0, 0, 25, 0],
+        "venue": ["V1", "V1", "V2", "V2", "V1"],
+    })
+    deliveries = pd.DataFrame({"match_id": [1, 1, 2, 3], "inning": 1, "over": [1, 1, 1, 18],
+                               "ball": [1, 2, 1, 1], "batsman": ["x", "y", "x", "y"],
+                               "bowler": ["z", "z", "w", "w"], "batsman_runs": [6, 1, 4, 6],
+                               "total_runs": [6, 1, 4, 6]})
+    return matches, deliveries
+
+
+def _random_frames(seed=7, n_matches=40, per_match=120):
+    rng = np.random.default_rng(seed)
+    teams = ["A", "B", "C", "D"]
+    matches = pd.DataFrame({
+        "id": np.arange(1, n_matches + 1), "season": rng.integers(2015, 2018, n_matches),
+        "team1": rng.choice(teams[:2], n_matches), "team2": rng.choice(teams[2:], n_matches),
+        "toss_winner": rng.choice(teams, n_matches), "winner": rng.choice(teams + [None], n_matches),
+        "win_by_runs": rng.integers(0, 40, n_matches), "player_of_match": rng.choice(["p1", "p2", "b1"], n_matches),
+        "venue": rng.choice(["V1", "V2", "V3"], n_matches),
+    })
+    n = n_matches * per_match
+    kinds = rng.choice([None, None, None, "caught", "run out", "bowled"], n)
+    deliveries = pd.DataFrame({
+        "match_id": np.repeat(matches["id"], per_match), "inning": 1,
+        "over": np.tile(np.repeat(np.arange(1, 21), 6), n_matches), "ball": np.tile(np.arange(1, 7), n // 6),
+        "batsman": rng.choice([f"b{i}" for i in range(12)], n), "bowler": rng.choice([f"w{i}" for i in range(6)], n),
+        "batsman_runs": rng.choice([0, 1, 4, 6], n), "total_runs": rng.choice([0, 1, 2, 4, 6], n),
+        "dismissal_kind": kinds,
+    })
+    return matches, deliveries
+
+
+@pytest.fixture
+def build_db():
+    """build_db(matches, deliveries, path=":memory:", normalized=None): an
+    open connection to a database holding the frames."""
+    return _build_db
+
+
+@pytest.fixture
+def make_frames():
+    """make_frames(match_ids) -> (matches, deliveries): A beats B in each
+    match, two balls per match."""
+    return _make_frames
+
+
+@pytest.fixture
+def sample_frames():
+    """(matches, deliveries): five matches over two seasons, small enough to check by hand."""
+    return _sample_frames()
+
+
+@pytest.fixture
+def random_frames():
+    """(matches, deliveries): 40 seeded random matches of 120 balls, with dismissals."""
+    return _random_frames()
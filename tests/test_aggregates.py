@@ -0,0 +1,40 @@
+import sqlite3
+
+import pandas as pd
+
+from aggregates import SUMMARY_TABLES, rebuild_summaries
+from ingest import ingest_new_matches
+
+
+def make_frames():
+    matches = pd.DataFrame({"id": [1, 2], "season": [2016, 2017], "team1": ["A", "B"],
+                            "team2": ["B", "A"], "winner": ["A", "A"]})
+    deliveries = pd.DataFrame({
+        "match_id": [1, 1, 1, 2, 2], "inning": [1, 1, 2, 1, 2], "over": [1] * 5, "ball": [1, 2, 1, 1, 1],
+        "batsman": ["x", "x", "y", "y", "x"], "bowler": ["p", "p", "q", "q", "p"],
+        "batsman_runs": [6, 4, 0, 6, 1], "total_runs": [6, 4, 1, 6, 1], "wide_runs": [0, 0, 1, 0, 0],
+        "player_dismissed": [None, "x", None, None, None],
+        "dismissal_kind": [None, "bowled", None, None, None],
+    })
+    return matches, deliveries
+
+
+def snapshot(conn):
+    return {t: sorted(conn.execute(f"SELECT * FROM {t}").fetchall()) for t in SUMMARY_TABLES}
+
+
+# Test 1: Incremental refresh matches a full rebuild
+def test_incremental_equals_rebuild():
+    matches, deliveries = make_frames()
+    conn = sqlite3.connect(":memory:")
+    ingest_new_matches(conn, matches[matches["id"] == 1], deliveries)
+    ingest_new_matches(conn, matches, deliveries)
+    incremental = snapshot(conn)
+
+    rebuild_summaries(conn)
+    assert snapshot(conn) == incremental
+    assert conn.execute("SELECT SUM(runs), SUM(sixes), SUM(dismissals) FROM batting_summary "
+                        "WHERE batsman = 'x'").fetchone() == (11, 1, 1)
+    assert conn.execute("SELECT wins, matches FROM team_summary WHERE team = 'A' AND season = 2017"
+                        ).fetchone() == (1, 1)
+    conn.close()
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from analytics_index import get_matchup_index
+from ingest import ingest_new_matches
+
+
+def build(build_db, frames, batches):
+    """A database filled by one ingest per batch of match ids."""
+    matches, deliveries = frames
+    pick = lambda ids: (matches[matches["id"].isin(ids)], deliveries[deliveries["match_id"].isin(ids)])
+    conn = build_db(*pick(batches[0]))
+    for ids in batches[1:]:
+        ingest_new_matches(conn, *pick(ids))
+    return conn
+
+
+# Test 1: Lookups answer head-to-head and venue questions
+def test_lookups(build_db, sample_frames):
+    index = get_matchup_index(build(build_db, sample_frames, [[1, 2, 3, 4, 5]]))
+    assert index.head_to_head("A", "B") == {"played": 3, "won": 2, "lost": 1, "no_result": 0}
+    assert index.head_to_head("B", "A", season=2017) == {"played": 1, "won": 0, "lost": 1, "no_result": 0}
+    assert index.head_to_head("A", "C")["no_result"] == 1
+    assert index.head_to_head("A", "Z")["played"] == 0
+    assert index.venue_record("V1", "bat") == {"toss_winner_bat_first": 1, "toss_winner_chasing": 0,
+                                               "other_bat_first": 0, "other_chasing": 0, "no_result": 1}
+    assert index.batting_first_win_rate("V2") == 50.0
+    assert index.team_season("A", 2017) == (3, 1)
+
+
+# Test 2: The report frames match the SQL they replace, however the data was loaded
+def test_frames_match_sql_and_incremental_build(build_db, sample_frames, tmp_path):
+    conn = build(build_db, sample_frames, [[1, 2], [3], [4, 5]])
+    index = get_matchup_index(conn)
+    toss = pd.read_sql_query("""
+        SELECT CASE WHEN toss_winner = winner THEN 'Toss & Match Won'
+                    ELSE 'Only Toss or Match Won' END AS Result, COUNT(*) AS Count
+        FROM matches GROUP BY 1
+    """, conn)
+    pd.testing.assert_frame_equal(index.toss_vs_match_winner(), toss, check_dtype=False)
+    strategy = pd.read_sql_query("""
+        SELECT CASE WHEN win_by_runs > 0 THEN 'Bat First' ELSE 'Chase' END AS Strategy, COUNT(*) AS Wins
+        FROM matches WHERE winner IS NOT NULL GROUP BY Strategy
+    """, conn)
+    pd.testing.assert_frame_equal(index.win_by_innings_strategy(), strategy, check_dtype=False)
+
+    rebuilt = get_matchup_index(build(build_db, sample_frames, [[1, 2, 3, 4, 5]]))
+    assert (index.played == rebuilt.played).all() and (index.venue_toss == rebuilt.venue_toss).all()
+    assert index.season_win_rates().loc["A", 2016] == 50.0
+
+    # A database file keeps its index until the next ingest; in-memory ones are never cached
+    assert get_matchup_index(conn) is not index
+    matches, deliveries = sample_frames
+    on_disk = build_db(matches[matches["id"] < 5], deliveries, path=tmp_path / "ipl.db")
+    cached = get_matchup_index(on_disk)
+    assert get_matchup_index(on_disk) is cached
+    ingest_new_matches(on_disk, matches, deliveries)
+    assert get_matchup_index(on_disk).head_to_head("A", "C")["played"] == 2
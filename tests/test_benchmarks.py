@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import synthetic
+from suite import find_regressions
+
+
+# Test 1: The generator is deterministic and produces the real files' columns
+def test_synthetic_data_is_deterministic(tmp_path):
+    counts = synthetic.generate(1 / 12, tmp_path / "a")
+    synthetic.generate(1 / 12, tmp_path / "b")
+    for name in ("matches.csv", "deliveries.csv"):
+        assert (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
+
+    matches = pd.read_csv(tmp_path / "a" / "matches.csv")
+    deliveries = pd.read_csv(tmp_path / "a" / "deliveries.csv")
+    assert list(matches.columns) == synthetic.MATCH_COLUMNS
+    assert list(deliveries.columns) == synthetic.DELIVERY_COLUMNS
+    assert counts == {"matches": len(matches), "deliveries": len(deliveries)}
+    assert deliveries.groupby(["match_id", "inning"])["player_dismissed"].count().max() <= 10
+
+
+# Test 2: The recorded winner is the side that scored more
+def test_synthetic_results_follow_scores(tmp_path):
+    synthetic.generate(1 / 12, tmp_path)
+    matches = pd.read_csv(tmp_path / "matches.csv").set_index("id")
+    deliveries = pd.read_csv(tmp_path / "deliveries.csv")
+    totals = deliveries.groupby(["match_id", "batting_team"])["total_runs"].sum()
+    decided = matches[matches["result"] == "normal"]
+    for match_id, row in decided.iterrows():
+        loser = row["team2"] if row["winner"] == row["team1"] else row["team1"]
+        assert totals[(match_id, row["winner"])] > totals[(match_id, loser)]
+
+
+# Test 3: Only slowdowns beyond both the threshold and the noise floor fail
+def test_find_regressions():
+    baseline = {"1x": {"timings": {"slow": 1.0, "tiny": 0.001, "gone": 1.0}}}
+    results = {"1x": {"timings": {"slow": 1.5, "tiny": 0.004, "new": 9.0}}}
+    assert len(find_regressions(results, baseline, threshold=0.25, min_delta=0.005)) == 1
+    assert find_regressions(results, baseline, threshold=0.6) == []
@@ -0,0 +1,65 @@
+import importlib
+
+from build_cache import BuildManifest, code_version, module_version
+from pipeline import Pipeline, Stage
+
+
+def make_stages(tmp_path, calls, version):
+    target = tmp_path / "report.csv"
+
+    def load():
+        calls.append("load")
+        return version
+
+    def report(data):
+        calls.append("report")
+        target.write_text(str(data))
+        return str(target)
+
+    return [Stage("load", load, outputs=["data"], params=version),
+            Stage("report", report, inputs=["data"], outputs=["report_csv"], targets=[str(target)])]
+
+
+# Test 1: A second run with unchanged inputs does no work
+def test_noop_run_skips_everything(tmp_path):
+    manifest_path = str(tmp_path / "manifest.json")
+    calls = []
+    Pipeline(make_stages(tmp_path, calls, "v1")).run(manifest=BuildManifest(manifest_path))
+    assert calls == ["load", "report"]
+
+    calls.clear()
+    results = Pipeline(make_stages(tmp_path, calls, "v1")).run(manifest=BuildManifest(manifest_path))
+    assert calls == []
+    assert results["report_csv"].endswith("report.csv")
+
+
+# Test 2: New data or --force rebuilds
+def test_changed_fingerprint_or_force_rebuilds(tmp_path):
+    manifest_path = str(tmp_path / "manifest.json")
+    Pipeline(make_stages(tmp_path, [], "v1")).run(manifest=BuildManifest(manifest_path))
+
+    calls = []
+    Pipeline(make_stages(tmp_path, calls, "v2")).run(manifest=BuildManifest(manifest_path))
+    assert calls == ["load", "report"]
+
+    calls.clear()
+    Pipeline(make_stages(tmp_path, calls, "v2")).run(manifest=BuildManifest(manifest_path, force=True))
+    assert calls == ["load", "report"]
+
+
+# Test 3: Editing a helper the stage relies on changes its code version
+def test_helper_edits_change_code_version(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "helper_mod.py").write_text("def rows():\n    return [1]\n")
+    (tmp_path / "report_mod.py").write_text("from helper_mod import rows\n\ndef report():\n    return rows()\n")
+    report = importlib.import_module("report_mod").report
+    before = code_version(report, ["helper_mod"])
+    assert code_version(report) != before
+
+    (tmp_path / "helper_mod.py").write_text("def rows():\n    return [2]\n")
+    importlib.reload(importlib.import_module("helper_mod"))
+    module_version.cache_clear()
+    try:
+        assert code_version(report, ["helper_mod"]) != before
+    finally:
+        module_version.cache_clear()
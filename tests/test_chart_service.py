@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from chart_service import ChartService
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Test 1: A chart is rendered once and then served from the cache
+def test_render_then_cache_hit(tmp_path):
+    service = ChartService(executor="thread", cache_folder=str(tmp_path / "cache"))
+    df = pd.DataFrame({"team": ["A", "B"], "wins": [3, 5]})
+    spec = {"kind": "bar", "x": "team", "y": "wins", "title": "Wins"}
+
+    first = service.submit(df, spec, str(tmp_path / "out" / "wins.png")).result()
+    second = service.submit(df, spec, str(tmp_path / "again.png")).result()
+    service.shutdown()
+
+    assert open(first, "rb").read() == open(second, "rb").read()
+    assert (service.renders, service.hits) == (1, 1)
+
+
+# Test 2: Changed data or spec means a new render; the cache keeps the newest PNGs
+def test_new_data_renders_again(tmp_path):
+    service = ChartService(executor="thread", cache_folder=str(tmp_path / "cache"), max_cache_files=2)
+    spec = {"kind": "column", "x": "team", "y": "wins"}
+    service.submit(pd.DataFrame({"team": ["A"], "wins": [1]}), spec, str(tmp_path / "a.png"))
+    service.submit(pd.DataFrame({"team": ["A"], "wins": [2]}), spec, str(tmp_path / "b.png"))
+    service.submit(pd.DataFrame({"team": ["A"], "wins": [2]}), dict(spec, color="red"), str(tmp_path / "c.png"))
+    service.shutdown()
+    assert service.renders == 3
+    assert len(os.listdir(tmp_path / "cache")) == 2 and (tmp_path / "c.png").exists()
+
+
+# Test 3: ipl_visualization.py renders its charts on spawned workers and exits
+def test_visualization_script_end_to_end(tmp_path):
+    pd.DataFrame({"team": ["A", "B"], "matches_played": [4, 4], "matches_won": [3, 1],
+                  "win_percentage": [75.0, 25.0]}).to_csv(tmp_path / "team_report.csv", index=False)
+    pd.DataFrame({"season": [2016, 2016, 2017, 2017], "team": ["A", "B", "A", "B"],
+                  "win_rate": [50.0, 50.0, 100.0, 0.0]}).to_csv(tmp_path / "season_report.csv", index=False)
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, IPL_CHART_WORKERS="1")
+    subprocess.run([sys.executable, os.path.join(REPO_ROOT, "ipl_visualization.py")],
+                   cwd=tmp_path, env=env, check=True, timeout=120)
+    for name in ("team_win_percentage", "season_win_rate_heatmap", "top_team_per_season"):
+        assert (tmp_path / f"{name}.png").stat().st_size > 0
@@ -0,0 +1,57 @@
+import os
+
+import pandas as pd
+
+from dataset import IPLDataset
+
+
+def write_csvs(folder):
+    os.makedirs(folder, exist_ok=True)
+    pd.DataFrame({"id": [1, 2], "season": [2017, 2017], "winner": ["A", "B"]}) \
+        .to_csv(os.path.join(folder, "matches.csv"), index=False)
+    pd.DataFrame({"match_id": [1, 1, 2], "batsman": ["x", "y", "x"], "batsman_runs": [4, 6, 1]}) \
+        .to_csv(os.path.join(folder, "deliveries.csv"), index=False)
+
+
+# Test 1: Tables are loaded lazily and only once
+def test_lazy_single_load(tmp_path, monkeypatch):
+    write_csvs(tmp_path / "data")
+    calls = []
+    real_read_csv = pd.read_csv
+    monkeypatch.setattr(pd, "read_csv", lambda path, *a, **k: calls.append(path) or real_read_csv(path, *a, **k))
+
+    ds = IPLDataset(str(tmp_path / "data"), str(tmp_path / "cache"), use_disk_cache=False)
+    assert ds.matches is ds.matches
+    assert calls and all(str(path).endswith("matches.csv") for path in calls)
+    parsed = len(calls)
+    ds.matches
+    assert len(calls) == parsed
+
+
+# Test 2: A second process-like instance reuses the disk cache
+def test_disk_cache_reused_until_source_changes(tmp_path, monkeypatch):
+    write_csvs(tmp_path / "data")
+    IPLDataset(str(tmp_path / "data"), str(tmp_path / "cache")).deliveries
+
+    def fail(*a, **k):
+        raise AssertionError("CSV should not be parsed on a cache hit")
+    monkeypatch.setattr(pd, "read_csv", fail)
+    cached = IPLDataset(str(tmp_path / "data"), str(tmp_path / "cache")).deliveries
+    assert cached["batsman_runs"].sum() == 11
+
+    monkeypatch.undo()
+    with open(tmp_path / "data" / "deliveries.csv", "a") as f:
+        f.write("2,z,2\n")
+    fresh = IPLDataset(str(tmp_path / "data"), str(tmp_path / "cache")).deliveries
+    assert len(fresh) == 4
+
+
+# Test 3: Columns follow the declared schema
+def test_typed_columns(tmp_path):
+    write_csvs(tmp_path / "data")
+    ds = IPLDataset(str(tmp_path / "data"), str(tmp_path / "cache"))
+    deliveries = ds.deliveries
+    assert deliveries["batsman_runs"].dtype == "int8"
+    assert deliveries["match_id"].dtype == "int32"
+    assert isinstance(deliveries["batsman"].dtype, pd.CategoricalDtype)
+    assert ds.matches["season"].dtype == "int16"
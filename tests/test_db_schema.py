@@ -0,0 +1,53 @@
+import sqlite3
+
+import pandas as pd
+
+from db_schema import create_schema, check_query_plans, explain, is_normalized
+from ingest import ingest_new_matches
+
+
+# Test 1: Every catalogued leaderboard query is answered through an index
+def test_catalogue_uses_indexes():
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    assert check_query_plans(conn) == {}
+    conn.close()
+
+
+# Test 2: The check flags a query that has to scan the table
+def test_full_scan_is_reported():
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    query = "SELECT fielder, COUNT(*) FROM deliveries GROUP BY fielder"
+    assert any(line.startswith("SCAN deliveries") for line in explain(conn, query))
+    assert "probe" in check_query_plans(conn, {"probe": query})
+    conn.close()
+
+
+def ingest_sample(normalized):
+    matches = pd.DataFrame({"id": [1, 2], "season": [2017, 2017], "team1": ["A", "B"], "team2": ["B", "A"],
+                            "winner": ["A", None], "venue": ["Eden Gardens", "Eden Gardens"],
+                            "player_of_match": ["x", None]})
+    deliveries = pd.DataFrame({"match_id": [1, 1, 2], "inning": [1, 1, 1], "over": [1, 1, 1],
+                               "ball": [1, 2, 1], "batting_team": ["A", "A", "B"], "batsman": ["x", "y", "z"],
+                               "bowler": ["z", "z", "x"], "batsman_runs": [6, 1, 4],
+                               "player_dismissed": [None, "y", None]})
+    conn = sqlite3.connect(":memory:")
+    ingest_new_matches(conn, matches, deliveries, normalized=normalized)
+    return conn
+
+
+# Test 3: The normalized layout stores names once and its views read like the plain tables
+def test_normalized_views_match_plain_tables():
+    plain, normalized = ingest_sample(False), ingest_sample(True)
+    assert is_normalized(normalized) and not is_normalized(plain)
+    assert normalized.execute("SELECT name FROM players ORDER BY id").fetchall() == [("x",), ("y",), ("z",)]
+    assert normalized.execute("SELECT COUNT(*) FROM venues").fetchone()[0] == 1
+    for table in ["matches", "deliveries", "batting_summary", "team_summary"]:
+        query = f"SELECT * FROM {table} ORDER BY 1, 2, 3"
+        assert normalized.execute(query).fetchall() == plain.execute(query).fetchall(), table
+    assert check_query_plans(normalized) == {}
+
+    # An existing database keeps its layout
+    create_schema(plain, normalized=True)
+    assert not is_normalized(plain)
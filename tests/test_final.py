@@ -0,0 +1,20 @@
+import pandas as pd
+import pytest
+
+import final
+
+
+# Test 1: A batch runs the chosen analyses and writes their reports and charts
+def test_batch_writes_outputs(tmp_path, monkeypatch, build_db, sample_frames):
+    monkeypatch.chdir(tmp_path)
+    build_db(*sample_frames, path=tmp_path / "ipl.db").close()
+    rows = final.run_batch(["top_teams_by_wins", "toss_vs_match_winner"], db_path=str(tmp_path / "ipl.db"))
+    assert rows == {"top_teams_by_wins": 3, "toss_vs_match_winner": 2}
+    assert pd.read_csv("reports/top_teams_by_wins.csv")["Team"].tolist() == ["A", "B", "C"]
+    assert (tmp_path / "charts" / "toss_vs_match_winner.png").exists()
+
+
+# Test 2: Unknown analysis names are rejected before anything runs
+def test_batch_rejects_unknown_names(tmp_path):
+    with pytest.raises(ValueError):
+        final.run_batch(["top_teams_by_wins", "nope"], db_path=str(tmp_path / "ipl.db"))
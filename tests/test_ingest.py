@@ -0,0 +1,63 @@
+import sqlite3
+
+import pytest
+
+from exceptions import IPLDataError
+from ingest import ingest_new_matches, register_derived_table, stream_ingest, DERIVED_TABLES
+
+
+# Test 1: Re-running ingest only appends new matches
+def test_incremental_and_idempotent(make_frames):
+    conn = sqlite3.connect(":memory:")
+    assert ingest_new_matches(conn, *make_frames([1, 2])) == [1, 2]
+    assert ingest_new_matches(conn, *make_frames([1, 2])) == []
+    assert ingest_new_matches(conn, *make_frames([1, 2, 3])) == [3]
+
+    assert conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0] == 3
+    assert conn.execute("SELECT COUNT(*) FROM deliveries").fetchone()[0] == 6
+    conn.close()
+
+
+# Test 2: Derived tables are refreshed with just the new match ids
+def test_derived_tables_see_new_ids(monkeypatch, make_frames):
+    monkeypatch.setattr("ingest.DERIVED_TABLES", dict(DERIVED_TABLES))
+    seen = []
+    register_derived_table("probe", ["deliveries"], lambda conn, ids: seen.append(ids))
+
+    conn = sqlite3.connect(":memory:")
+    ingest_new_matches(conn, *make_frames([1]))
+    ingest_new_matches(conn, *make_frames([1, 2]))
+    assert seen == [[1], [2]]
+    conn.close()
+
+
+def write_csvs(tmp_path, frames, delivery_order=None):
+    matches, deliveries = frames
+    if delivery_order is not None:
+        deliveries = deliveries.iloc[delivery_order]
+    matches.to_csv(tmp_path / "matches.csv", index=False)
+    deliveries.to_csv(tmp_path / "deliveries.csv", index=False)
+    return tmp_path / "matches.csv", tmp_path / "deliveries.csv"
+
+
+# Test 3: Streaming in tiny chunks matches the in-memory ingest, summaries included
+def test_stream_ingest_matches_bulk_ingest(tmp_path, make_frames):
+    paths = write_csvs(tmp_path, make_frames([1, 2, 3]))
+    streamed = sqlite3.connect(":memory:")
+    stats = stream_ingest(streamed, *paths, chunksize=3)
+    assert sorted(stats["match_ids"]) == [1, 2, 3] and stats["rows"] == 6
+
+    bulk = sqlite3.connect(":memory:")
+    ingest_new_matches(bulk, *make_frames([1, 2, 3]))
+    for table in ["deliveries", "batting_summary", "team_summary"]:
+        query = f"SELECT * FROM {table} ORDER BY 1, 2"
+        assert streamed.execute(query).fetchall() == bulk.execute(query).fetchall()
+
+    assert stream_ingest(streamed, *paths, chunksize=3)["match_ids"] == []
+
+
+# Test 4: Deliveries that are not grouped by match are rejected
+def test_stream_ingest_needs_grouped_deliveries(tmp_path, make_frames):
+    paths = write_csvs(tmp_path, make_frames([1, 2, 3]), delivery_order=[0, 2, 3, 4, 5, 1])
+    with pytest.raises(IPLDataError):
+        stream_ingest(sqlite3.connect(":memory:"), *paths, chunksize=2)
@@ -0,0 +1,55 @@
+import pandas as pd
+
+from innings import reconstruct
+
+COLUMNS = ["match_id", "inning", "over", "ball", "batting_team", "bowling_team", "batsman", "non_striker",
+           "bowler", "batsman_runs", "wide_runs", "extra_runs", "total_runs", "player_dismissed",
+           "dismissal_kind", "fielder"]
+ROWS = [
+    (1, 1, 1, 1, "A", "B", "a", "b", "w1", 4, 0, 0, 4, None, None, None),
+    (1, 1, 1, 2, "A", "B", "a", "b", "w1", 0, 1, 1, 1, None, None, None),
+    (1, 1, 1, 3, "A", "B", "a", "b", "w1", 1, 0, 0, 1, None, None, None),
+    (1, 1, 1, 4, "A", "B", "b", "a", "w1", 0, 0, 0, 0, "a", "run out", "f"),
+    (1, 1, 1, 5, "A", "B", "b", "c", "w1", 6, 0, 0, 6, None, None, None),
+    (1, 1, 1, 6, "A", "B", "b", "c", "w1", 0, 0, 0, 0, None, None, None),
+    (1, 1, 1, 7, "A", "B", "c", "b", "w1", 0, 0, 0, 0, "c", "bowled", None),
+    (1, 2, 1, 1, "B", "A", "x", "y", "w2", 4, 0, 0, 4, None, None, None),
+    (1, 2, 1, 2, "B", "A", "x", "y", "w2", 2, 0, 0, 2, None, None, None),
+]
+
+
+def tables():
+    # Shuffled: the engine has to put the balls back in order itself
+    deliveries = pd.DataFrame(ROWS, columns=COLUMNS).sample(frac=1, random_state=3)
+    return reconstruct(deliveries)
+
+
+# Test 1: Innings totals, batting and bowling scorecards
+def test_scorecards():
+    t = tables()
+    first = t["innings"].iloc[0]
+    assert (first["runs"], first["wickets"], first["balls"], first["extras"]) == (12, 2, 6, 1)
+
+    batting = t["batting"][t["batting"]["inning"] == 1]
+    assert batting["batsman"].tolist() == ["a", "b", "c"]
+    assert batting[["runs", "balls"]].values.tolist() == [[5, 2], [6, 3], [0, 1]]
+    assert batting["dismissal_kind"].fillna("not out").tolist() == ["run out", "not out", "bowled"]
+    assert batting["bowler"].fillna("").tolist() == ["", "", "w1"] and batting["fielder"].iloc[0] == "f"
+
+    bowling = t["bowling"].iloc[0]
+    assert (bowling["bowler"], bowling["overs"], bowling["runs"], bowling["wickets"], bowling["wides"]) == \
+        ("w1", "1.0", 12, 1, 1)
+
+
+# Test 2: Fall of wickets, partnerships and the chase timeline
+def test_wickets_partnerships_and_timeline():
+    t = tables()
+    assert t["fall_of_wickets"][["wicket", "score", "overs", "batsman"]].values.tolist() == \
+        [[1, 6, "0.3", "a"], [2, 12, "1.0", "c"]]
+
+    partnerships = t["partnerships"][t["partnerships"]["inning"] == 1]
+    assert partnerships[["batsman_1", "batsman_2", "runs", "batsman_1_runs", "batsman_2_runs", "extras"]] \
+        .values.tolist() == [["a", "b", 6, 5, 0, 1], ["b", "c", 6, 6, 0, 0]]
+
+    chase = t["timeline"][t["timeline"]["inning"] == 2].iloc[0]
+    assert (chase["score"], chase["target"], chase["required_rate"]) == (6, 13, round(7 * 6 / 118, 2))
@@ -0,0 +1,56 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from ingest import ingest_new_matches
+from leaderboard import leaderboard, leaderboard_sql
+
+
+def build_db():
+    matches = pd.DataFrame({"id": [1, 2, 3], "season": [2016, 2017, 2018], "team1": ["A", "A", "B"],
+                            "team2": ["B", "B", "A"], "winner": ["A", "B", "A"],
+                            "venue": ["Wankhede", "Eden", "Wankhede"]})
+    deliveries = pd.DataFrame({
+        "match_id": [1, 1, 1, 2, 2, 3, 3], "inning": 1, "ball": 1,
+        "over": [1, 17, 18, 2, 19, 1, 20],
+        "batting_team": ["A", "A", "B", "A", "B", "B", "A"],
+        "bowling_team": ["B", "B", "A", "B", "A", "A", "B"],
+        "batsman": ["x", "x", "y", "x", "y", "y", "x"], "bowler": ["p", "p", "q", "p", "q", "q", "p"],
+        "batsman_runs": [6, 6, 4, 6, 6, 1, 6], "total_runs": [6, 6, 4, 6, 6, 1, 6],
+        "player_dismissed": [None, None, "y", None, None, None, "x"],
+        "dismissal_kind": [None, None, "bowled", None, None, None, "caught"],
+    })
+    conn = sqlite3.connect(":memory:")
+    ingest_new_matches(conn, matches, deliveries)
+    return conn
+
+
+def rows(frame):
+    return [tuple(r) for r in frame.itertuples(index=False)]
+
+
+# Test 1: Filters narrow the leaderboard the way the SQL would by hand
+def test_filters():
+    conn = build_db()
+    assert rows(leaderboard(conn, "sixes")) == [("x", 4), ("y", 1)]
+    assert rows(leaderboard(conn, "sixes", venue="Wankhede", seasons=(2016, 2018))) == [("x", 3)]
+    assert rows(leaderboard(conn, "sixes", seasons=2017)) == [("x", 1), ("y", 1)]
+    assert rows(leaderboard(conn, "sixes", seasons=pd.Series([2017]).max())) == [("x", 1), ("y", 1)]
+    assert rows(leaderboard(conn, "sixes", phase="death", team="A")) == [("x", 2)]
+    assert rows(leaderboard(conn, "runs", k=1)) == [("x", 24)]
+    assert rows(leaderboard(conn, "wickets", phase="death")) == [("p", 1), ("q", 1)]
+    assert rows(leaderboard(conn, "wins", venue="Wankhede")) == [("A", 2)]
+    assert rows(leaderboard(conn, "economy", min_balls=4)) == [("p", 36.0)]
+
+
+# Test 2: Filter values are bound as parameters and bad input is rejected
+def test_parameters_and_validation():
+    sql, params = leaderboard_sql("runs", venue="x'; DROP TABLE matches; --", team="A")
+    assert "DROP" not in sql and params == ("x'; DROP TABLE matches; --", "A")
+    with pytest.raises(ValueError):
+        leaderboard_sql("catches")
+    with pytest.raises(ValueError):
+        leaderboard_sql("runs", phase="slog")
+    with pytest.raises(ValueError):
+        leaderboard_sql("wins", phase="death")
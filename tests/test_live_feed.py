@@ -0,0 +1,87 @@
+import json
+
+import pandas as pd
+
+from live_feed import BATTING_COLUMNS, BOWLING_COLUMNS, LiveAggregates, LiveIngest
+
+
+def ball(match_id, inning, batsman, bowler, runs, **extra):
+    row = {"match_id": match_id, "inning": inning, "batting_team": "A" if inning == 1 else "B",
+           "batsman": batsman, "bowler": bowler, "batsman_runs": runs, "total_runs": runs}
+    row.update(extra)
+    return json.dumps(row) + "\n"
+
+
+# Test 1: Each ball updates leaderboards, team totals and run rate; half-written lines wait
+def test_balls_update_running_state(tmp_path):
+    feed = tmp_path / "feed.jsonl"
+    feed.write_text(ball(1, 1, "x", "p", 6) + ball(1, 1, "y", "p", 4)
+                    + ball(1, 1, "x", "p", 0, player_dismissed="x", dismissal_kind="bowled")
+                    + ball(1, 1, "y", "q", 0, wide_runs=1, total_runs=1))
+    with open(feed, "a") as f:
+        f.write(ball(1, 1, "y", "q", 6)[:20])
+    ingest = LiveIngest(str(feed), str(tmp_path / "live.db"), k=2)
+    assert ingest.run() == 4
+
+    state = ingest.state()
+    assert state["leaderboards"]["runs"] == [("x", 6), ("y", 4)]
+    assert state["leaderboards"]["wickets"] == [("p", 1)]
+    assert state["current"] == {"match_id": 1, "inning": 1, "team": "A", "runs": 11, "wickets": 1,
+                                "overs": "0.3", "run_rate": 22.0}
+    assert ingest.aggregates.batting["y"] == [4, 1, 1, 0, 0]
+
+    with open(feed, "a") as f:
+        f.write(ball(1, 1, "y", "q", 6)[20:] + ball(1, 1, "z", "q", 1))
+    assert ingest.run() == 2
+    assert ingest.state()["leaderboards"]["runs"] == [("y", 10), ("x", 6)]
+
+    # Retired hurt is not a wicket (as in innings.py); a malformed line is skipped
+    with open(feed, "a") as f:
+        f.write('{"match_id": 1, "inning"\n' + ball(1, 1, "z", "q", 0, player_dismissed="z",
+                                                    dismissal_kind="retired hurt"))
+    assert ingest.run() == 1
+    assert ingest.state()["current"]["wickets"] == 1 and ingest.aggregates.batting["z"][4] == 0
+
+
+# Test 2: A restart resumes from the checkpointed offset without counting a ball twice
+def test_checkpoint_and_resume(tmp_path):
+    feed, db = tmp_path / "feed.jsonl", str(tmp_path / "live.db")
+    feed.write_text(ball(1, 1, "x", "p", 4) + ball(1, 1, "x", "p", 6))
+    LiveIngest(str(feed), db).run()
+
+    with open(feed, "a") as f:
+        f.write(ball(1, 2, "y", "q", 6))
+    resumed = LiveIngest(str(feed), db)
+    assert resumed.state()["leaderboards"]["sixes"] == [("x", 1)]
+    assert resumed.run() == 1
+    state = resumed.state()
+    assert state["balls"] == 3 and state["leaderboards"]["runs"] == [("x", 10), ("y", 6)]
+    assert state["current"]["team"] == "B" and state["current"]["runs"] == 6
+
+    other = tmp_path / "other.jsonl"
+    other.write_text(ball(2, 1, "z", "r", 1))
+    fresh = LiveIngest(str(other), db)
+    assert fresh.run() == 1 and fresh.state()["leaderboards"]["runs"] == [("z", 1)]
+
+
+# Test 3: The live counters agree with the summary tables built from the same balls
+def test_live_matches_summary_tables(build_db):
+    balls = [json.loads(ball(1, 1, "x", "p", 4)), json.loads(ball(1, 1, "y", "p", 0, wide_runs=1, total_runs=1)),
+             json.loads(ball(1, 1, "y", "q", 0, player_dismissed="y", dismissal_kind="retired hurt")),
+             json.loads(ball(1, 1, "x", "q", 0, player_dismissed="x", dismissal_kind="caught")),
+             json.loads(ball(1, 2, "z", "p", 6)),
+             json.loads(ball(1, 2, "z", "p", 0, player_dismissed="w", dismissal_kind="run out"))]
+    live = LiveAggregates()
+    for row in balls:
+        live.apply(row)
+
+    deliveries = pd.DataFrame(balls)
+    deliveries["over"], deliveries["ball"] = 1, range(1, len(balls) + 1)
+    matches = pd.DataFrame({"id": [1], "season": [2017], "team1": ["A"], "team2": ["B"], "winner": ["A"]})
+    conn = build_db(matches, deliveries)
+    batting = {row[0]: list(row[1:]) for row in conn.execute(
+        f"SELECT batsman, {', '.join(BATTING_COLUMNS)} FROM batting_summary")}
+    bowling = {row[0]: list(row[1:]) for row in conn.execute(
+        f"SELECT bowler, {', '.join(BOWLING_COLUMNS)} FROM bowling_summary")}
+    assert batting == live.batting and bowling == live.bowling
+    assert batting["y"][4] == 0 and batting["w"][4] == 1
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+import logger_config
+from logger_config import enable_metrics, instrumented, measure, metrics_summary
+from pipeline import Pipeline, Stage
+
+
+@pytest.fixture
+def metrics(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(logger_config, "_metrics", logger_config._MetricsState())
+    enable_metrics()
+    return tmp_path / "logs" / "metrics.jsonl"
+
+
+# Test 1: Disabled instrumentation records nothing and creates no files
+def test_disabled_is_a_no_op(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(logger_config, "_metrics", logger_config._MetricsState())
+    logger_config.disable_metrics()
+    with measure("query") as m:
+        m.rows = 3
+    assert instrumented()(lambda: [1, 2])() == [1, 2]
+    assert metrics_summary() == [] and list(tmp_path.iterdir()) == []
+
+
+# Test 2: Measurements are written as JSON lines with rows and timings
+def test_measure_and_instrumented(metrics):
+    with measure("SELECT 1", kind="query") as m:
+        m.rows = 5
+
+    @instrumented()
+    def report():
+        return [1, 2, 3]
+
+    report()
+    report()
+    lines = [json.loads(line) for line in metrics.read_text().splitlines()]
+    assert [(r["kind"], r["name"], r["rows"]) for r in lines] == [
+        ("query", "SELECT 1", 5), ("stage", "report", 3), ("stage", "report", 3)]
+    assert all(r["wall_s"] >= 0 and r["cpu_s"] >= 0 and r["ok"] for r in lines)
+    assert all(r["rss_growth_mb"] >= 0 and r["process_peak_rss_mb"] > 0 for r in lines)
+    summary = {e["name"]: e for e in metrics_summary()}
+    assert summary["report"]["calls"] == 2 and summary["report"]["rows"] == 6
+
+
+# Test 3: Pipeline stages are measured in the worker and recorded by the parent
+def test_pipeline_stages_are_measured(metrics):
+    stages = [Stage("make", lambda: [1, 2], outputs=["items"]),
+              Stage("use", lambda items: None, inputs=["items"])]
+    Pipeline(stages).run(max_workers=2)
+    names = [json.loads(line)["name"] for line in metrics.read_text().splitlines()]
+    assert sorted(names) == ["make", "use"]
@@ -2,10 +2,12 @@ import pandas as pd
 import sqlite3
 import os
 
+from dataset import get_dataset
+
 # Test 1: Check if CSV files load properly
 def test_csv_load():
-    matches = pd.read_csv("data/matches.csv")
-    deliveries = pd.read_csv("data/deliveries.csv")
+    dataset = get_dataset()
+    matches, deliveries = dataset.matches, dataset.deliveries
     assert not matches.empty, "Matches CSV is empty"
     assert not deliveries.empty, "Deliveries CSV is empty"
     assert "season" in matches.columns, "Missing 'season' column"
@@ -13,8 +15,8 @@ def test_csv_load():
 # Test 2: Check if SQLite tables are created
 def test_sqlite_tables():
     conn = sqlite3.connect(":memory:")
-    matches = pd.read_csv("data/matches.csv")
-    deliveries = pd.read_csv("data/deliveries.csv")
+    dataset = get_dataset()
+    matches, deliveries = dataset.matches, dataset.deliveries
     matches.to_sql("matches", conn, index=False, if_exists="replace")
     deliveries.to_sql("deliveries", conn, index=False, if_exists="replace")
 
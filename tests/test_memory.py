@@ -0,0 +1,63 @@
+import json
+
+import pandas as pd
+
+from dataset import SCHEMAS, IPLDataset, read_csv_chunks
+from memory import optimize, summarize
+
+
+# Test 1: Columns shrink to the narrowest dtype that round-trips, and no further
+def test_downcast_policy():
+    frame = pd.DataFrame({
+        "over": [1, 20, 300],                     # declared int8, but 300 needs int16
+        "total_runs": [1.0, 4.0, 6.0],            # integral floats without gaps
+        "rate": [0.5, None, 2.25],                # exact in float32
+        "ratio": [0.1, None, 0.3],                # not exact in float32
+        "batting_team": ["A", "B", "A"],
+        "bowling_team": ["B", "A", "C"],
+        "note": ["x", "y", "z"],                  # unique per row: stays a string
+    })
+    frame = pd.concat([frame] * 100, ignore_index=True)
+    frame["note"] = [f"n{i}" for i in range(len(frame))]
+    schema = {"over": "int8", "total_runs": "int8", "batting_team": "team", "bowling_team": "team"}
+    small, report = optimize(frame, schema)
+
+    assert small["over"].tolist()[:3] == [1, 20, 300] and small["over"].dtype == "int16"
+    assert small["total_runs"].dtype == "int8" and small["rate"].dtype == "float32"
+    assert small["ratio"].dtype == "float64"
+    assert small["batting_team"].dtype == small["bowling_team"].dtype
+    assert list(small["batting_team"].cat.categories) == ["A", "B", "C"]
+    assert not isinstance(small["note"].dtype, pd.CategoricalDtype)
+    before, after, changed, rejected = summarize(report)
+    assert after < before and changed == 5 and rejected == 1
+
+
+# Test 2: The dataset loaders go through the policy without losing values
+def test_loaders_downcast(tmp_path):
+    folder = tmp_path / "data"
+    folder.mkdir()
+    pd.DataFrame({"id": [1, 2], "season": [2017, 2017], "winner": ["A", "B"], "team1": ["A", "A"]}) \
+        .to_csv(folder / "matches.csv", index=False)
+    pd.DataFrame({"match_id": [1, 1, 2], "batsman": ["x", "y", "x"], "batsman_runs": [4, 6, 1],
+                  "over": [1, 2, 200]}).to_csv(folder / "deliveries.csv", index=False)
+
+    dataset = IPLDataset(str(folder), str(tmp_path / "cache"))
+    deliveries = dataset.deliveries
+    assert deliveries["over"].tolist() == [1, 2, 200] and deliveries["batsman_runs"].dtype == "int8"
+    assert dataset.matches["winner"].dtype == dataset.matches["team1"].dtype
+    assert set(dataset.memory_reports) == {"matches", "deliveries"}
+
+    # A cached load keeps the report; a frame typed under another policy is parsed again
+    meta_path = tmp_path / "cache" / "deliveries.meta.json"
+    meta = json.loads(meta_path.read_text())
+    meta_path.write_text(json.dumps({**meta, "policy": "older"}))
+    cached = IPLDataset(str(folder), str(tmp_path / "cache"))
+    assert cached.matches["winner"].dtype == dataset.matches["winner"].dtype
+    assert cached.memory_reports["matches"].equals(dataset.memory_reports["matches"])
+    assert cached.deliveries["over"].tolist() == [1, 2, 200]
+    assert json.loads(meta_path.read_text())["policy"] == meta["policy"]
+
+    chunks = list(read_csv_chunks(folder / "deliveries.csv", SCHEMAS["deliveries"], chunksize=2))
+    assert [len(c) for c in chunks] == [2, 1]
+    assert chunks[0]["match_id"].dtype == "int32" and chunks[1]["over"].dtype == "int16"
+    assert not isinstance(chunks[0]["batsman"].dtype, pd.CategoricalDtype)
@@ -0,0 +1,61 @@
+import os
+
+import pandas as pd
+
+import partitions
+from dataset import IPLDataset
+from partitions import SeasonPartitions
+
+
+def write_csvs(folder, seasons):
+    os.makedirs(folder, exist_ok=True)
+    ids = list(range(1, len(seasons) + 1))
+    pd.DataFrame({"id": ids, "season": seasons, "team1": "A", "team2": "B",
+                  "winner": ["A" if i % 2 else "B" for i in ids]}) \
+        .to_csv(os.path.join(folder, "matches.csv"), index=False)
+    pd.DataFrame({"match_id": [i for i in ids for _ in range(2)], "batting_team": "A",
+                  "batsman": ["x", "y"] * len(ids), "batsman_runs": [4, 6] * len(ids)}) \
+        .to_csv(os.path.join(folder, "deliveries.csv"), index=False)
+
+
+def make_partitions(tmp_path):
+    dataset = IPLDataset(str(tmp_path / "data"), str(tmp_path / "cache"))
+    return SeasonPartitions(dataset, str(tmp_path / "cache" / "partitions"))
+
+
+# Test 1: A season range reads only the partitions it touches
+def test_reads_only_touched_partitions(tmp_path, monkeypatch):
+    write_csvs(tmp_path / "data", [2016, 2016, 2017, 2018])
+    parts = make_partitions(tmp_path)
+    parts.refresh()
+
+    opened = []
+    real_read = partitions.read_columnar
+    monkeypatch.setattr(partitions, "read_columnar", lambda path, columns=None: opened.append(path)
+                        or real_read(path, columns))
+    matches = parts.read("matches", (2017, 2018))
+    deliveries = parts.read("deliveries", pd.Series([2016]).max())     # a numpy int, as from a frame
+    assert matches["id"].tolist() == [3, 4] and deliveries["match_id"].tolist() == [1, 1, 2, 2]
+    assert sorted(os.path.basename(path) for path in opened) == [
+        f"season={s}.{partitions.COLUMNAR_FORMAT}" for s in (2016, 2017, 2018)]
+    assert isinstance(matches["winner"].dtype, pd.CategoricalDtype)
+    assert matches["team1"].dtype == matches["winner"].dtype
+    assert parts.read("matches", 2030).empty
+
+
+# Test 2: A new season writes one new partition per table and leaves the others alone
+def test_new_season_writes_only_its_partitions(tmp_path, caplog):
+    write_csvs(tmp_path / "data", [2016, 2017])
+    assert len(make_partitions(tmp_path).refresh()["written"]) == 4
+
+    write_csvs(tmp_path / "data", [2016, 2017, 2018])
+    parts = make_partitions(tmp_path)
+    assert parts.refresh() == {"written": ["matches/2018", "deliveries/2018"], "kept": 4, "removed": []}
+    assert parts.refresh()["written"] == []
+    assert parts.seasons() == [2016, 2017, 2018]
+
+    # Deliveries of a match missing from matches are left out, but not silently
+    parts = partitions.split_by_season(pd.DataFrame({"id": [1], "season": [2016]}),
+                                       pd.DataFrame({"match_id": [1, 9, 9]}))
+    assert len(parts["deliveries"][2016]) == 1
+    assert "Left 2 deliveries of 1 matches" in caplog.text
@@ -0,0 +1,45 @@
+import threading
+
+import pytest
+
+from exceptions import IPLDatabaseError, IPLReportError
+from pipeline import Pipeline, Stage
+
+
+# Test 1: Outputs flow into dependent stages
+def test_outputs_feed_inputs():
+    stages = [
+        Stage("a", lambda: 2, outputs=["x"]),
+        Stage("b", lambda x: x * 10, inputs=["x"], outputs=["y"]),
+        Stage("c", lambda x, y: x + y, inputs=["x", "y"], outputs=["z"]),
+    ]
+    assert Pipeline(stages).run(max_workers=2)["z"] == 22
+
+
+# Test 2: Independent stages run at the same time
+def test_independent_stages_overlap():
+    barrier = threading.Barrier(2, timeout=5)
+    stages = [Stage("left", barrier.wait), Stage("right", barrier.wait)]
+    Pipeline(stages).run(max_workers=2)
+
+
+# Test 3: Failures surface as the stage's IPL exception
+def test_failure_maps_to_stage_error():
+    def boom():
+        raise RuntimeError("disk full")
+    stages = [Stage("write", boom, outputs=["db"], error=IPLDatabaseError, message="DB write failed."),
+              Stage("report", lambda db: None, inputs=["db"])]
+    with pytest.raises(IPLDatabaseError, match="DB write failed.") as info:
+        Pipeline(stages).run()
+    assert isinstance(info.value.__cause__, RuntimeError)
+
+
+# Test 4: Bad graphs are rejected up front
+def test_rejects_missing_inputs_and_cycles():
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", lambda y: y, inputs=["y"])])
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", lambda y: y, inputs=["y"], outputs=["x"]),
+                  Stage("b", lambda x: x, inputs=["x"], outputs=["y"])])
+    with pytest.raises(IPLReportError):
+        Pipeline([Stage("a", lambda: 1 / 0)]).run()
@@ -0,0 +1,73 @@
+import sqlite3
+
+from ingest import ingest_new_matches
+from query_cache import QueryCache
+
+QUERY = "SELECT team, SUM(wins) AS wins FROM team_summary WHERE team = 'A' GROUP BY team"
+
+
+# Test 1: Repeats are hits until new matches are ingested
+def test_hits_until_data_changes(make_frames):
+    conn = sqlite3.connect(":memory:")
+    ingest_new_matches(conn, *make_frames([1, 2]))
+    cache = QueryCache()
+
+    first = cache.read_sql(conn, QUERY)
+    again = cache.read_sql(conn, "  " + QUERY.replace(" FROM", "\n  FROM") + ";")
+    assert cache.stats()["hits"] == 1 and again.equals(first)
+
+    ingest_new_matches(conn, *make_frames([1, 2, 3]))
+    assert cache.read_sql(conn, QUERY)["wins"].tolist() == [3]
+    assert cache.stats()["misses"] == 2
+
+
+# Test 2: The least recently used entry is evicted first
+def test_lru_eviction():
+    conn = sqlite3.connect(":memory:")
+    cache = QueryCache(max_entries=2)
+    for sql in ["SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3", "SELECT 1", "SELECT 2"]:
+        cache.read_sql(conn, sql)
+    assert cache.stats() == {"hits": 2, "disk_hits": 0, "misses": 4, "entries": 2}
+
+
+# Test 3: The disk tier serves a fresh cache (e.g. the next run)
+def test_disk_tier(tmp_path, make_frames):
+    db = tmp_path / "ipl.db"
+    conn = sqlite3.connect(db)
+    ingest_new_matches(conn, *make_frames([1]))
+    QueryCache(disk_folder=tmp_path / "q").read_sql(conn, QUERY)
+
+    other = QueryCache(disk_folder=tmp_path / "q")
+    frame = other.read_sql(sqlite3.connect(db), QUERY)
+    assert other.stats()["disk_hits"] == 1 and frame["wins"].tolist() == [1]
+
+
+# Test 4: Writes outside the ingest manifest and rebuilt files are noticed; dicts use the disk tier
+def test_writes_outside_ingest(tmp_path, make_frames):
+    memory = sqlite3.connect(":memory:")
+    ingest_new_matches(memory, *make_frames([1]))
+    cache = QueryCache()
+    assert cache.read_sql(memory, QUERY)["wins"].tolist() == [1]
+    memory.execute("UPDATE team_summary SET wins = 5")
+    assert cache.read_sql(memory, QUERY)["wins"].tolist() == [5]
+
+    db = tmp_path / "ipl.db"
+    conn = sqlite3.connect(db)
+    ingest_new_matches(conn, *make_frames([1]))
+    disk = QueryCache(disk_folder=tmp_path / "q")
+    disk.read_sql(conn, QUERY)
+    with sqlite3.connect(db) as other:
+        other.execute("UPDATE team_summary SET wins = 7")
+    assert disk.read_sql(conn, QUERY)["wins"].tolist() == [7]
+    conn.close()
+
+    db.unlink()
+    rebuilt = sqlite3.connect(db)
+    ingest_new_matches(rebuilt, *make_frames([2]))      # same counts, different data
+    rebuilt.execute("UPDATE team_summary SET wins = 9")
+    rebuilt.commit()
+    assert QueryCache(disk_folder=tmp_path / "q").read_sql(rebuilt, QUERY)["wins"].tolist() == [9]
+
+    result = {"columns": ["n"], "rows": [(1,)]}
+    assert disk.get_or_run(rebuilt, "SELECT 1", (), lambda: result) == result
+    assert QueryCache(disk_folder=tmp_path / "q").get_or_run(rebuilt, "SELECT 1", (), None) == result
@@ -0,0 +1,70 @@
+import json
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from query_service import QueryService, QueryServiceBusy, serve_in_background
+
+
+@pytest.fixture
+def db_path(tmp_path, build_db, sample_frames):
+    path = tmp_path / "ipl.db"
+    build_db(*sample_frames, path=path).close()
+    return str(path)
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+# Test 1: Queries are served by name and parameters over HTTP, singly and batched
+def test_http_queries(db_path):
+    with serve_in_background(db_path) as url:
+        status, names = get(f"{url}/queries")
+        assert status == 200 and {"top_teams", "top_teams_query", "leaderboard"} <= set(names)
+
+        status, result = get(f"{url}/query/top_teams")
+        assert status == 200 and result["columns"] == ["Team", "Wins"] and result["rows"] == [["A", 2], ["B", 1], ["C", 1]]
+        status, result = get(f"{url}/query/leaderboard?metric=sixes&seasons=2016-2017&phase=death")
+        assert status == 200 and result["rows"] == [["y", 1]]
+
+        request = urllib.request.Request(f"{url}/batch", method="POST", data=json.dumps([
+            {"name": "top_teams"}, {"name": "leaderboard", "params": {"metric": "runs", "k": 1}}]).encode())
+        with urllib.request.urlopen(request) as response:
+            batch = json.loads(response.read())
+        assert [r["rows"] for r in batch] == [[["A", 2], ["B", 1], ["C", 1]], [["x", 10]]]
+
+        for bad in ([{"params": {}}], [{"name": "top_teams", "params": [1]}], ["top_teams"],
+                    [{"name": "leaderboard", "params": {"metric": ["runs"]}}]):
+            request = urllib.request.Request(f"{url}/batch", method="POST", data=json.dumps(bad).encode())
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(request)
+            assert error.value.code == 400, bad
+
+        assert get(f"{url}/query/nope")[0] == 404
+        assert get(f"{url}/query/leaderboard?metric=catches")[0] == 400
+        assert get(f"{url}/query/top_teams?k=3")[0] == 400
+
+
+# Test 2: Identical queries in flight share one execution; beyond max_pending, requests are refused
+def test_coalescing_and_back_pressure(db_path):
+    service = QueryService(db_path, workers=1, max_pending=1)
+    try:
+        with service.pool.connection():   # hold the only connection so queries queue up
+            first = service.submit("top_teams")
+            assert service.submit("top_teams") is first
+            with pytest.raises(QueryServiceBusy):
+                service.submit("top_venues")
+        assert first.result(timeout=10)["rows"] == [("A", 2), ("B", 1), ("C", 1)]
+        assert service.query("top_venues")["rows"][0] == ("V1", 3)
+        assert service.stats()["coalesced"] == 1 and service.stats()["rejected"] == 1
+        with pytest.raises(ValueError):    # never fits, so a bad request (400) rather than busy
+            service.submit_batch([{"name": "top_teams"}, {"name": "top_venues"}])
+    finally:
+        service.close()
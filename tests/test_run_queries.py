@@ -0,0 +1,29 @@
+import pandas as pd
+
+from run_queries import QUERIES, run_batch
+
+
+# Test 1: The fused batch returns the same frames as the individual queries
+def test_batch_matches_sql(build_db, random_frames):
+    conn = build_db(*random_frames, normalized=False)
+    batch = run_batch(conn)
+    for q in QUERIES:
+        expected = pd.read_sql_query(q["query"], conn)
+        got = batch[q["name"]]
+        assert list(got.columns) == list(expected.columns), q["name"]
+        # Compare ignoring the order of tied rows
+        key = list(expected.columns)
+        pd.testing.assert_frame_equal(got.sort_values(key).reset_index(drop=True),
+                                      expected.sort_values(key).reset_index(drop=True),
+                                      check_dtype=False, obj=q["name"])
+    conn.close()
+
+
+# Test 2: A normalized database gives the same batch results
+def test_batch_on_normalized_schema(build_db, random_frames):
+    plain, normalized = build_db(*random_frames, normalized=False), build_db(*random_frames, normalized=True)
+    expected, got = run_batch(plain), run_batch(normalized)
+    for name, frame in expected.items():
+        pd.testing.assert_frame_equal(got[name], frame, check_dtype=False, obj=name)
+    plain.close()
+    normalized.close()
@@ -0,0 +1,51 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulator import StrengthModel, simulate_season
+
+TEAMS = ["A", "B", "C", "D", "E"]
+
+
+def build_matches():
+    rows = []
+    # 2015: A beats everyone, the rest beat whoever comes later in the list
+    for team1, team2 in itertools.combinations(TEAMS, 2):
+        rows += [(2015, team1, team2, team1)] * 2
+    # 2016: a double round robin with the same pecking order, then 4 playoff matches
+    for team1, team2 in itertools.permutations(TEAMS, 2):
+        rows.append((2016, team1, team2, min(team1, team2)))
+    rows += [(2016, "A", "B", "A")] * 4
+    matches = pd.DataFrame(rows, columns=["season", "team1", "team2", "winner"])
+    matches["id"] = np.arange(1, len(matches) + 1)
+    matches["toss_winner"] = matches["team1"]
+    matches["venue"] = "V"
+    return matches
+
+
+# Test 1: Ratings follow past results and pair odds are consistent both ways
+def test_strength_model():
+    matches = build_matches()
+    model = StrengthModel.from_matches(matches[matches["season"] == 2015], TEAMS, 2016)
+    assert list(np.argsort(-model.ratings)) == [0, 1, 2, 3, 4]
+    assert np.allclose(model.pair_logit, -model.pair_logit.T)
+    # The toss winner (always team1) won every match at V: a toss edge above even
+    assert model.toss_logit[0] > 0 and model.toss_logit[-1] > 0
+
+
+# Test 2: Odds are complete, reproducible and fixed once the league is over
+def test_simulated_odds():
+    matches = build_matches()
+    odds, stats = simulate_season(matches, 2016, played=10, sims=20_000, workers=1, seed=3, chunk=5_000)
+    assert stats["fixtures"] == 10 and stats["seasons_per_sec"] > 0
+    assert odds["qualify_pct"].sum() == pytest.approx(400.0, abs=0.05)
+    assert odds["title_pct"].sum() == pytest.approx(100.0, abs=0.05)
+    again, _ = simulate_season(matches, 2016, played=10, sims=20_000, workers=1, seed=3, chunk=5_000)
+    assert odds.equals(again)
+
+    final, _ = simulate_season(matches, 2016, sims=1_000, workers=1)
+    assert final.set_index("team")["qualify_pct"].to_dict() == {"A": 100, "B": 100, "C": 100, "D": 100, "E": 0}
+    with pytest.raises(ValueError):
+        simulate_season(matches, 2016, played=21)
@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ("pandas", "numpy", "matplotlib", "seaborn", "pyarrow")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Test 1: Importing an entry point loads no heavy library and runs nothing
+@pytest.mark.parametrize("module", ["final", "main", "ipl_analysis"])
+def test_entry_points_import_lightly(module, tmp_path):
+    code = f"import sys, {module}; print(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True,
+                          env=dict(os.environ, PYTHONPATH=REPO_ROOT))
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.split() == []
+    assert list(tmp_path.iterdir()) == [], "import created files"
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from run_queries import run_batch
+from stats_engine import StatsEngine
+
+
+# Test 1: The engine returns the same frames as the SQL batch, ties included
+def test_engine_matches_sql(build_db, random_frames):
+    conn = build_db(*random_frames, normalized=False)
+    matches = pd.read_sql_query("SELECT * FROM matches", conn)
+    deliveries = pd.read_sql_query("SELECT * FROM deliveries", conn)
+    expected = run_batch(conn)
+    for name, frame in StatsEngine(matches, deliveries).run_queries().items():
+        assert list(frame.columns) == list(expected[name].columns), name
+        assert frame.astype(str).values.tolist() == expected[name].astype(str).values.tolist(), name
+    conn.close()
+
+
+# Test 2: Categorical and plain string columns encode to the same ids
+def test_categorical_and_object_encode_alike(build_db, random_frames):
+    conn = build_db(*random_frames, normalized=False)
+    matches = pd.read_sql_query("SELECT * FROM matches", conn)
+    deliveries = pd.read_sql_query("SELECT * FROM deliveries", conn)
+    plain = StatsEngine(matches, deliveries)
+    categorical = StatsEngine(matches.astype({"venue": "category", "winner": "category"}),
+                              deliveries.astype({"batsman": "category", "bowler": "category"}))
+    for role in ("batting", "bowling"):
+        for stat, values in getattr(plain, role)().items():
+            assert (getattr(categorical, role)()[stat] == values).all(), stat
+    conn.close()
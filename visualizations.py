@@ -1,29 +1,21 @@
 # visualizations.py
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from chart_service import get_chart_service
 
 def plot_top_teams():
+    import pandas as pd
     df = pd.read_csv("top_teams.csv")
-    plt.figure(figsize=(8, 6))
-    sns.barplot(x="team", y="wins", data=df, palette="viridis")
-    plt.title("Top 5 Teams by Total Wins")
-    plt.xlabel("Team")
-    plt.ylabel("Wins")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig("plots/top_teams.png")
-    plt.close()
+    return get_chart_service().submit(df, {
+        "kind": "sns_bar", "x": "team", "y": "wins", "palette": "viridis",
+        "title": "Top 5 Teams by Total Wins", "xlabel": "Team", "ylabel": "Wins",
+        "rotation": 45, "figsize": (8, 6),
+    }, "plots/top_teams.png")
 
 def plot_top_batsmen():
+    import pandas as pd
     df = pd.read_csv("top_batsmen.csv")
-    plt.figure(figsize=(8, 6))
-    sns.barplot(x="batsman", y="total_runs", data=df, palette="magma")
-    plt.title("Top 5 Batsmen by Runs")
-    plt.xlabel("Batsman")
-    plt.ylabel("Total Runs")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig("plots/top_batsmen.png")
-    plt.close()
+    return get_chart_service().submit(df, {
+        "kind": "sns_bar", "x": "batsman", "y": "total_runs", "palette": "magma",
+        "title": "Top 5 Batsmen by Runs", "xlabel": "Batsman", "ylabel": "Total Runs",
+        "rotation": 45, "figsize": (8, 6),
+    }, "plots/top_batsmen.png")